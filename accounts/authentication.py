@@ -0,0 +1,86 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+USER_KEY_PREFIX = 'authuser:'
+
+# Everything UserSerializer renders, so embedding request.user (comment or
+# content authors) never lazy-loads a field. password and last_login stay
+# deferred and are fetched only if something reads them.
+EXCLUDED_FIELDS = ('password', 'last_login')
+
+
+def user_cache():
+    """The cache holding user snapshots, or None when USER_CACHE_ALIAS is unset."""
+    alias = getattr(settings, 'USER_CACHE_ALIAS', None)
+    return caches[alias] if alias else None
+
+
+def user_cache_key(user_id):
+    return f'{USER_KEY_PREFIX}{user_id}'
+
+
+def snapshot_fields():
+    User = get_user_model()
+    return [field.attname for field in User._meta.concrete_fields if field.attname not in EXCLUDED_FIELDS]
+
+
+def get_cached_user(user_id):
+    """
+    The user with id user_id, from the cache when possible. The instance is
+    a regular User with the excluded fields deferred; None if there is none.
+    It is a read-only snapshot: load the row before saving it.
+    """
+    User = get_user_model()
+    fields = snapshot_fields()
+    cache = user_cache()
+    key = user_cache_key(user_id)
+
+    values = cache.get(key) if cache is not None else None
+    if values is None:
+        values = User.objects.filter(**{api_settings.USER_ID_FIELD: user_id}).values_list(*fields).first()
+        if values is None:
+            return None
+        if cache is not None:
+            cache.set(key, values, getattr(settings, 'USER_CACHE_TIMEOUT', 60))
+    return User.from_db(User.objects.db, fields, values)
+
+
+def invalidate_cached_user(user_id):
+    """Drop the cached user once the current transaction commits."""
+    cache = user_cache()
+    if cache is not None:
+        key = user_cache_key(user_id)
+        transaction.on_commit(lambda: cache.delete(key))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that reads the user from a short-lived cache instead
+    of querying the users table on every request. Saving or deleting a User
+    (profile edits, role changes in the admin) drops the entry
+    (accounts.signals); USER_CACHE_TIMEOUT bounds any other staleness.
+    Without a shared cache (USER_CACHE_ALIAS None) every request reads the
+    row, so role and is_active checks never see a stale snapshot.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_('Token contained no recognizable user identification')) from e
+
+        user = get_cached_user(user_id)
+        if user is None:
+            raise AuthenticationFailed(_('User not found'), code='user_not_found')
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        if api_settings.CHECK_REVOKE_TOKEN:
+            # Needs the password hash, which the cache does not hold
+            return super().get_user(validated_token)
+        return user
@@ -0,0 +1,122 @@
+import hashlib
+import math
+import threading
+import time
+from django.conf import settings
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings: no false negatives, false
+    positives at about `error_rate` while it holds at most `capacity` items.
+    """
+
+    def __init__(self, capacity, error_rate=0.001):
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        # Double hashing: k positions from two 64-bit halves of one digest
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'big')
+        second = int.from_bytes(digest[8:], 'big') | 1
+        return [(first + i * second) % self.size for i in range(self.hash_count)]
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class BlacklistFilter:
+    """
+    Per-process Bloom filter of blacklisted refresh token JTIs.
+    Loaded lazily from the database, then topped up every
+    TOKEN_BLACKLIST_FILTER_SYNC_INTERVAL seconds with the rows added since,
+    and rebuilt once it holds more than its capacity. Tokens this process
+    blacklists are added straight away; tokens blacklisted by other workers
+    may be missing until the next sync, which is why rotation also treats an
+    existing blacklist row as a replay (BlacklistFilteredRefreshToken).
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.bloom = None
+        self.last_id = 0
+        self.synced_at = 0
+
+    def _load(self, since_id):
+        rows = BlacklistedToken.objects.filter(
+            pk__gt=since_id, token__expires_at__gt=timezone.now()
+        ).values_list('pk', 'token__jti').order_by('pk')
+        for pk, jti in rows.iterator(chunk_size=5000):
+            self.bloom.add(jti)
+            self.last_id = pk
+
+    def sync(self, force=False):
+        interval = getattr(settings, 'TOKEN_BLACKLIST_FILTER_SYNC_INTERVAL', 30)
+        with self.lock:
+            if not force and self.bloom is not None and time.monotonic() - self.synced_at < interval:
+                return
+            if force or self.bloom is None or self.bloom.count > self.bloom.capacity:
+                self.bloom = BloomFilter(
+                    getattr(settings, 'TOKEN_BLACKLIST_FILTER_CAPACITY', 1_000_000),
+                    getattr(settings, 'TOKEN_BLACKLIST_FILTER_ERROR_RATE', 0.001),
+                )
+                self.last_id = 0
+            self._load(self.last_id)
+            self.synced_at = time.monotonic()
+
+    def might_contain(self, jti):
+        self.sync()
+        return jti in self.bloom
+
+    def add(self, jti):
+        with self.lock:
+            if self.bloom is not None:
+                self.bloom.add(jti)
+
+
+blacklist_filter = BlacklistFilter()
+
+
+class BlacklistFilteredRefreshToken(RefreshToken):
+    """RefreshToken whose blacklist lookup only hits the database on a Bloom filter match."""
+
+    def check_blacklist(self):
+        jti = self.payload[api_settings.JTI_CLAIM]
+        if blacklist_filter.might_contain(jti) and BlacklistedToken.objects.filter(token__jti=jti).exists():
+            raise TokenError(_('Token is blacklisted'))
+
+    def blacklist(self):
+        result = super().blacklist()
+        blacklist_filter.add(self.payload[api_settings.JTI_CLAIM])
+        return result
+
+
+def compact_blacklist(batch_size=5000, now=None):
+    """
+    Delete expired outstanding tokens and their blacklist rows, batch_size
+    at a time so no single transaction holds the tables for long.
+    Returns (outstanding deleted, blacklisted deleted).
+    """
+    now = now or timezone.now()
+    outstanding_deleted = blacklisted_deleted = 0
+    while True:
+        ids = list(OutstandingToken.objects.filter(expires_at__lte=now).order_by('pk').values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return outstanding_deleted, blacklisted_deleted
+        blacklisted_deleted += BlacklistedToken.objects.filter(token_id__in=ids).delete()[0]
+        outstanding_deleted += OutstandingToken.objects.filter(pk__in=ids).delete()[0]
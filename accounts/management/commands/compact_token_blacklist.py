@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from accounts.blacklist import compact_blacklist
+
+
+class Command(BaseCommand):
+    help = 'Delete expired outstanding and blacklisted refresh tokens in batches (run periodically, e.g. hourly)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        outstanding, blacklisted = compact_blacklist(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Deleted {outstanding} expired outstanding tokens ({blacklisted} blacklisted)'
+        ))
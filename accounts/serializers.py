@@ -1,6 +1,9 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, TokenError
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from .blacklist import BlacklistFilteredRefreshToken
 
 User = get_user_model()
 
@@ -38,4 +41,39 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         data = super().validate(attrs)
         
         data['user'] = UserSerializer(self.user).data
-        return data
\ No newline at end of file
+        return data
+
+class BlacklistFilteredTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    TokenRefreshSerializer with the Bloom-filtered blacklist check. The user
+    is read from the database, not the user cache, so a deactivated account
+    cannot refresh on a stale snapshot. Rotation blacklists the old token first and rejects
+    it when it was already blacklisted, so a replay is caught by the
+    database even when this worker's filter has not seen it yet.
+    """
+    token_class = BlacklistFilteredRefreshToken
+    
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        
+        user_id = refresh.payload.get(api_settings.USER_ID_CLAIM)
+        if user_id:
+            user = User.objects.filter(**{api_settings.USER_ID_FIELD: user_id}).only('is_active').first()
+            if not api_settings.USER_AUTHENTICATION_RULE(user):
+                raise AuthenticationFailed(self.error_messages['no_active_account'], 'no_active_account')
+        
+        data = {'access': str(refresh.access_token)}
+        
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION:
+                _, created = refresh.blacklist()
+                if not created:
+                    raise TokenError('Token is blacklisted')
+            
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            refresh.outstand()
+            data['refresh'] = str(refresh)
+        
+        return data
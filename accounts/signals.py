@@ -0,0 +1,13 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from .authentication import invalidate_cached_user
+
+User = get_user_model()
+
+
+def invalidate_user(sender, instance, **kwargs):
+    invalidate_cached_user(instance.pk)
+
+
+post_save.connect(invalidate_user, sender=User, dispatch_uid='authuser_save')
+post_delete.connect(invalidate_user, sender=User, dispatch_uid='authuser_delete')
@@ -1,3 +1,140 @@
-from django.test import TestCase
+from datetime import timedelta
+from unittest import mock
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+from .authentication import get_cached_user
+from .blacklist import BlacklistFilter, BloomFilter
+from .models import User
 
 
+class CachedUserTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='user@example.com', username='user', password='pass12345')
+
+    def setUp(self):
+        cache.clear()
+        self.refresh = RefreshToken.for_user(self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.refresh.access_token}')
+
+    def test_without_a_shared_cache_every_lookup_reads_the_row(self):
+        for _ in range(2):
+            with self.assertNumQueries(1):
+                self.assertEqual(get_cached_user(self.user.pk).username, 'user')
+
+    @override_settings(USER_CACHE_ALIAS='default')
+    def test_profile_edits_do_not_write_back_the_snapshot(self):
+        get_cached_user(self.user.pk)
+        # A queryset update sends no signal, so the cached snapshot goes stale
+        User.objects.filter(pk=self.user.pk).update(is_moderator=True)
+        self.assertFalse(get_cached_user(self.user.pk).is_moderator)
+
+        response = self.client.patch('/api/auth/me/', {'bio': 'Hello'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data['is_moderator'])
+        self.user.refresh_from_db()
+        self.assertEqual((self.user.bio, self.user.is_moderator), ('Hello', True))
+
+    @override_settings(USER_CACHE_ALIAS='default')
+    def test_inactive_users_cannot_refresh_on_a_stale_snapshot(self):
+        get_cached_user(self.user.pk)
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        response = self.client.post('/api/auth/token/refresh/', {'refresh': str(self.refresh)}, format='json')
+        self.assertEqual(response.status_code, 401)
+
+
+class BloomFilterTests(TestCase):
+    def test_no_false_negatives_and_few_false_positives(self):
+        bloom = BloomFilter(1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add(f'member-{i}')
+        self.assertTrue(all(f'member-{i}' in bloom for i in range(1000)))
+        false_positives = sum(f'other-{i}' in bloom for i in range(10000))
+        self.assertLess(false_positives, 300)
+        self.assertEqual(bloom.count, 1000)
+
+
+class BlacklistFilterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='user@example.com', username='user', password='pass12345')
+
+    def blacklist(self, expires_in=timedelta(days=1)):
+        token = RefreshToken.for_user(self.user)
+        outstanding = OutstandingToken.objects.get(jti=token['jti'])
+        outstanding.expires_at = timezone.now() + expires_in
+        outstanding.save()
+        BlacklistedToken.objects.create(token=outstanding)
+        return token['jti']
+
+    @override_settings(TOKEN_BLACKLIST_FILTER_SYNC_INTERVAL=60)
+    def test_rows_from_other_workers_arrive_with_the_next_sync(self):
+        first = self.blacklist()
+        blacklist_filter = BlacklistFilter()
+        self.assertTrue(blacklist_filter.might_contain(first))
+
+        second = self.blacklist()
+        self.assertFalse(blacklist_filter.might_contain(second))
+        blacklist_filter.synced_at -= 60
+        self.assertTrue(blacklist_filter.might_contain(second))
+
+        # Tokens this worker blacklists are added without waiting
+        blacklist_filter.add('local')
+        self.assertTrue(blacklist_filter.might_contain('local'))
+
+    def test_expired_rows_are_skipped(self):
+        expired = self.blacklist(expires_in=-timedelta(minutes=1))
+        live = self.blacklist()
+        blacklist_filter = BlacklistFilter()
+        blacklist_filter.sync()
+        self.assertEqual(blacklist_filter.bloom.count, 1)
+        self.assertTrue(blacklist_filter.might_contain(live))
+        self.assertFalse(blacklist_filter.might_contain(expired))
+
+    @override_settings(TOKEN_BLACKLIST_FILTER_CAPACITY=2, TOKEN_BLACKLIST_FILTER_SYNC_INTERVAL=0)
+    def test_full_filters_are_rebuilt(self):
+        blacklist_filter = BlacklistFilter()
+        jtis = [self.blacklist() for _ in range(3)]
+        blacklist_filter.sync()
+        first_bloom = blacklist_filter.bloom
+        blacklist_filter.sync()
+        self.assertIsNot(blacklist_filter.bloom, first_bloom)
+        self.assertEqual(blacklist_filter.bloom.count, 3)
+        self.assertTrue(all(blacklist_filter.might_contain(jti) for jti in jtis))
+
+
+@override_settings(TOKEN_BLACKLIST_FILTER_SYNC_INTERVAL=60)
+class TokenRefreshTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='user@example.com', username='user', password='pass12345')
+
+    def setUp(self):
+        patcher = mock.patch('accounts.blacklist.blacklist_filter', BlacklistFilter())
+        self.blacklist_filter = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = APIClient()
+
+    def refresh(self, token):
+        return self.client.post('/api/auth/token/refresh/', {'refresh': str(token)}, format='json')
+
+    def test_rotation_rejects_a_replayed_token(self):
+        token = RefreshToken.for_user(self.user)
+        response = self.refresh(token)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.data['refresh'], str(token))
+        self.assertEqual(self.refresh(response.data['refresh']).status_code, 200)
+        self.assertEqual(self.refresh(token).status_code, 401)
+
+    def test_replays_the_filter_has_not_seen_are_rejected(self):
+        token = RefreshToken.for_user(self.user)
+        self.blacklist_filter.sync()
+        # Blacklisted by another worker after this one's last sync
+        BlacklistedToken.objects.create(token=OutstandingToken.objects.get(jti=token['jti']))
+        self.assertFalse(self.blacklist_filter.might_contain(token['jti']))
+        self.assertEqual(self.refresh(token).status_code, 401)
@@ -1,4 +1,4 @@
-from rest_framework import generics, status
+from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework_simplejwt.views import TokenObtainPairView
@@ -24,7 +24,11 @@ class CurrentUserView(generics.RetrieveUpdateAPIView):
     permission_classes = [IsAuthenticated]
     
     def get_object(self):
-        return self.request.user
+        if self.request.method in permissions.SAFE_METHODS:
+            return self.request.user
+        # request.user may be a cached snapshot; saving it would write back
+        # stale roles and is_active
+        return User.objects.get(pk=self.request.user.pk)
 
 class UserDetailView(generics.RetrieveAPIView):
     queryset = User.objects.all()
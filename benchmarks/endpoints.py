@@ -0,0 +1,158 @@
+from django.contrib.auth import get_user_model
+from django.db.models import Count
+from content.models import Blog, News, Tool, ToolType
+from interactions.models import Bookmark, Comment, Vote
+from prompts.models import Prompt
+from tags.models import Tag
+
+
+class Endpoint:
+    """
+    One benchmarked request. `kwargs`, `params` and `body` are dicts or
+    callables taking the fixtures dict (see load_fixtures); an endpoint whose
+    callable returns None is skipped (e.g. the user has no bookmark).
+    `budget` is the most queries the request may run, as an int or
+    {'anon': n, 'auth': m}. Paginated endpoints run once per page size, and
+    their query count may grow by at most `max_growth` between the smallest
+    and the largest page (e.g. one query per content type on polymorphic
+    listings); more than that is a per-row lookup.
+    """
+
+    def __init__(self, name, route, method='GET', roles=('anon', 'auth'), kwargs=None, params=None,
+                 body=None, paginated=False, budget=None, max_growth=0, status=200):
+        self.name = name
+        self.route = route
+        self.method = method
+        self.roles = roles
+        self.kwargs = kwargs or {}
+        self.params = params or {}
+        self.body = body
+        self.paginated = paginated
+        self.budget = budget
+        self.max_growth = max_growth
+        self.status = status
+
+    def get_budget(self, role):
+        return self.budget.get(role) if isinstance(self.budget, dict) else self.budget
+
+    @staticmethod
+    def resolve(value, fixtures):
+        return value(fixtures) if callable(value) else value
+
+
+def load_fixtures():
+    """
+    Objects the endpoints point at: the most popular item of each type and
+    the most active user, so detail pages carry the heaviest payloads.
+    The 'staff' role is a superuser, for moderator-only actions.
+    """
+    User = get_user_model()
+    user = User.objects.annotate(vote_total=Count('votes')).order_by('-vote_total', 'pk').first()
+    prompt = Prompt.objects.order_by('-score', 'pk').first()
+    return {
+        'user': user,
+        'staff': User.objects.filter(is_superuser=True).order_by('pk').first(),
+        'prompt': prompt,
+        'blog': Blog.objects.order_by('-score', 'pk').first(),
+        'news': News.objects.order_by('-score', 'pk').first(),
+        'tool': Tool.objects.order_by('-score', 'pk').first(),
+        'tool_type': ToolType.objects.order_by('name').first(),
+        'tag': Tag.objects.order_by('-usage_count', 'pk').first(),
+        'comment': Comment.objects.filter(commentable_type=1, commentable_id=prompt.pk).first() if prompt else None,
+        'vote': Vote.objects.filter(user=user).order_by('pk').first() if user else None,
+        'bookmark': Bookmark.objects.filter(user=user).order_by('pk').first() if user else None,
+    }
+
+
+def _slug(key):
+    return lambda fx: {'slug': fx[key].slug} if fx[key] else None
+
+
+def _pk(key):
+    return lambda fx: {'pk': fx[key].pk} if fx[key] else None
+
+
+def _commentable(fx):
+    return {'commentable_type': 1, 'commentable_id': str(fx['prompt'].pk)} if fx['prompt'] else None
+
+
+def _vote_target(fx):
+    vote = fx['vote']
+    return {'votable_type': vote.votable_type, 'votable_id': str(vote.votable_id)} if vote else None
+
+
+def _bookmark_target(fx):
+    bookmark = fx['bookmark']
+    if not bookmark:
+        return None
+    return {'bookmarkable_type': bookmark.bookmarkable_type, 'bookmarkable_id': str(bookmark.bookmarkable_id)}
+
+
+def _batch(fx):
+    if not fx['prompt']:
+        return None
+    prompts = Prompt.objects.order_by('-score', 'pk').values_list('pk', flat=True)[:10]
+    return {'operations': [
+        {'op': op, 'type': 1, 'id': str(pk), **({'value': 1} if op == 'vote' else {})}
+        for pk in prompts for op in ('vote', 'bookmark')
+    ]}
+
+
+# Every router route of config/urls.py appears here at least once
+# (benchmarks.tests checks it). Writes run in a transaction that is rolled
+# back, so the suite leaves the database as it found it.
+ENDPOINTS = [
+    Endpoint('prompts', 'prompt-list', paginated=True, budget={'anon': 5, 'auth': 7}),
+    Endpoint('prompts by score', 'prompt-list', params={'ordering': '-score'}, paginated=True,
+             budget={'anon': 5, 'auth': 7}),
+    Endpoint('prompts keyset', 'prompt-list', params={'cursor': ''}, paginated=True, budget={'anon': 4, 'auth': 6}),
+    Endpoint('prompts search', 'prompt-list', params={'search': 'image portrait'}, paginated=True,
+             budget={'anon': 8, 'auth': 10}),
+    Endpoint('prompts trending', 'prompt-list', params={'ordering': 'trending'}, paginated=True,
+             budget={'anon': 5, 'auth': 7}),
+    Endpoint('prompt', 'prompt-detail', kwargs=_slug('prompt'), budget={'anon': 4, 'auth': 6}),
+    Endpoint('prompt relations', 'prompt-relations', kwargs=_slug('prompt'), budget=3),
+    Endpoint('prompt graph', 'prompt-graph', kwargs=_slug('prompt'), budget={'anon': 5, 'auth': 7}),
+    Endpoint('my prompts', 'prompt-my-prompts', roles=('auth',), paginated=True, budget=1),
+    Endpoint('prompt view', 'prompt-increment-view', method='POST', roles=('staff',), kwargs=_slug('prompt'), budget=2),
+
+    Endpoint('blogs', 'blog-list', paginated=True, budget={'anon': 5, 'auth': 7}),
+    Endpoint('blog', 'blog-detail', kwargs=_slug('blog'), budget={'anon': 4, 'auth': 6}),
+    Endpoint('blog view', 'blog-increment-view', method='POST', roles=('staff',), kwargs=_slug('blog'), budget=2),
+    Endpoint('news list', 'news-list', paginated=True, budget={'anon': 5, 'auth': 7}),
+    Endpoint('news', 'news-detail', kwargs=_slug('news'), budget={'anon': 4, 'auth': 6}),
+    Endpoint('news view', 'news-increment-view', method='POST', roles=('staff',), kwargs=_slug('news'), budget=2),
+    Endpoint('tools', 'tool-list', paginated=True, budget={'anon': 5, 'auth': 7}),
+    Endpoint('tool', 'tool-detail', kwargs=_slug('tool'), budget={'anon': 4, 'auth': 6}),
+    Endpoint('tool view', 'tool-increment-view', method='POST', roles=('staff',), kwargs=_slug('tool'), budget=2),
+    Endpoint('tool types', 'tool-type-list', paginated=True, budget=2),
+    Endpoint('tool type', 'tool-type-detail', kwargs=_pk('tool_type'), budget=1),
+
+    Endpoint('comments', 'comment-list', params=_commentable, paginated=True, budget=2),
+    Endpoint('recent comments', 'comment-list', params={'cursor': ''}, paginated=True, budget=1),
+    Endpoint('comment', 'comment-detail', kwargs=_pk('comment'), budget=1),
+    Endpoint('comment create', 'comment-list', method='POST', roles=('auth',),
+             body=lambda fx: {**_commentable(fx), 'body': 'Benchmark comment'} if fx['prompt'] else None,
+             budget=3, status=201),
+    Endpoint('votes', 'vote-list', roles=('auth',), paginated=True, budget=2),
+    Endpoint('vote', 'vote-detail', roles=('auth',), kwargs=_pk('vote'), budget=1),
+    Endpoint('vote cast', 'vote-list', method='POST', roles=('auth',),
+             body=lambda fx: {'votable_type': 1, 'votable_id': str(fx['prompt'].pk), 'value': -1} if fx['prompt'] else None,
+             budget=6, status=None),
+    Endpoint('vote remove', 'vote-remove-vote', method='DELETE', roles=('auth',), params=_vote_target,
+             budget=5, status=204),
+    Endpoint('bookmarks', 'bookmark-list', roles=('auth',), paginated=True, budget=6, max_growth=3),
+    Endpoint('bookmark', 'bookmark-detail', roles=('auth',), kwargs=_pk('bookmark'), budget=2),
+    Endpoint('bookmark add', 'bookmark-list', method='POST', roles=('auth',),
+             body=lambda fx: {'bookmarkable_type': 1, 'bookmarkable_id': str(fx['prompt'].pk)} if fx['prompt'] else None,
+             budget=6, status=None),
+    Endpoint('bookmark remove', 'bookmark-remove-bookmark', method='DELETE', roles=('auth',),
+             params=_bookmark_target, budget=3, status=204),
+    Endpoint('interaction batch', 'interaction-batch', method='POST', roles=('auth',), body=_batch, budget=7),
+
+    Endpoint('tags', 'tag-list', paginated=True, budget=4),
+    Endpoint('tag', 'tag-detail', kwargs=_pk('tag'), budget=3),
+    Endpoint('popular tags', 'tag-popular', budget=1),
+    Endpoint('tag items', 'tag-items', kwargs=_pk('tag'), paginated=True, budget=7, max_growth=3),
+    Endpoint('trending', 'trending-list', paginated=True, budget=6, max_growth=3),
+]
@@ -0,0 +1,61 @@
+import os
+from django.core.management.base import BaseCommand, CommandError
+from benchmarks.endpoints import ENDPOINTS
+from benchmarks.runner import DEFAULT_PAGE_SIZES, EndpointBenchmark, compare, load_baseline, save_baseline
+
+
+def page_sizes(value):
+    try:
+        return tuple(sorted({int(size) for size in value.split(',')}))
+    except ValueError:
+        raise CommandError(f'--page-sizes must be a comma-separated list of integers, not "{value}"')
+
+
+class Command(BaseCommand):
+    help = ('Request every API endpoint against the current database and report query counts, '
+            'p50/p95 latency and response sizes. Fails when an endpoint exceeds its query budget, '
+            'runs more queries on bigger pages, or regresses against --baseline.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=10, help='Timed runs per request (after one warm-up)')
+        parser.add_argument('--page-sizes', type=page_sizes, default=DEFAULT_PAGE_SIZES,
+                            help='Comma-separated page sizes for paginated endpoints (default 10,20,50)')
+        parser.add_argument('--only', help='Only run endpoints whose name contains this text')
+        parser.add_argument('--baseline', help='JSON file to compare against (see --update-baseline)')
+        parser.add_argument('--update-baseline', action='store_true',
+                            help='Write the results to --baseline instead of comparing')
+        parser.add_argument('--latency-threshold', type=float,
+                            help='Also fail when a p95 is this fraction slower than the baseline (e.g. 0.25)')
+
+    def handle(self, *args, **options):
+        if options['update_baseline'] and not options['baseline']:
+            raise CommandError('--update-baseline needs --baseline')
+
+        endpoints = [e for e in ENDPOINTS if not options['only'] or options['only'] in e.name]
+        results = EndpointBenchmark(endpoints, options['page_sizes'], options['repeat']).run()
+        if not results:
+            raise CommandError('Nothing to benchmark; seed the database first (manage.py seed_benchmark)')
+
+        width = max(len(key) for key in results)
+        self.stdout.write(f'{"endpoint".ljust(width)}  status  queries  budget  p50 ms  p95 ms     bytes')
+        for key, result in results.items():
+            budget = '-' if result['budget'] is None else result['budget']
+            self.stdout.write(
+                f'{key.ljust(width)}  {result["status"]:>6}  {result["queries"]:>7}  {budget:>6}  '
+                f'{result["p50_ms"]:>6.1f}  {result["p95_ms"]:>6.1f}  {result["bytes"]:>8}'
+            )
+
+        if options['update_baseline']:
+            save_baseline(options['baseline'], results)
+            self.stdout.write(self.style.SUCCESS(f'Wrote {len(results)} results to {options["baseline"]}'))
+            return
+
+        baseline = None
+        if options['baseline']:
+            if not os.path.exists(options['baseline']):
+                raise CommandError(f'No baseline at {options["baseline"]}')
+            baseline = load_baseline(options['baseline'])
+        failures = compare(results, baseline, options['latency_threshold'])
+        if failures:
+            raise CommandError('\n'.join([f'{len(failures)} endpoint check(s) failed:', *failures]))
+        self.stdout.write(self.style.SUCCESS(f'{len(results)} endpoint checks passed'))
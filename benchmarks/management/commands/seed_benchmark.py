@@ -0,0 +1,42 @@
+from datetime import datetime, timezone as dt_timezone
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from benchmarks.seed import BENCH_EMAIL_DOMAIN, BENCH_PASSWORD, DEFAULT_COUNTS, BenchmarkSeeder
+
+
+class Command(BaseCommand):
+    help = ('Fill the database with a large, skewed dataset for benchmarking. '
+            'The same --seed, counts and --anchor always produce the same rows; use an empty database.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--scale', type=float, default=1.0,
+                            help='Multiply every default count (e.g. 20 for a million prompts)')
+        for name, default in DEFAULT_COUNTS.items():
+            parser.add_argument(f'--{name.replace("_", "-")}', type=int, dest=name,
+                                help=f'Number of {name.replace("_", " ")} (default {default} x scale)')
+        parser.add_argument('--chunk-size', type=int, default=5000)
+        parser.add_argument('--anchor', type=datetime.fromisoformat,
+                            help='Newest timestamp, as an ISO date (default: today 00:00 UTC)')
+
+    def handle(self, *args, **options):
+        if get_user_model().objects.filter(email__endswith=f'@{BENCH_EMAIL_DOMAIN}').exists():
+            raise CommandError('This database already holds benchmark data; seed an empty one')
+
+        counts = {
+            name: options[name] if options[name] is not None else round(default * options['scale'])
+            for name, default in DEFAULT_COUNTS.items()
+        }
+        anchor = options['anchor']
+        if anchor and anchor.tzinfo is None:
+            anchor = anchor.replace(tzinfo=dt_timezone.utc)
+
+        seeder = BenchmarkSeeder(
+            seed=options['seed'], counts=counts, chunk_size=options['chunk_size'], anchor=anchor,
+            log=lambda message: self.stdout.write(f'  {message}'),
+        )
+        seeder.run()
+        self.stdout.write(self.style.SUCCESS(
+            f'Seeded {seeder.inserted} rows (seed {options["seed"]}); '
+            f'every user\'s password is "{BENCH_PASSWORD}"'
+        ))
@@ -0,0 +1,176 @@
+import json
+import math
+import statistics
+import time
+from django.conf import settings
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+from interactions.view_counter import view_counter
+from .endpoints import ENDPOINTS, Endpoint, load_fixtures
+
+DEFAULT_PAGE_SIZES = (10, 20, 50)
+BASELINE_VERSION = 1
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def result_key(endpoint, role, page_size):
+    key = f'{endpoint.name} [{role}]'
+    return f'{key} page_size={page_size}' if page_size else key
+
+
+class EndpointBenchmark:
+    """
+    Runs ENDPOINTS through Django's test client against the current database
+    and records, per endpoint, role and page size: the query count, p50/p95
+    latency in ms and the response size in bytes.
+
+    Each request runs `repeat` times after one warm-up run. The query count is
+    the smallest seen, so occasional background work (a view counter flush,
+    cache culling) doesn't make it flaky, while an N+1 shows up in every run.
+    The anonymous response cache is turned off so the full view is measured.
+    Writes run inside a transaction that is rolled back (buffered view counts
+    included), so on_commit work (cache invalidation) is not counted.
+    """
+
+    def __init__(self, endpoints=None, page_sizes=DEFAULT_PAGE_SIZES, repeat=10, fixtures=None):
+        self.endpoints = ENDPOINTS if endpoints is None else endpoints
+        self.page_sizes = page_sizes
+        self.repeat = repeat
+        self.fixtures = fixtures
+
+    def run(self):
+        fixtures = self.fixtures or load_fixtures()
+        headers = {'anon': {}}
+        for role, user in [('auth', fixtures['user']), ('staff', fixtures['staff'])]:
+            if user:
+                headers[role] = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(user)}'}
+
+        results = {}
+        client = Client()
+        with override_settings(RESPONSE_CACHE_ENABLED=False, ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            for endpoint in self.endpoints:
+                for role in endpoint.roles:
+                    if role not in headers:
+                        continue
+                    for page_size in (self.page_sizes if endpoint.paginated else [None]):
+                        result = self.measure(client, endpoint, fixtures, headers[role], page_size)
+                        if result is not None:
+                            result['budget'] = endpoint.get_budget(role)
+                            result['max_growth'] = endpoint.max_growth
+                            results[result_key(endpoint, role, page_size)] = result
+        return results
+
+    def build_request(self, endpoint, fixtures, page_size):
+        kwargs = Endpoint.resolve(endpoint.kwargs, fixtures)
+        params = Endpoint.resolve(endpoint.params, fixtures)
+        body = Endpoint.resolve(endpoint.body, fixtures)
+        if kwargs is None or params is None or (endpoint.body is not None and body is None):
+            return None
+        params = dict(params)
+        if page_size:
+            params['page_size'] = page_size
+        return reverse(endpoint.route, kwargs=kwargs), params, body
+
+    def measure(self, client, endpoint, fixtures, headers, page_size):
+        request = self.build_request(endpoint, fixtures, page_size)
+        if request is None:
+            return None
+        path, params, body = request
+        if params:
+            path = f'{path}?{"&".join(f"{key}={value}" for key, value in params.items())}'
+
+        timings, query_counts = [], []
+        for run in range(self.repeat + 1):
+            with transaction.atomic():
+                with CaptureQueriesContext(connection) as queries:
+                    start = time.perf_counter()
+                    response = client.generic(
+                        endpoint.method, path, json.dumps(body) if body is not None else '',
+                        content_type='application/json', **headers,
+                    )
+                    elapsed = time.perf_counter() - start
+                if endpoint.method != 'GET':
+                    # Buffered view counts go down with the rest of the writes
+                    view_counter.flush()
+                    transaction.set_rollback(True)
+            if run:
+                timings.append(elapsed * 1000)
+                query_counts.append(len(queries))
+
+        return {
+            'method': endpoint.method,
+            'path': path,
+            'status': response.status_code,
+            'ok': response.status_code == endpoint.status if endpoint.status else 200 <= response.status_code < 300,
+            'queries': min(query_counts),
+            'max_queries': max(query_counts),
+            'p50_ms': round(statistics.median(timings), 3),
+            'p95_ms': round(percentile(timings, 95), 3),
+            'bytes': len(response.content),
+        }
+
+
+def compare(results, baseline=None, latency_threshold=None, latency_floor_ms=1.0):
+    """
+    Failure messages for results: unexpected statuses, queries over budget,
+    paginated endpoints whose query count grows with the page size (beyond
+    their max_growth), and,
+    against a baseline, more queries than before or (with latency_threshold,
+    e.g. 0.25) a p95 more than that fraction slower, ignoring differences
+    under latency_floor_ms.
+    """
+    failures = []
+    baseline_results = (baseline or {}).get('results', {})
+    for key, result in results.items():
+        if not result['ok']:
+            failures.append(f'{key}: status {result["status"]}')
+        if result['budget'] is not None and result['queries'] > result['budget']:
+            failures.append(f'{key}: {result["queries"]} queries, budget {result["budget"]}')
+
+        base = baseline_results.get(key)
+        if base is None:
+            continue
+        if result['queries'] > base['queries']:
+            failures.append(f'{key}: {result["queries"]} queries, baseline {base["queries"]}')
+        if latency_threshold is not None:
+            limit = max(base['p95_ms'] * (1 + latency_threshold), base['p95_ms'] + latency_floor_ms)
+            if result['p95_ms'] > limit:
+                failures.append(f'{key}: p95 {result["p95_ms"]}ms, baseline {base["p95_ms"]}ms')
+
+    # Same endpoint, bigger page, more queries: a per-row lookup
+    by_endpoint = {}
+    for key, result in results.items():
+        if ' page_size=' in key:
+            name, page_size = key.rsplit(' page_size=', 1)
+            by_endpoint.setdefault(name, []).append((int(page_size), result['queries'], result['max_growth']))
+    for name, counts in by_endpoint.items():
+        counts.sort()
+        if counts[-1][1] - counts[0][1] > counts[0][2]:
+            failures.append(f'{name}: {counts[0][1]} queries at page_size={counts[0][0]}, '
+                            f'{counts[-1][1]} at page_size={counts[-1][0]}')
+    return failures
+
+
+def load_baseline(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(path, results):
+    data = {
+        'version': BASELINE_VERSION,
+        'database': connection.vendor,
+        'cache': settings.CACHES['default']['BACKEND'].rsplit('.', 1)[-1],
+        'results': results,
+    }
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write('\n')
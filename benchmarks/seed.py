@@ -0,0 +1,435 @@
+import itertools
+import random
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import models, transaction
+from django.utils import timezone
+from django.utils.text import slugify
+from caching.generations import bump_generation
+from caching.signals import INVALIDATING_MODELS
+from content.models import Blog, News, Tool, ToolType
+from interactions.counters import get_content_model
+from interactions.models import Bookmark, Comment, Vote
+from interactions.votes import VOTE_FK_FIELDS
+from prompts.models import Prompt, PromptRelation
+from search.backends import get_search_backend
+from search.documents import SEARCHABLE_MODELS, get_searchable_model, index_objects
+from tags.models import Tag, Taggable
+from tags.services import reconcile_usage_counts
+from trending.engine import recompute
+from trending.models import TrendingScore
+
+BENCH_EMAIL_DOMAIN = 'bench.example'
+BENCH_PASSWORD = 'benchmark'
+
+# Row counts at --scale 1
+DEFAULT_COUNTS = {
+    'users': 10_000,
+    'prompts': 50_000,
+    'blogs': 2_000,
+    'news': 3_000,
+    'tools': 1_000,
+    'tool_types': 15,
+    'tags': 1_000,
+    'comments': 100_000,
+    'votes': 500_000,
+    'bookmarks': 100_000,
+    'relations': 20_000,
+}
+
+# Zipf exponents: popularity of items, how prolific authors are, how hot
+# tags are and how active users are
+ITEM_SKEW = 1.07
+AUTHOR_SKEW = 1.2
+TAG_SKEW = 1.1
+ACTIVITY_SKEW = 0.9
+
+WORDS = (
+    'ai prompt image music story code guide design photo portrait landscape anime cinematic '
+    'fantasy futuristic vintage minimal neon cyberpunk watercolor sketch realistic abstract '
+    'python javascript react django sql api data model chat assistant agent workflow tutorial '
+    'marketing email blog seo social video audio podcast beat jazz lofi ambient piano guitar '
+    'orchestra synth drums vocal lyric poem essay summary translate explain review plan '
+    'startup product research science math history travel food fitness health finance '
+    'education career resume interview productivity writing editing copy brand logo poster '
+    'character dragon robot castle forest ocean city night sunset space galaxy planet '
+    'midjourney stable diffusion gpt claude llama gemini suno udio dalle runway whisper'
+).split()
+TOOL_TYPE_NAMES = [
+    'Chatbot', 'Image Generator', 'Music Generator', 'Video Generator', 'Code Assistant',
+    'Writing Assistant', 'Voice', 'Search', 'Productivity', 'Design', 'Data Analysis',
+    'Translation', 'Education', 'Marketing', 'Research',
+]
+TEXT_MODELS = ['gpt-4o', 'claude-3-5-sonnet', 'llama-3-70b', 'gemini-1.5-pro', 'mistral-large']
+IMAGE_MODELS = ['midjourney-v6', 'sdxl', 'dall-e-3', 'flux-pro']
+IMAGE_SIZES = [(1024, 1024), (1024, 1792), (1792, 1024), (512, 512)]
+IMAGE_STYLES = ['photorealistic', 'anime', 'oil painting', 'watercolor', 'cinematic', '3d render']
+MUSIC_GENRES = ['lofi', 'jazz', 'ambient', 'rock', 'edm', 'classical', 'hip hop', 'synthwave']
+INSTRUMENTS = ['piano', 'guitar', 'drums', 'bass', 'strings', 'synth', 'vocals', 'saxophone']
+RELATION_TYPES = [relation_type for relation_type, _ in PromptRelation.RELATION_TYPES]
+
+
+def zipf_cum_weights(n, skew):
+    """Cumulative weights for random.choices: rank r is picked with odds 1 / (r + 1) ** skew."""
+    return list(itertools.accumulate(1 / (rank + 1) ** skew for rank in range(n)))
+
+
+@contextmanager
+def explicit_timestamps(*model_classes):
+    """Let bulk_create keep the created_at/updated_at values the seeder sets."""
+    fields = [
+        field for model in model_classes for field in model._meta.concrete_fields
+        if isinstance(field, models.DateTimeField) and (field.auto_now or field.auto_now_add)
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class BenchmarkSeeder:
+    """
+    Generates a large, skewed dataset with chunked bulk_create. Everything
+    (ids, text, timestamps, who votes for what) comes from one
+    random.Random(seed) and timestamps are relative to `anchor`, so the same
+    seed, counts and anchor always produce the same rows.
+
+    Popularity follows Zipf laws: a few items get most of the votes,
+    comments, bookmarks and relations, a few authors write most of the
+    content and a few tags are on most items. bulk_create sends no signals,
+    so the stored counters, tag counts, search index and trending ranks are
+    filled in at the end.
+    """
+
+    def __init__(self, seed=42, counts=None, chunk_size=5000, anchor=None, log=None):
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.counts = {**DEFAULT_COUNTS, **(counts or {})}
+        self.chunk_size = chunk_size
+        self.anchor = anchor or datetime.combine(timezone.now().date(), time(), tzinfo=dt_timezone.utc)
+        self.log = log or (lambda message: None)
+        self.inserted = 0
+
+    # Helpers
+
+    def uuid(self):
+        return uuid.UUID(int=self.rng.getrandbits(128), version=4)
+
+    def words(self, low, high):
+        return ' '.join(self.rng.choices(WORDS, k=self.rng.randint(low, high)))
+
+    def past(self, days):
+        """A timestamp up to `days` before the anchor, skewed towards recent."""
+        return self.anchor - timedelta(seconds=int(days * 86400 * self.rng.random() ** 2))
+
+    def after(self, start):
+        """A timestamp between start and the anchor, skewed towards start."""
+        return start + (self.anchor - start) * self.rng.random() ** 2
+
+    def insert(self, model, objects):
+        with transaction.atomic():
+            model.objects.bulk_create(objects, batch_size=self.chunk_size)
+        self.inserted += len(objects)
+
+    def insert_chunked(self, model, rows, label):
+        """bulk_create a generator of instances chunk by chunk; returns the row count."""
+        total = 0
+        while chunk := list(itertools.islice(rows, self.chunk_size)):
+            self.insert(model, chunk)
+            total += len(chunk)
+        self.log(f'{label}: {total}')
+        return total
+
+    def distinct_picks(self, cum_weights, count):
+        """Up to count distinct indexes drawn with cum_weights."""
+        picked = set()
+        for _ in range(5):
+            missing = count - len(picked)
+            if missing <= 0:
+                break
+            picked.update(self.rng.choices(range(len(cum_weights)), cum_weights=cum_weights, k=missing))
+        return sorted(picked)
+
+    def per_user_budget(self, total):
+        """Split total actions over users, a few very active ones doing most."""
+        if not self.user_ids:
+            return []
+        weights = [1 / (rank + 1) ** ACTIVITY_SKEW for rank in range(len(self.user_ids))]
+        scale = total / sum(weights)
+        order = list(range(len(self.user_ids)))
+        self.rng.shuffle(order)
+        budgets = [0] * len(self.user_ids)
+        for rank, user_index in enumerate(order):
+            share = weights[rank] * scale
+            budgets[user_index] = min(int(share) + (self.rng.random() < share % 1), len(self.item_ids))
+        return budgets
+
+    # Generation
+
+    def run(self):
+        models_with_timestamps = [get_user_model(), Prompt, Blog, News, Tool, Tag, Taggable,
+                                  Comment, Vote, Bookmark, PromptRelation, TrendingScore]
+        with explicit_timestamps(*models_with_timestamps):
+            self.seed_users()
+            self.seed_tool_types()
+            self.seed_tags()
+            self.seed_content()
+            self.seed_taggables()
+            self.seed_relations()
+            self.seed_votes()
+            self.seed_bookmarks()
+            self.seed_comments()
+            self.write_counters()
+            self.rebuild_derived()
+
+    def seed_users(self):
+        User = get_user_model()
+        n = self.counts['users']
+        password = make_password(BENCH_PASSWORD, salt=f'bench{self.seed}')
+        self.user_ids = [self.uuid() for _ in range(n)]
+        moderators = set(self.rng.sample(range(n), max(1, n // 200))) if n else set()
+
+        def rows():
+            for index, user_id in enumerate(self.user_ids):
+                yield User(
+                    id=user_id,
+                    email=f'user{index}@{BENCH_EMAIL_DOMAIN}',
+                    username=f'bench{index:07d}',
+                    password=password,
+                    first_name=self.rng.choice(WORDS).title(),
+                    last_name=self.rng.choice(WORDS).title(),
+                    bio=self.words(0, 20),
+                    is_moderator=index in moderators,
+                    is_pro=self.rng.random() < 0.1,
+                    is_superuser=index == 0,
+                    is_staff=index == 0,
+                    date_joined=self.past(730),
+                )
+
+        self.insert_chunked(User, rows(), 'users')
+        # Heavy authors: a Zipf law over a shuffled order of users
+        self.authors = self.user_ids[:]
+        self.rng.shuffle(self.authors)
+        self.author_weights = zipf_cum_weights(len(self.authors), AUTHOR_SKEW)
+        self.moderator_ids = [self.user_ids[index] for index in sorted(moderators)]
+        self.moderator_weights = zipf_cum_weights(len(self.moderator_ids), AUTHOR_SKEW)
+
+    def pick_author(self, moderators_only=False):
+        if moderators_only:
+            return self.rng.choices(self.moderator_ids, cum_weights=self.moderator_weights)[0]
+        return self.rng.choices(self.authors, cum_weights=self.author_weights)[0]
+
+    def seed_tool_types(self):
+        names = [
+            TOOL_TYPE_NAMES[index] if index < len(TOOL_TYPE_NAMES) else f'Category {index}'
+            for index in range(self.counts['tool_types'])
+        ]
+        self.tool_type_ids = [self.uuid() for _ in names]
+        self.insert(ToolType, [
+            ToolType(id=type_id, name=name, description=self.words(5, 15))
+            for type_id, name in zip(self.tool_type_ids, names)
+        ])
+
+    def seed_tags(self):
+        n = self.counts['tags']
+        self.tag_ids = [self.uuid() for _ in range(n)]
+        names = [WORDS[index] if index < len(WORDS) else f'{WORDS[index % len(WORDS)]}{index // len(WORDS)}'
+                 for index in range(n)]
+        self.insert_chunked(Tag, (
+            Tag(id=tag_id, name=name, created_at=self.past(730))
+            for tag_id, name in zip(self.tag_ids, names)
+        ), 'tags')
+        self.tag_weights = zipf_cum_weights(n, TAG_SKEW)
+
+    def prompt_context(self, prompt_type):
+        rng = self.rng
+        if prompt_type == 'image':
+            width, height = rng.choice(IMAGE_SIZES)
+            return {'model': rng.choice(IMAGE_MODELS), 'width': width, 'height': height,
+                    'style': rng.choice(IMAGE_STYLES), 'steps': rng.choice([20, 30, 50]),
+                    'negative_prompt': self.words(0, 8)}
+        if prompt_type == 'music':
+            return {'genre': rng.choice(MUSIC_GENRES), 'duration_seconds': rng.randint(30, 240),
+                    'bpm': rng.randint(60, 160), 'instruments': rng.sample(INSTRUMENTS, rng.randint(1, 4))}
+        return {'model': rng.choice(TEXT_MODELS), 'temperature': round(rng.uniform(0, 1.2), 2),
+                'max_tokens': rng.choice([256, 512, 1024, 2048])}
+
+    def seed_content(self):
+        # Global item table: (content type, id, created_at), shared by every
+        # interaction so that popularity is comparable across types
+        self.item_types, self.item_ids, self.item_created = [], [], []
+
+        def add_item(content_type, obj_id, created_at):
+            self.item_types.append(content_type)
+            self.item_ids.append(obj_id)
+            self.item_created.append(created_at)
+
+        def prompts():
+            for index in range(self.counts['prompts']):
+                prompt_type = self.rng.choices(['text', 'image', 'music'], weights=[6, 3, 1])[0]
+                title = self.words(3, 8).capitalize()
+                created_at = self.past(365)
+                prompt = Prompt(
+                    id=self.uuid(), type=prompt_type, title=title, slug=f'{slugify(title)[:200]}-{index}',
+                    body=self.words(20, 150), context=self.prompt_context(prompt_type),
+                    author_id=self.pick_author(), created_at=created_at, updated_at=created_at,
+                )
+                add_item(1, prompt.pk, created_at)
+                yield prompt
+
+        def articles(Model, content_type, key):
+            for index in range(self.counts[key]):
+                title = self.words(4, 10).capitalize()
+                created_at = self.past(365)
+                obj = Model(
+                    id=self.uuid(), title=title, slug=f'{slugify(title)[:200]}-{index}',
+                    content=self.words(150, 600), author_id=self.pick_author(moderators_only=True),
+                    created_at=created_at, updated_at=created_at,
+                )
+                add_item(content_type, obj.pk, created_at)
+                yield obj
+
+        def tools():
+            for index in range(self.counts['tools']):
+                name = self.words(1, 3).title()
+                created_at = self.past(365)
+                tool = Tool(
+                    id=self.uuid(), name=name, slug=f'{slugify(name)[:200]}-{index}',
+                    description=self.words(10, 60), url=f'https://{slugify(name)}-{index}.example.com',
+                    type_id=self.rng.choice(self.tool_type_ids) if self.tool_type_ids else None,
+                    author_id=self.pick_author(moderators_only=True),
+                    created_at=created_at, updated_at=created_at,
+                )
+                add_item(2, tool.pk, created_at)
+                yield tool
+
+        self.insert_chunked(Prompt, prompts(), 'prompts')
+        self.insert_chunked(Tool, tools(), 'tools')
+        self.insert_chunked(News, articles(News, 3, 'news'), 'news')
+        self.insert_chunked(Blog, articles(Blog, 4, 'blogs'), 'blogs')
+
+        # Popularity: a Zipf law over a shuffled order of all items
+        self.popularity = list(range(len(self.item_ids)))
+        self.rng.shuffle(self.popularity)
+        self.item_weights = zipf_cum_weights(len(self.item_ids), ITEM_SKEW)
+        size = len(self.item_ids)
+        self.upvotes, self.downvotes, self.comment_counts = [0] * size, [0] * size, [0] * size
+
+    def pick_items(self, count=1):
+        ranks = self.rng.choices(range(len(self.popularity)), cum_weights=self.item_weights, k=count)
+        return [self.popularity[rank] for rank in ranks]
+
+    def seed_taggables(self):
+        def rows():
+            for item in range(len(self.item_ids)):
+                tag_count = self.rng.choices(range(6), weights=[10, 20, 30, 20, 12, 8])[0]
+                for tag_index in self.distinct_picks(self.tag_weights, min(tag_count, len(self.tag_ids))):
+                    yield Taggable(tag_id=self.tag_ids[tag_index], taggable_type=self.item_types[item],
+                                   taggable_id=self.item_ids[item], created_at=self.item_created[item])
+
+        self.insert_chunked(Taggable, rows(), 'taggables')
+
+    def seed_relations(self):
+        prompts = [item for item in range(len(self.item_ids)) if self.item_types[item] == 1]
+        if len(prompts) < 2:
+            return
+        prompt_weights = zipf_cum_weights(len(prompts), ITEM_SKEW)
+        seen = set()
+
+        def rows():
+            for _ in range(self.counts['relations']):
+                source = self.rng.choices(prompts, cum_weights=prompt_weights)[0]
+                target = self.rng.choice(prompts)
+                relation_type = self.rng.choice(RELATION_TYPES)
+                if source == target or (source, target, relation_type) in seen:
+                    continue
+                seen.add((source, target, relation_type))
+                yield PromptRelation(
+                    source_prompt_id=self.item_ids[source], target_prompt_id=self.item_ids[target],
+                    relation_type=relation_type,
+                    created_at=self.after(max(self.item_created[source], self.item_created[target])),
+                )
+
+        self.insert_chunked(PromptRelation, rows(), 'prompt relations')
+
+    def seed_votes(self):
+        def rows():
+            for user_id, budget in zip(self.user_ids, self.per_user_budget(self.counts['votes'])):
+                for rank in self.distinct_picks(self.item_weights, budget):
+                    item = self.popularity[rank]
+                    content_type, obj_id = self.item_types[item], self.item_ids[item]
+                    value = 1 if self.rng.random() < 0.8 else -1
+                    if value == 1:
+                        self.upvotes[item] += 1
+                    else:
+                        self.downvotes[item] += 1
+                    when = self.after(self.item_created[item])
+                    yield Vote(user_id=user_id, votable_type=content_type, votable_id=obj_id, value=value,
+                               created_at=when, updated_at=when, **{f'{VOTE_FK_FIELDS[content_type]}_id': obj_id})
+
+        self.insert_chunked(Vote, rows(), 'votes')
+
+    def seed_bookmarks(self):
+        def rows():
+            for user_id, budget in zip(self.user_ids, self.per_user_budget(self.counts['bookmarks'])):
+                for rank in self.distinct_picks(self.item_weights, budget):
+                    item = self.popularity[rank]
+                    yield Bookmark(user_id=user_id, bookmarkable_type=self.item_types[item],
+                                   bookmarkable_id=self.item_ids[item],
+                                   created_at=self.after(self.item_created[item]))
+
+        self.insert_chunked(Bookmark, rows(), 'bookmarks')
+
+    def seed_comments(self):
+        if not self.item_ids:
+            return
+
+        def rows():
+            for _ in range(self.counts['comments']):
+                item = self.pick_items()[0]
+                self.comment_counts[item] += 1
+                when = self.after(self.item_created[item])
+                yield Comment(id=self.uuid(), commentable_type=self.item_types[item],
+                              commentable_id=self.item_ids[item], author_id=self.pick_author(),
+                              body=self.words(3, 60), is_edited=self.rng.random() < 0.05,
+                              created_at=when, updated_at=when)
+
+        self.insert_chunked(Comment, rows(), 'comments')
+
+    def write_counters(self):
+        """Stored upvotes/downvotes/score/comment_count and a view total that follows popularity."""
+        fields = ['views', 'upvotes', 'downvotes', 'score', 'comment_count']
+        pending = {}
+        for rank, item in enumerate(self.popularity):
+            content_type = self.item_types[item]
+            up, down = self.upvotes[item], self.downvotes[item]
+            views = int(50_000 / (rank + 1) ** 0.9 * self.rng.uniform(0.5, 1.5)) + self.rng.randint(0, 50)
+            pending.setdefault(content_type, []).append(get_content_model(content_type)(
+                pk=self.item_ids[item], views=views, upvotes=up, downvotes=down, score=up - down,
+                comment_count=self.comment_counts[item],
+            ))
+        for content_type, objects in pending.items():
+            Model = get_content_model(content_type)
+            for start in range(0, len(objects), self.chunk_size):
+                with transaction.atomic():
+                    Model.objects.bulk_update(objects[start:start + self.chunk_size], fields)
+        self.log('counters written')
+
+    def rebuild_derived(self):
+        self.log(f'tag counts: {reconcile_usage_counts(chunk_size=self.chunk_size)} fixed')
+        if get_search_backend() is not None:
+            for content_type, (_, title_field, body_field) in SEARCHABLE_MODELS.items():
+                Model = get_searchable_model(content_type)
+                objects = Model._base_manager.only('pk', title_field, body_field).iterator(chunk_size=self.chunk_size)
+                while chunk := list(itertools.islice(objects, self.chunk_size)):
+                    index_objects(content_type, chunk)
+            self.log('search index rebuilt')
+        self.log(f'trending ranks: {recompute(chunk_size=self.chunk_size, now=self.anchor)}')
+        bump_generation(*INVALIDATING_MODELS)
@@ -0,0 +1,76 @@
+import os
+from datetime import datetime, timezone as dt_timezone
+from pathlib import Path
+from django.conf import settings
+from django.test import TestCase, override_settings
+from django.urls import URLResolver, get_resolver
+from .endpoints import ENDPOINTS
+from .runner import EndpointBenchmark, compare, load_baseline, save_baseline
+from .seed import BenchmarkSeeder
+
+BASELINE_PATH = Path(__file__).parent / 'baselines' / 'test_dataset.json'
+
+# Small enough to seed in a second or two, big enough that every page size
+# below is full and every content type shows up on the mixed listings
+TEST_SEED = 7
+TEST_COUNTS = {
+    'users': 40, 'tool_types': 5, 'tags': 30, 'prompts': 120, 'blogs': 60, 'news': 60, 'tools': 60,
+    'relations': 100, 'votes': 1500, 'bookmarks': 300, 'comments': 400,
+}
+TEST_ANCHOR = datetime(2026, 1, 1, tzinfo=dt_timezone.utc)
+TEST_PAGE_SIZES = (5, 50)
+
+
+def seed_test_dataset():
+    BenchmarkSeeder(seed=TEST_SEED, counts=TEST_COUNTS, anchor=TEST_ANCHOR).run()
+
+
+def viewset_routes(patterns=None):
+    """Names of every URL pattern served by a viewset."""
+    names = set()
+    for pattern in get_resolver().url_patterns if patterns is None else patterns:
+        if isinstance(pattern, URLResolver):
+            names |= viewset_routes(pattern.url_patterns)
+        elif pattern.name and pattern.name != 'api-root' and hasattr(pattern.callback, 'actions'):
+            names.add(pattern.name)
+    return names
+
+
+class EndpointCoverageTests(TestCase):
+    def test_every_viewset_route_is_benchmarked(self):
+        missing = viewset_routes() - {endpoint.route for endpoint in ENDPOINTS}
+        self.assertFalse(missing, f'Add these routes to benchmarks.endpoints.ENDPOINTS: {sorted(missing)}')
+
+
+# Budgets assume the shared user cache production runs with (Redis), so the
+# per-request user lookup isn't counted against every authenticated endpoint
+SHARED_USER_CACHE = {
+    'CACHES': {**settings.CACHES, 'users': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'users'}},
+    'USER_CACHE_ALIAS': 'users',
+}
+
+
+@override_settings(**SHARED_USER_CACHE)
+class QueryBudgetTests(TestCase):
+    """
+    Every endpoint stays within its query budget, doesn't run more queries on
+    bigger pages and runs no more queries than the committed baseline.
+    Latency is not checked here; use manage.py benchmark_endpoints for that.
+    After an intended change, regenerate the baseline with
+    `BENCHMARK_UPDATE_BASELINE=1 python manage.py test benchmarks`.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_test_dataset()
+
+    def test_query_budgets(self):
+        results = EndpointBenchmark(page_sizes=TEST_PAGE_SIZES, repeat=1).run()
+        if os.environ.get('BENCHMARK_UPDATE_BASELINE'):
+            BASELINE_PATH.parent.mkdir(exist_ok=True)
+            save_baseline(BASELINE_PATH, results)
+
+        baseline = load_baseline(BASELINE_PATH)
+        self.assertEqual(sorted(results), sorted(baseline['results']), 'Baseline is out of date')
+        failures = compare(results, baseline)
+        self.assertFalse(failures, '\n' + '\n'.join(failures))
@@ -0,0 +1,149 @@
+import hashlib
+from django.db.models import Count, Exists, Max, OuterRef, Subquery, Sum
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, parse_http_date_safe
+from rest_framework import status
+from interactions.models import Bookmark, Vote
+from .generations import get_generations
+from .mixins import CacheDependenciesMixin
+
+
+class ConditionalGetMixin(CacheDependenciesMixin):
+    """
+    ETag / Last-Modified support for list and retrieve.
+    Validators come from one cheap query, so a matching If-None-Match or
+    If-Modified-Since is answered with 304 before the serializer runs:
+      - detail (ETag only): the row alone, i.e. id, `last_modified_field`, the
+        `etag_fields` counters and any `detail_etag_fields` the former
+        doesn't track, plus the user's own vote and bookmark on it.
+        Tags are only set by writes to the object, which move
+        `last_modified_field`, so activity on other objects never changes it.
+      - list: count, max `last_modified_field` and the sum of each counter
+        over the filtered queryset, plus the query params and the
+        generations of `cache_dependencies` (tags, votes, ...) and, for
+        authenticated users, of `viewer_dependencies`.
+    Responses served from the response cache (CachedResponseMixin) carry the
+    validators computed on the miss that stored them, so hits run no query.
+    Otherwise the list aggregate, which scans the filtered table, only runs
+    for conditional requests; the one-row detail validators always do.
+    """
+    last_modified_field = 'updated_at'
+    etag_fields = ()
+    detail_etag_fields = ()
+    viewer_dependencies = ('interactions.Vote', 'interactions.Bookmark')
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(super().list, self.get_list_validators, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().retrieve, self.get_detail_validators, request, *args, eager=True, **kwargs
+        )
+
+    def get_viewer_annotations(self, request):
+        """The user's vote and bookmark on the row, for serializers with per-user fields."""
+        content_type = getattr(self.get_serializer_class(), 'viewer_content_type', None)
+        if content_type is None or not request.user.is_authenticated:
+            return {}
+        return {
+            'viewer_vote': Subquery(Vote.objects.filter(
+                user=request.user, votable_type=content_type, votable_id=OuterRef('pk')
+            ).values('value')[:1]),
+            'viewer_bookmarked': Exists(Bookmark.objects.filter(
+                user=request.user, bookmarkable_type=content_type, bookmarkable_id=OuterRef('pk')
+            )),
+        }
+
+    def get_detail_validators(self, request, *args, **kwargs):
+        """
+        (etag source, None), or None when the object does not exist.
+        No Last-Modified: votes, comments and view flushes move the counters
+        with F() updates that leave `last_modified_field` alone.
+        """
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        viewer = self.get_viewer_annotations(request)
+        fields = [
+            'pk', *filter(None, [self.last_modified_field]), *self.etag_fields, *self.detail_etag_fields, *viewer
+        ]
+        row = self.filter_queryset(self.get_queryset()).filter(
+            **{self.lookup_field: kwargs[lookup_url_kwarg]}
+        ).annotate(**viewer).values_list(*fields).first()
+        if row is None:
+            return None
+        return row, None
+
+    def get_list_validators(self, request, *args, **kwargs):
+        aggregates = {'count': Count('pk')}
+        if self.last_modified_field:
+            aggregates['last_modified'] = Max(self.last_modified_field)
+        for field in self.etag_fields:
+            aggregates[f'{field}_sum'] = Sum(field)
+        row = self.filter_queryset(self.get_queryset()).order_by().aggregate(**aggregates)
+        params = sorted((key, value) for key, values in request.query_params.lists() for value in values)
+
+        # Rows enter and leave filtered lists through other models (tags, votes)
+        labels = self.get_cache_dependencies(request)
+        if request.user.is_authenticated:
+            labels.extend(self.viewer_dependencies)
+        generations = get_generations(labels)
+        timestamps = [generation / 1e9 for generation in generations]
+        if row.get('last_modified'):
+            timestamps.append(row['last_modified'].timestamp())
+        return (sorted(row.items(), key=str), params, generations), max(timestamps, default=None)
+
+    def get_validator_headers(self, request, get_validators, *args, **kwargs):
+        """{'ETag': ..., 'Last-Modified': ...}, or {} when the object does not exist."""
+        validators = get_validators(request, *args, **kwargs)
+        if validators is None:
+            return {}
+        source, last_modified = validators
+        user_id = request.user.pk if request.user.is_authenticated else None
+        digest = hashlib.md5(repr((self.basename, self.action, source, user_id)).encode()).hexdigest()
+        headers = {'ETag': f'W/"{digest}"'}
+        if last_modified:
+            headers['Last-Modified'] = http_date(int(last_modified))
+        return headers
+
+    def get_cached_response_headers(self, request, *args, **kwargs):
+        headers = super().get_cached_response_headers(request, *args, **kwargs)
+        get_validators = {'list': self.get_list_validators, 'retrieve': self.get_detail_validators}.get(self.action)
+        if get_validators:
+            headers.update(self.get_validator_headers(request, get_validators, *args, **kwargs))
+        return headers
+
+    def not_modified(self, request, headers, response=None):
+        """A 304 when the request's conditional headers match, else response (None if not given)."""
+        if not headers:
+            return response
+        return get_conditional_response(
+            request._request,
+            etag=headers.get('ETag'),
+            last_modified=parse_http_date_safe(headers.get('Last-Modified', '')),
+            response=response,
+        )
+
+    def conditional_response(self, handler, get_validators, request, *args, eager=False, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return handler(request, *args, **kwargs)
+
+        is_response_cacheable = getattr(self, 'is_response_cacheable', None)
+        if is_response_cacheable and is_response_cacheable(request):
+            response = handler(request, *args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                headers = {header: response[header] for header in ('ETag', 'Last-Modified') if header in response}
+                not_modified = self.not_modified(request, headers, response)
+                if not_modified is not response:
+                    not_modified['X-Cache'] = response['X-Cache']
+                response = not_modified
+        else:
+            headers = {}
+            if eager or 'If-None-Match' in request.headers or 'If-Modified-Since' in request.headers:
+                headers = self.get_validator_headers(request, get_validators, *args, **kwargs)
+            response = self.not_modified(request, headers) or handler(request, *args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                for header, value in headers.items():
+                    response[header] = value
+
+        if response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            patch_vary_headers(response, ['Authorization'])
+        return response
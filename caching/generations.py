@@ -0,0 +1,41 @@
+import time
+from django.core.cache import cache
+from django.db import transaction
+
+GENERATION_KEY_PREFIX = 'respcache:gen:'
+
+
+def generation_key(model_label):
+    return f'{GENERATION_KEY_PREFIX}{model_label.lower()}'
+
+
+def get_generations(model_labels):
+    """
+    Current generation of each model label, as a tuple in the given order.
+    A generation is the time of the model's last write in nanoseconds, so it
+    doubles as a Last-Modified value. Missing counters are seeded from the
+    clock, so an evicted counter never falls back to an older value.
+    """
+    keys = [generation_key(label) for label in model_labels]
+    generations = cache.get_many(keys)
+    for key in keys:
+        if key not in generations:
+            cache.add(key, time.time_ns(), timeout=None)
+            generations[key] = cache.get(key)
+    return tuple(generations[key] for key in keys)
+
+
+def bump_generation(*model_labels):
+    """
+    Invalidate every cached response that depends on these models.
+    Deferred until the surrounding transaction commits, so a concurrent
+    reader cannot cache the old rows under the new generation.
+    """
+    transaction.on_commit(lambda: _bump(model_labels))
+
+
+def _bump(model_labels):
+    for label in model_labels:
+        key = generation_key(label)
+        # Never move backwards, even if another worker's clock is behind
+        cache.set(key, max(time.time_ns(), (cache.get(key) or 0) + 1), timeout=None)
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from caching.stats import cache_stats
+
+
+class Command(BaseCommand):
+    help = 'Show hit/miss counts of the anonymous response cache, per viewset action'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='Zero the counters after printing them')
+
+    def handle(self, *args, **options):
+        totals = cache_stats.totals()
+        if not totals:
+            self.stdout.write('No response cache traffic recorded yet')
+        for name, counts in sorted(totals.items()):
+            requests = counts['hit'] + counts['miss']
+            ratio = counts['hit'] / requests if requests else 0
+            self.stdout.write(f"{name}: {counts['hit']} hits, {counts['miss']} misses ({ratio:.1%} hit rate)")
+        if options['reset']:
+            cache_stats.reset()
+            self.stdout.write(self.style.SUCCESS('Counters reset'))
@@ -0,0 +1,93 @@
+import hashlib
+from urllib.parse import urlencode
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.response import Response
+from .generations import get_generations
+from .stats import cache_stats
+
+# v2: entries are (data, headers)
+RESPONSE_KEY_PREFIX = 'respcache:resp2:'
+
+
+class CacheDependenciesMixin:
+    """
+    Models a viewset's responses are built from, as app labels.
+    Filter backends can add more for the current request by defining
+    get_cache_dependencies(request, view).
+    """
+    cache_dependencies = ()
+
+    def get_cache_dependencies(self, request):
+        labels = list(self.cache_dependencies)
+        for backend in getattr(self, 'filter_backends', []):
+            get_extra = getattr(backend, 'get_cache_dependencies', None)
+            if get_extra:
+                labels.extend(get_extra(backend(), request, self))
+        return labels
+
+
+class CachedResponseMixin(CacheDependenciesMixin):
+    """
+    Shared cache for anonymous GET responses of a viewset.
+    The serialized data is cached under a key made of the viewset, action,
+    host, path, sorted query params and the current generation of every model
+    in `cache_dependencies`; saving or deleting any of those models bumps its
+    generation (caching.signals), so stale entries are never read again.
+    Authenticated requests always bypass the cache, since they carry
+    per-user fields (is_bookmarked, user_vote).
+    Headers from get_cached_response_headers (e.g. the ETag) are stored with
+    the data and sent again on every hit.
+    """
+    cached_actions = ('list', 'retrieve')
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+    def is_response_cacheable(self, request):
+        return (
+            getattr(settings, 'RESPONSE_CACHE_ENABLED', True)
+            and request.method == 'GET'
+            and self.action in self.cached_actions
+            and not request.user.is_authenticated
+        )
+
+    def get_response_cache_key(self, request):
+        params = sorted((key, value) for key, values in request.query_params.lists() for value in values)
+        generations = get_generations(self.get_cache_dependencies(request))
+        raw = '|'.join([request.get_host(), request.path, urlencode(params), repr(generations)])
+        digest = hashlib.md5(raw.encode()).hexdigest()
+        return f'{RESPONSE_KEY_PREFIX}{self.basename}:{self.action}:{digest}'
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        if not self.is_response_cacheable(request):
+            return handler(request, *args, **kwargs)
+
+        name = f'{self.basename}-{self.action}'
+        key = self.get_response_cache_key(request)
+        entry = cache.get(key)
+        if entry is not None:
+            cache_stats.record(name, 'hit')
+            data, headers = entry
+            response = Response(data, headers=headers)
+            response['X-Cache'] = 'HIT'
+            return response
+
+        cache_stats.record(name, 'miss')
+        # Before the handler, so the headers never describe newer data than the body
+        headers = self.get_cached_response_headers(request, *args, **kwargs)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            for header, value in headers.items():
+                response[header] = value
+            cache.set(key, (response.data, headers), getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 300))
+        response['X-Cache'] = 'MISS'
+        return response
+
+    def get_cached_response_headers(self, request, *args, **kwargs):
+        """Headers to store with a response about to be cached."""
+        return {}
@@ -0,0 +1,29 @@
+from django.apps import apps
+from django.db.models.signals import post_delete, post_save
+from .generations import bump_generation
+
+# Models whose writes invalidate cached responses and conditional GET
+# validators. Bulk writes that skip these signals (tags.services) bump the
+# generation themselves.
+INVALIDATING_MODELS = [
+    'prompts.Prompt',
+    'content.Blog',
+    'content.News',
+    'content.Tool',
+    'content.ToolType',
+    'tags.Tag',
+    'tags.Taggable',
+    'interactions.Vote',
+    'interactions.Comment',
+    'interactions.Bookmark',
+]
+
+
+def invalidate_responses(sender, **kwargs):
+    bump_generation(sender._meta.label)
+
+
+for model_label in INVALIDATING_MODELS:
+    model = apps.get_model(model_label)
+    post_save.connect(invalidate_responses, sender=model, dispatch_uid=f'respcache_save_{model_label}')
+    post_delete.connect(invalidate_responses, sender=model, dispatch_uid=f'respcache_delete_{model_label}')
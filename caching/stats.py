@@ -0,0 +1,89 @@
+import threading
+import time
+from collections import Counter
+from django.conf import settings
+from django.core.cache import cache
+
+STATS_KEY_PREFIX = 'respcache:stats:'
+OUTCOMES = ('hit', 'miss')
+
+
+def stats_key(name, outcome):
+    return f'{STATS_KEY_PREFIX}{name}:{outcome}'
+
+
+class CacheStats:
+    """
+    Hit/miss counters for the response cache.
+    Counted in process memory and added to the shared cache by the first
+    request after RESPONSE_CACHE_STATS_FLUSH_INTERVAL seconds, so every worker
+    contributes to the same totals without a cache write per request. There
+    is no flush at exit (the cache may already be gone); a stopping worker
+    loses at most one interval of counts. The totals are best effort: counts
+    in a key the cache evicts are gone, and never worth failing a request for.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = Counter()
+        self._names = set()
+        self._last_flush = time.monotonic()
+
+    @property
+    def flush_interval(self):
+        return getattr(settings, 'RESPONSE_CACHE_STATS_FLUSH_INTERVAL', 10)
+
+    def record(self, name, outcome):
+        with self._lock:
+            self._pending[(name, outcome)] += 1
+            due = time.monotonic() - self._last_flush >= self.flush_interval
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+            self._last_flush = time.monotonic()
+        for (name, outcome), count in pending.items():
+            self._add(stats_key(name, outcome), count)
+        # Keep a registry of names so the totals can be listed. Two workers
+        # adding names at once can drop each other's; every flush re-adds
+        # whatever this process has seen that is missing, so a lost name
+        # comes back with that worker's next flush.
+        if pending:
+            self._names.update(name for name, _ in pending)
+            names = set(cache.get(f'{STATS_KEY_PREFIX}names') or ())
+            if not self._names <= names:
+                cache.set(f'{STATS_KEY_PREFIX}names', sorted(names | self._names), timeout=None)
+
+    @staticmethod
+    def _add(key, count):
+        for _ in range(2):
+            if cache.add(key, count, timeout=None):
+                return
+            try:
+                cache.incr(key, count)
+                return
+            except ValueError:
+                # Evicted or expired between add and incr: add it again
+                continue
+
+    def totals(self):
+        """{name: {'hit': n, 'miss': n}} from the shared cache, including this process."""
+        self.flush()
+        names = cache.get(f'{STATS_KEY_PREFIX}names') or []
+        values = cache.get_many([stats_key(name, outcome) for name in names for outcome in OUTCOMES])
+        return {
+            name: {outcome: values.get(stats_key(name, outcome), 0) for outcome in OUTCOMES}
+            for name in names
+        }
+
+    def reset(self):
+        with self._lock:
+            self._pending.clear()
+            self._names.clear()
+        names = cache.get(f'{STATS_KEY_PREFIX}names') or []
+        cache.delete_many([stats_key(name, outcome) for name in names for outcome in OUTCOMES])
+        cache.delete(f'{STATS_KEY_PREFIX}names')
+
+
+cache_stats = CacheStats()
@@ -0,0 +1,192 @@
+from unittest import mock
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from accounts.models import User
+from interactions.models import Bookmark
+from interactions.votes import cast_vote
+from prompts.models import Prompt
+from .generations import bump_generation, generation_key, get_generations
+from .stats import CacheStats, cache_stats
+
+
+class GenerationTests(TestCase):
+    def setUp(self):
+        cache.delete_many([generation_key('prompts.Prompt'), generation_key('tags.Tag')])
+
+    def test_missing_generations_are_seeded_once(self):
+        first = get_generations(['prompts.Prompt', 'tags.Tag'])
+        self.assertEqual(get_generations(['prompts.Prompt', 'tags.Tag']), first)
+
+    def test_bump_waits_for_commit_and_never_goes_back(self):
+        before, = get_generations(['prompts.Prompt'])
+        with self.captureOnCommitCallbacks() as callbacks:
+            bump_generation('prompts.Prompt')
+        self.assertEqual(get_generations(['prompts.Prompt']), (before,))
+
+        cache.set(generation_key('prompts.Prompt'), before + 10 ** 18, timeout=None)
+        for callback in callbacks:
+            callback()
+        self.assertEqual(get_generations(['prompts.Prompt']), (before + 10 ** 18 + 1,))
+
+
+class ResponseCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(email='author@example.com', username='author', password='pass12345')
+        Prompt.objects.create(title='First', body='body', author=cls.author, type='text')
+
+    def setUp(self):
+        cache.clear()
+        cache_stats.reset()
+        self.client = APIClient()
+
+    def get(self):
+        response = self.client.get('/api/prompts/')
+        return response['X-Cache'], response.data['count']
+
+    @override_settings(RESPONSE_CACHE_STATS_FLUSH_INTERVAL=0)
+    def test_writes_invalidate_cached_lists(self):
+        self.assertEqual(self.get(), ('MISS', 1))
+        self.assertEqual(self.get(), ('HIT', 1))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Prompt.objects.create(title='Second', body='body', author=self.author, type='text')
+        self.assertEqual(self.get(), ('MISS', 2))
+        self.assertEqual(self.get(), ('HIT', 2))
+        self.assertEqual(cache_stats.totals()['prompt-list'], {'hit': 2, 'miss': 2})
+
+    def test_authenticated_requests_bypass_the_cache(self):
+        self.client.force_authenticate(self.author)
+        self.assertNotIn('X-Cache', self.client.get('/api/prompts/'))
+
+
+class CacheStatsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_counts_are_added_at_the_interval(self):
+        stats = CacheStats()
+        with self.settings(RESPONSE_CACHE_STATS_FLUSH_INTERVAL=60):
+            stats.record('prompt-list', 'hit')
+            stats.record('prompt-list', 'miss')
+            self.assertIsNone(cache.get('respcache:stats:names'))
+
+        other_worker = CacheStats()
+        with self.settings(RESPONSE_CACHE_STATS_FLUSH_INTERVAL=0):
+            other_worker.record('prompt-list', 'hit')
+            other_worker.record('tag-list', 'miss')
+        self.assertEqual(stats.totals(), {
+            'prompt-list': {'hit': 2, 'miss': 1},
+            'tag-list': {'hit': 0, 'miss': 1},
+        })
+
+        stats.reset()
+        self.assertEqual(stats.totals(), {})
+
+    @override_settings(RESPONSE_CACHE_STATS_FLUSH_INTERVAL=0)
+    def test_evicted_keys_never_fail_the_request(self):
+        stats = CacheStats()
+        stats.record('prompt-list', 'hit')
+        # The key disappears between add() and incr()
+        with mock.patch.object(cache, 'add', side_effect=[False, True]), \
+                mock.patch.object(cache, 'incr', side_effect=ValueError):
+            stats.record('prompt-list', 'hit')
+        with mock.patch.object(cache, 'add', return_value=False), \
+                mock.patch.object(cache, 'incr', side_effect=ValueError):
+            stats.record('prompt-list', 'hit')
+        self.assertEqual(stats.totals()['prompt-list']['hit'], 1)
+
+    @override_settings(RESPONSE_CACHE_STATS_FLUSH_INTERVAL=0)
+    def test_names_lost_to_a_concurrent_writer_come_back(self):
+        stats = CacheStats()
+        stats.record('prompt-list', 'hit')
+        # Another worker read the registry before our write and overwrote it
+        cache.set('respcache:stats:names', ['tag-list'], timeout=None)
+        stats.record('prompt-list', 'miss')
+        self.assertEqual(sorted(stats.totals()), ['prompt-list', 'tag-list'])
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(email='author@example.com', username='author', password='pass12345')
+        cls.prompt = Prompt.objects.create(title='Watched', body='body', author=cls.author, type='text')
+        cls.other = Prompt.objects.create(title='Other', body='body', author=cls.author, type='text')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.url = f'/api/prompts/{self.prompt.slug}/'
+
+    def etag(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return response['ETag']
+
+    def test_matching_etag_gets_304(self):
+        etag = self.etag()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response.content, b'')
+
+    def test_detail_has_no_last_modified(self):
+        response = self.client.get(self.url)
+        self.assertNotIn('Last-Modified', response)
+        with self.captureOnCommitCallbacks(execute=True):
+            cast_vote(self.author, 1, self.prompt.pk, 1)
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE='Fri, 01 Jan 2100 00:00:00 GMT')
+        self.assertEqual((response.status_code, response.data['score']), (200, 1))
+
+    def test_edits_change_the_etag(self):
+        etag = self.etag()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.prompt.title = 'Watched closely'
+            self.prompt.save()
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_only_votes_on_the_object_change_its_etag(self):
+        etag = self.etag()
+        with self.captureOnCommitCallbacks(execute=True):
+            cast_vote(self.author, 1, self.other.pk, 1)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            cast_vote(self.author, 1, self.prompt.pk, 1)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_viewer_state_changes_the_etag(self):
+        self.client.force_authenticate(self.author)
+        etag = self.etag()
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        Bookmark.objects.create(user=self.author, bookmarkable_type=1, bookmarkable_id=self.prompt.pk)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def list_queries(self, **headers):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/prompts/', **headers)
+        return response, [query['sql'] for query in queries if 'FROM "prompts"' in query['sql']]
+
+    def test_cache_hits_answer_from_the_stored_validators(self):
+        cache.clear()
+        response, _ = self.list_queries()
+        etag = response['ETag']
+        response, queries = self.list_queries(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual((response.status_code, response['X-Cache']), (304, 'HIT'))
+        self.assertEqual(queries, [])
+        response, queries = self.list_queries()
+        self.assertEqual((response.status_code, response['X-Cache'], response['ETag']), (200, 'HIT', etag))
+        self.assertEqual(queries, [])
+
+    def test_uncached_lists_aggregate_only_for_conditional_requests(self):
+        self.client.force_authenticate(self.author)
+        response, queries = self.list_queries()
+        self.assertNotIn('ETag', response)
+        self.assertFalse(any('SUM(' in sql for sql in queries))
+
+        response, queries = self.list_queries(HTTP_IF_MODIFIED_SINCE='Thu, 01 Jan 1970 00:00:00 GMT')
+        self.assertTrue(any('SUM(' in sql for sql in queries))
+        response, _ = self.list_queries(HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
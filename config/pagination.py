@@ -0,0 +1,159 @@
+import base64
+import json
+from collections import OrderedDict
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetCursorPagination(BasePagination):
+    """
+    Keyset ("seek") pagination on (field, id).
+    The cursor is an opaque token holding the last row's key, so page N costs
+    the same indexed range scan as page 1 and no COUNT(*) is run.
+    Views choose the allowed key fields with `cursor_ordering_fields`
+    (default: created_at); clients pick one with ?ordering=, e.g. -score.
+    Fields the model doesn't have are skipped; with none left the key is pk.
+    """
+    cursor_query_param = 'cursor'
+    ordering_param = 'ordering'
+    page_size = api_settings.PAGE_SIZE
+    default_ordering = '-created_at'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def __init__(self, page_size=None):
+        if page_size is not None:
+            self.page_size = page_size
+
+    @staticmethod
+    def get_key_field(model, name):
+        return model._meta.pk if name == 'pk' else model._meta.get_field(name)
+
+    def get_ordering(self, request, view, model):
+        allowed = []
+        for name in getattr(view, 'cursor_ordering_fields', ['created_at']):
+            try:
+                self.get_key_field(model, name)
+            except FieldDoesNotExist:
+                continue
+            allowed.append(name)
+        allowed = allowed or ['pk']
+        ordering = request.query_params.get(self.ordering_param, '').strip()
+        if ordering.lstrip('-') in allowed:
+            return ordering
+        default = getattr(view, 'cursor_default_ordering', self.default_ordering)
+        return default if default.lstrip('-') in allowed else '-' + allowed[0]
+
+    def encode_cursor(self, obj, reverse=False):
+        value = getattr(obj, self.field)
+        if hasattr(value, 'isoformat'):
+            value = value.isoformat()
+        elif not isinstance(value, (int, float, str)):
+            value = str(value)
+        payload = {'o': self.ordering, 'v': value, 'id': str(obj.pk), 'r': int(reverse)}
+        token = base64.urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode())
+        return token.decode().rstrip('=')
+
+    def decode_cursor(self, request, model):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            padded = token + '=' * (-len(token) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            if payload['o'] != self.ordering:
+                raise ValueError('ordering changed')
+            value = self.get_key_field(model, self.field).to_python(payload['v'])
+            pk = model._meta.pk.to_python(payload['id'])
+            return value, pk, bool(payload.get('r'))
+        except (TypeError, ValueError, KeyError, ValidationError, FieldDoesNotExist):
+            raise NotFound(self.invalid_cursor_message)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.ordering = self.get_ordering(request, view, queryset.model)
+        self.field = self.ordering.lstrip('-')
+        descending = self.ordering.startswith('-')
+
+        cursor = self.decode_cursor(request, queryset.model)
+        reverse = bool(cursor and cursor[2])
+        # Walking backwards flips the scan direction; rows are re-reversed below
+        scan_descending = descending != reverse
+        prefix = '-' if scan_descending else ''
+        queryset = queryset.order_by(*dict.fromkeys([f'{prefix}{self.field}', f'{prefix}pk']))
+
+        if cursor:
+            value, pk, _ = cursor
+            op = 'lt' if scan_descending else 'gt'
+            condition = Q(**{f'{self.field}__{op}': value})
+            if self.field != 'pk':
+                condition |= Q(**{self.field: value, f'pk__{op}': pk})
+            queryset = queryset.filter(condition)
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+
+        self.page = rows
+        return rows
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[0], reverse=True))
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+
+class StandardPagination(PageNumberPagination):
+    """
+    Default pagination: page numbers, or keyset pagination when the request
+    carries a `cursor` parameter (send `cursor=` for the first page).
+    Both honour ?page_size= up to max_page_size.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self.cursor_query_param in request.query_params:
+            self.keyset = KeysetCursorPagination(page_size=self.get_page_size(request))
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_next_link(self):
+        if self.keyset:
+            return self.keyset.get_next_link()
+        return super().get_next_link()
+
+    def get_previous_link(self):
+        if self.keyset:
+            return self.keyset.get_previous_link()
+        return super().get_previous_link()
@@ -34,9 +34,16 @@ INSTALLED_APPS = [
     'content',
     'interactions',
     'tags',
+    'search',
+    'caching',
+    'trending',
+    'benchmarks',
+    'instrumentation',
 ]
 
 MIDDLEWARE = [
+    'instrumentation.middleware.RequestInstrumentationMiddleware',
+    'instrumentation.nplusone.NPlusOneDetectionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -45,6 +52,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'instrumentation.profiler.ProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'config.urls'
@@ -78,10 +86,20 @@ WSGI_APPLICATION = 'config.wsgi.application'
     }
 } """
 
+# SQLite: IMMEDIATE transactions take the write lock up front, so concurrent
+# writers queue on the busy timeout instead of failing with "database is
+# locked". Tests use a file database so threads share real locking.
+SQLITE_OPTIONS = {
+    'transaction_mode': 'IMMEDIATE',
+    'timeout': 20,
+}
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': SQLITE_OPTIONS,
+        'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
     }
 }
 
@@ -90,6 +108,8 @@ if DEBUG and os.environ.get('USE_SQLITE', 'False') == 'True':
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': BASE_DIR / 'db.sqlite3',
+            'OPTIONS': SQLITE_OPTIONS,
+            'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
         }
     }
 
@@ -133,12 +153,12 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'config.pagination.StandardPagination',
     'PAGE_SIZE': 20,
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
@@ -180,6 +200,8 @@ SIMPLE_JWT = {
     'TOKEN_USER_CLASS': 'rest_framework_simplejwt.models.TokenUser',
 
     'JTI_CLAIM': 'jti',
+
+    'TOKEN_REFRESH_SERIALIZER': 'accounts.serializers.BlacklistFilteredTokenRefreshSerializer',
 }
 
 CORS_ALLOWED_ORIGINS = os.environ.get(
@@ -208,8 +230,11 @@ CORS_ALLOW_HEADERS = [
     'user-agent',
     'x-csrftoken',
     'x-requested-with',
+    'x-profile',
 ]
 
+CORS_EXPOSE_HEADERS = ['ETag', 'Last-Modified', 'X-Cache', 'X-Profile-Id']
+
 if not DEBUG:
     SECURE_SSL_REDIRECT = True
     SESSION_COOKIE_SECURE = True
@@ -280,12 +305,111 @@ if not DEBUG:
     DEFAULT_FROM_EMAIL = os.environ.get(
         'DEFAULT_FROM_EMAIL', 'noreply@promptplatform.com')
     
-CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'LOCATION': 'unique-snowflake',
+# Shared by all workers: Redis when REDIS_URL is set (needs the `redis` package),
+# otherwise the database cache table (created by the caching app's migration).
+REDIS_URL = os.environ.get('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        },
+        'users': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            'KEY_PREFIX': 'users',
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'cache_entries',
+            'OPTIONS': {'MAX_ENTRIES': 50000},
+        },
     }
+
+# Anonymous GET response cache (caching.mixins.CachedResponseMixin).
+# Entries are invalidated by model writes; the timeout only bounds how long
+# buffered view counts in cached bodies can lag behind.
+RESPONSE_CACHE_ENABLED = os.environ.get('RESPONSE_CACHE_ENABLED', 'True') == 'True'
+RESPONSE_CACHE_TIMEOUT = int(os.environ.get('RESPONSE_CACHE_TIMEOUT', 300))  # seconds
+RESPONSE_CACHE_STATS_FLUSH_INTERVAL = int(os.environ.get('RESPONSE_CACHE_STATS_FLUSH_INTERVAL', 10))  # seconds
+
+# Authenticated user cache (accounts.authentication.CachedJWTAuthentication).
+# Only with Redis: a per-process cache would miss other workers' invalidations
+# and keep serving revoked roles or deactivated users, and reading the database
+# cache would cost the query it saves. None reads the users table every time.
+USER_CACHE_ALIAS = 'users' if REDIS_URL else None
+USER_CACHE_TIMEOUT = int(os.environ.get('USER_CACHE_TIMEOUT', 60))  # seconds
+
+# Refresh token blacklist Bloom filter (accounts.blacklist). Size the capacity
+# for the blacklisted tokens alive at once (refreshes per REFRESH_TOKEN_LIFETIME);
+# expired ones are removed by `manage.py compact_token_blacklist`.
+TOKEN_BLACKLIST_FILTER_CAPACITY = int(os.environ.get('TOKEN_BLACKLIST_FILTER_CAPACITY', 1000000))
+TOKEN_BLACKLIST_FILTER_ERROR_RATE = float(os.environ.get('TOKEN_BLACKLIST_FILTER_ERROR_RATE', 0.001))
+TOKEN_BLACKLIST_FILTER_SYNC_INTERVAL = int(os.environ.get('TOKEN_BLACKLIST_FILTER_SYNC_INTERVAL', 30))  # seconds
+
+# Per-request instrumentation (instrumentation.middleware): query count and
+# time, serializer, auth and total time, appended to INSTRUMENTATION_LOG_PATH
+# as one JSON line per request (empty disables it). The Server-Timing header
+# shows them to every client, so it is on in DEBUG only by default.
+INSTRUMENTATION_ENABLED = os.environ.get('INSTRUMENTATION_ENABLED', 'True') == 'True'
+INSTRUMENTATION_SERVER_TIMING = os.environ.get('INSTRUMENTATION_SERVER_TIMING', str(DEBUG)) == 'True'
+INSTRUMENTATION_LOG_PATH = os.environ.get('INSTRUMENTATION_LOG_PATH', str(BASE_DIR / 'logs' / 'requests.jsonl')) or None
+INSTRUMENTATION_FLUSH_INTERVAL = float(os.environ.get('INSTRUMENTATION_FLUSH_INTERVAL', 1))  # seconds
+INSTRUMENTATION_MAX_PENDING = int(os.environ.get('INSTRUMENTATION_MAX_PENDING', 10000))  # queued records; more are dropped
+
+# Prometheus /metrics (instrumentation.prometheus). Every worker writes its
+# totals to a file in METRICS_DIR, so one scrape covers all gunicorn workers;
+# empty keeps them per process. With METRICS_TOKEN set, scrapes must send
+# `Authorization: Bearer <token>`; without it they are only accepted from
+# METRICS_ALLOWED_IPS (addresses or networks), or from anywhere in DEBUG.
+METRICS_DIR = os.environ.get('METRICS_DIR', str(BASE_DIR / 'logs' / 'metrics')) or None
+METRICS_FLUSH_INTERVAL = float(os.environ.get('METRICS_FLUSH_INTERVAL', 5))  # seconds
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN') or None
+METRICS_ALLOWED_IPS = [ip for ip in os.environ.get('METRICS_ALLOWED_IPS', '127.0.0.1,::1').split(',') if ip]
+
+# N+1 query detector (instrumentation.nplusone): fails a request whose SELECTs
+# repeat one shape more than NPLUSONE_THRESHOLD times. On in DEBUG and always
+# under the test runner; NPLUSONE_ACTION = 'log' only warns. NPLUSONE_IGNORE
+# lists regexes of normalized SQL that may repeat.
+NPLUSONE_DETECTION = os.environ.get('NPLUSONE_DETECTION', str(DEBUG)) == 'True'
+NPLUSONE_ACTION = os.environ.get('NPLUSONE_ACTION', 'raise')
+NPLUSONE_THRESHOLD = int(os.environ.get('NPLUSONE_THRESHOLD', 5))
+NPLUSONE_IGNORE = [
+    r'FROM "cache_entries"',  # Database cache bookkeeping: one lookup per key, not per row
+]
+TEST_RUNNER = 'instrumentation.runner.NPlusOneDetectingRunner'
+
+# Request profiler (instrumentation.profiler). Superusers profile a request by
+# sending `X-Profile: 1` or `?_profile=1`; PROFILER_SAMPLE_RATES profiles a
+# fraction of each route's requests, e.g. "prompt-list=0.01,*=0.001" ('*' is
+# every other route). Folded stacks go to PROFILER_DIR, listed in the admin.
+PROFILER_INTERVAL = float(os.environ.get('PROFILER_INTERVAL', 0.001))  # seconds between stack samples
+PROFILER_SAMPLE_RATES = {
+    route: float(rate)
+    for route, rate in (item.split('=') for item in os.environ.get('PROFILER_SAMPLE_RATES', '').split(',') if item)
 }
+PROFILER_DIR = os.environ.get('PROFILER_DIR', str(BASE_DIR / 'logs' / 'profiles'))
+PROFILER_MAX_PROFILES = int(os.environ.get('PROFILER_MAX_PROFILES', 1000))  # oldest are deleted
+
+# Write-behind view counter (interactions.view_counter). A background thread
+# per worker flushes the buffer every interval, or early at the threshold;
+# an interval of 0 turns the thread off (flushes happen inline at the threshold).
+VIEW_COUNTER_FLUSH_INTERVAL = float(os.environ.get('VIEW_COUNTER_FLUSH_INTERVAL', 10))  # seconds
+VIEW_COUNTER_FLUSH_THRESHOLD = int(os.environ.get('VIEW_COUNTER_FLUSH_THRESHOLD', 100))  # buffered views
+
+# Full-text search (search app). The backend is picked from the database vendor
+# unless SEARCH_BACKEND names a search.backends.BaseSearchBackend subclass.
+SEARCH_BACKEND = os.environ.get('SEARCH_BACKEND') or None
+SEARCH_MAX_RESULTS = int(os.environ.get('SEARCH_MAX_RESULTS', 1000))  # best matches per search, after the other filters
+
+# Trending ranks (trending.engine): activity decays by half every
+# TRENDING_HALF_LIFE_HOURS. TRENDING_WEIGHTS overrides the per-event weights
+# (create, view, upvote, downvote, comment, bookmark).
+TRENDING_HALF_LIFE_HOURS = float(os.environ.get('TRENDING_HALF_LIFE_HOURS', 24))
+TRENDING_WEIGHTS = {}
 
 DATA_UPLOAD_MAX_MEMORY_SIZE = 10485760  # 10MB
 FILE_UPLOAD_MAX_MEMORY_SIZE = 10485760  # 10MB
@@ -0,0 +1,20 @@
+"""
+Quoting and value preparation for the raw INSERT ... ON CONFLICT and
+DELETE ... RETURNING statements the ORM cannot express.
+"""
+from django.db import connection
+
+
+def table_name(model):
+    """The quoted table name of a model."""
+    return connection.ops.quote_name(model._meta.db_table)
+
+
+def column(model, name):
+    """The quoted column of a model field, by field name ('user' for user_id)."""
+    return connection.ops.quote_name(model._meta.get_field(name).column)
+
+
+def prep(model, name, value):
+    """value as the field would save it (e.g. a UUID as hex on SQLite)."""
+    return model._meta.get_field(name).get_db_prep_value(value, connection)
@@ -1,5 +1,6 @@
 from django.contrib import admin
 from django.urls import path, include
+from instrumentation.views import metrics
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -8,4 +9,6 @@ urlpatterns = [
     path('api/', include('content.urls')),
     path('api/', include('interactions.urls')),
     path('api/', include('tags.urls')),
+    path('api/', include('trending.urls')),
+    path('metrics', metrics, name='metrics'),
 ]
@@ -23,7 +23,7 @@ class NewsAdmin(admin.ModelAdmin):
 
 @admin.register(Tool)
 class ToolAdmin(admin.ModelAdmin):
-    list_display = ['name', 'type', 'author', 'created_at']
+    list_display = ['name', 'type', 'author', 'created_at', 'views']
     list_filter = ['type', 'created_at']
     search_fields = ['name', 'description']
     prepopulated_fields = {'slug': ('name',)}
@@ -0,0 +1,72 @@
+# Generated by Django 5.2.8 on 2026-10-18 10:20
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0003_blog_views'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blog',
+            name='downvotes',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='blog',
+            name='score',
+            field=models.IntegerField(default=0, help_text='upvotes - downvotes, maintained on every vote write'),
+        ),
+        migrations.AddField(
+            model_name='blog',
+            name='upvotes',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='news',
+            name='downvotes',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='news',
+            name='score',
+            field=models.IntegerField(default=0, help_text='upvotes - downvotes, maintained on every vote write'),
+        ),
+        migrations.AddField(
+            model_name='news',
+            name='upvotes',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='tool',
+            name='downvotes',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='tool',
+            name='score',
+            field=models.IntegerField(default=0, help_text='upvotes - downvotes, maintained on every vote write'),
+        ),
+        migrations.AddField(
+            model_name='tool',
+            name='upvotes',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='blog',
+            index=models.Index(fields=['-score'], name='blogs_score_3fb35a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='news',
+            index=models.Index(fields=['-score'], name='news_score_d861e6_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tool',
+            index=models.Index(fields=['-score'], name='tools_score_9968e6_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 10:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0004_blog_downvotes_blog_score_blog_upvotes_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tool',
+            name='views',
+            field=models.IntegerField(default=0),
+        ),
+    ]
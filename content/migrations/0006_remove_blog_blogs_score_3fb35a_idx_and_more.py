@@ -0,0 +1,27 @@
+# Generated by Django 5.2.8 on 2026-10-18 10:26
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0005_tool_views'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='blog',
+            name='blogs_score_3fb35a_idx',
+        ),
+        migrations.AddIndex(
+            model_name='blog',
+            index=models.Index(fields=['-created_at', '-id'], name='blogs_created_e9e8f0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='blog',
+            index=models.Index(fields=['-score', '-id'], name='blogs_score_ac854f_idx'),
+        ),
+    ]
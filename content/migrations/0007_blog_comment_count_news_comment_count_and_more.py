@@ -0,0 +1,28 @@
+# Generated by Django 5.2.8 on 2026-10-18 10:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0006_remove_blog_blogs_score_3fb35a_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blog',
+            name='comment_count',
+            field=models.IntegerField(default=0, help_text='maintained on every comment create/delete'),
+        ),
+        migrations.AddField(
+            model_name='news',
+            name='comment_count',
+            field=models.IntegerField(default=0, help_text='maintained on every comment create/delete'),
+        ),
+        migrations.AddField(
+            model_name='tool',
+            name='comment_count',
+            field=models.IntegerField(default=0, help_text='maintained on every comment create/delete'),
+        ),
+    ]
@@ -2,6 +2,7 @@ import uuid
 from django.db import models
 from django.conf import settings
 from django.utils.text import slugify
+from tags.prefetch import TaggedQuerySet
 
 class News(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -12,11 +13,20 @@ class News(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     views = models.IntegerField(default=0)
+    upvotes = models.IntegerField(default=0)
+    downvotes = models.IntegerField(default=0)
+    score = models.IntegerField(default=0, help_text='upvotes - downvotes, maintained on every vote write')
+    comment_count = models.IntegerField(default=0, help_text='maintained on every comment create/delete')
+
+    objects = TaggedQuerySet.as_manager()
 
     class Meta:
         db_table = 'news'
         verbose_name_plural = 'News'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-score']),
+        ]
     
     def __str__(self):
         return self.title
@@ -35,10 +45,21 @@ class Blog(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     views = models.IntegerField(default=0)  
+    upvotes = models.IntegerField(default=0)
+    downvotes = models.IntegerField(default=0)
+    score = models.IntegerField(default=0, help_text='upvotes - downvotes, maintained on every vote write')
+    comment_count = models.IntegerField(default=0, help_text='maintained on every comment create/delete')
+
+    objects = TaggedQuerySet.as_manager()
 
     class Meta:
         db_table = 'blogs'
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination keys: (field, id)
+            models.Index(fields=['-created_at', '-id']),
+            models.Index(fields=['-score', '-id']),
+        ]
     
     def __str__(self):
         return self.title
@@ -67,12 +88,22 @@ class Tool(models.Model):
     url = models.URLField(max_length=255, blank=True)
     type = models.ForeignKey(ToolType, on_delete=models.SET_NULL, null=True, related_name='tools')
     author = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, related_name='tools')
+    views = models.IntegerField(default=0)
+    upvotes = models.IntegerField(default=0)
+    downvotes = models.IntegerField(default=0)
+    score = models.IntegerField(default=0, help_text='upvotes - downvotes, maintained on every vote write')
+    comment_count = models.IntegerField(default=0, help_text='maintained on every comment create/delete')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = TaggedQuerySet.as_manager()
+    
     class Meta:
         db_table = 'tools'
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['-score']),
+        ]
     
     def __str__(self):
         return self.name
@@ -1,43 +1,59 @@
+from django.db import transaction
 from rest_framework import serializers
 from .models import Blog, News, Tool, ToolType
 from accounts.serializers import UserSerializer
-from tags.models import Taggable, Tag
+from tags.models import Taggable
+from tags.services import set_tags
+from interactions.viewer import ViewerStateMixin, ViewerStateListSerializer
+from interactions.view_counter import get_view_count
 
 
-class BlogSerializer(serializers.ModelSerializer):
+class BlogSerializer(ViewerStateMixin, serializers.ModelSerializer):
     author = UserSerializer(read_only=True)
+    views = serializers.SerializerMethodField()
     tags = serializers.SerializerMethodField()
+    is_bookmarked = serializers.SerializerMethodField()
+    user_vote = serializers.SerializerMethodField()
+    search_highlight = serializers.CharField(read_only=True, allow_null=True)
+    viewer_content_type = 4
 
     class Meta:
         model = Blog
-        fields = ['id', 'title', 'slug', 'content',
-                  'author', 'tags', 'created_at', 'updated_at']
-        read_only_fields = ['id', 'slug', 'author', 'created_at', 'updated_at']
+        fields = ['id', 'title', 'slug', 'content', 'author', 'tags',
+                  'views', 'upvotes', 'downvotes', 'score', 'comment_count', 'is_bookmarked', 'user_vote',
+                  'search_highlight', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'slug', 'author', 'upvotes', 'downvotes', 'score', 'comment_count',
+                            'created_at', 'updated_at']
+        list_serializer_class = ViewerStateListSerializer
 
     def get_tags(self, obj):
+        if hasattr(obj, 'prefetched_tags'):
+            return obj.prefetched_tags
         taggables = Taggable.objects.filter(
             taggable_type=4, taggable_id=obj.id).select_related('tag')
         return [t.tag.name for t in taggables]
 
+    def get_views(self, obj):
+        return get_view_count(obj, 4)
+
 
 class BlogCreateUpdateSerializer(serializers.ModelSerializer):
-    tags = serializers.ListField(child=serializers.CharField(), required=False)
+    tags = serializers.ListField(child=serializers.CharField(max_length=50), required=False)
 
     class Meta:
         model = Blog
         fields = ['title', 'content', 'tags']
 
+    @transaction.atomic
     def create(self, validated_data):
         tags_data = validated_data.pop('tags', [])
         blog = Blog.objects.create(**validated_data)
 
-        for tag_name in tags_data:
-            tag, _ = Tag.objects.get_or_create(name=tag_name.lower())
-            Taggable.objects.create(
-                tag=tag, taggable_type=4, taggable_id=blog.id)
+        set_tags(4, blog.id, tags_data, is_new=True)
 
         return blog
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         tags_data = validated_data.pop('tags', None)
 
@@ -46,50 +62,57 @@ class BlogCreateUpdateSerializer(serializers.ModelSerializer):
         instance.save()
 
         if tags_data is not None:
-            Taggable.objects.filter(
-                taggable_type=4, taggable_id=instance.id).delete()
-            for tag_name in tags_data:
-                tag, _ = Tag.objects.get_or_create(name=tag_name.lower())
-                Taggable.objects.create(
-                    tag=tag, taggable_type=4, taggable_id=instance.id)
+            set_tags(4, instance.id, tags_data)
 
         return instance
 
 
-class NewsSerializer(serializers.ModelSerializer):
+class NewsSerializer(ViewerStateMixin, serializers.ModelSerializer):
     author = UserSerializer(read_only=True)
+    views = serializers.SerializerMethodField()
     tags = serializers.SerializerMethodField()
+    is_bookmarked = serializers.SerializerMethodField()
+    user_vote = serializers.SerializerMethodField()
+    search_highlight = serializers.CharField(read_only=True, allow_null=True)
+    viewer_content_type = 3
 
     class Meta:
         model = News
-        fields = ['id', 'title', 'slug', 'content',
-                  'author', 'tags', 'created_at', 'updated_at','views']
-        read_only_fields = ['id', 'slug', 'author', 'created_at', 'updated_at']
+        fields = ['id', 'title', 'slug', 'content', 'author', 'tags',
+                  'upvotes', 'downvotes', 'score', 'comment_count', 'is_bookmarked', 'user_vote',
+                  'search_highlight', 'created_at', 'updated_at','views']
+        read_only_fields = ['id', 'slug', 'author', 'upvotes', 'downvotes', 'score', 'comment_count',
+                            'created_at', 'updated_at']
+        list_serializer_class = ViewerStateListSerializer
 
     def get_tags(self, obj):
+        if hasattr(obj, 'prefetched_tags'):
+            return obj.prefetched_tags
         taggables = Taggable.objects.filter(
             taggable_type=3, taggable_id=obj.id).select_related('tag')
         return [t.tag.name for t in taggables]
 
+    def get_views(self, obj):
+        return get_view_count(obj, 3)
+
 
 class NewsCreateUpdateSerializer(serializers.ModelSerializer):
-    tags = serializers.ListField(child=serializers.CharField(), required=False)
+    tags = serializers.ListField(child=serializers.CharField(max_length=50), required=False)
 
     class Meta:
         model = News
         fields = ['title', 'content', 'tags']
 
+    @transaction.atomic
     def create(self, validated_data):
         tags_data = validated_data.pop('tags', [])
         news = News.objects.create(**validated_data)
 
-        for tag_name in tags_data:
-            tag, _ = Tag.objects.get_or_create(name=tag_name.lower())
-            Taggable.objects.create(
-                tag=tag, taggable_type=3, taggable_id=news.id)
+        set_tags(3, news.id, tags_data, is_new=True)
 
         return news
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         tags_data = validated_data.pop('tags', None)
 
@@ -98,12 +121,7 @@ class NewsCreateUpdateSerializer(serializers.ModelSerializer):
         instance.save()
 
         if tags_data is not None:
-            Taggable.objects.filter(
-                taggable_type=3, taggable_id=instance.id).delete()
-            for tag_name in tags_data:
-                tag, _ = Tag.objects.get_or_create(name=tag_name.lower())
-                Taggable.objects.create(
-                    tag=tag, taggable_type=3, taggable_id=instance.id)
+            set_tags(3, instance.id, tags_data)
 
         return instance
 
@@ -114,31 +132,45 @@ class ToolTypeSerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'description']
 
 
-class ToolSerializer(serializers.ModelSerializer):
+class ToolSerializer(ViewerStateMixin, serializers.ModelSerializer):
     author = UserSerializer(read_only=True)
     type = ToolTypeSerializer(read_only=True)
+    views = serializers.SerializerMethodField()
     tags = serializers.SerializerMethodField()
+    is_bookmarked = serializers.SerializerMethodField()
+    user_vote = serializers.SerializerMethodField()
+    search_highlight = serializers.CharField(read_only=True, allow_null=True)
+    viewer_content_type = 2
 
     class Meta:
         model = Tool
-        fields = ['id', 'name', 'slug', 'description', 'url',
-                  'type', 'author', 'tags', 'created_at', 'updated_at']
-        read_only_fields = ['id', 'slug', 'author', 'created_at', 'updated_at']
+        fields = ['id', 'name', 'slug', 'description', 'url', 'type', 'author', 'tags',
+                  'views', 'upvotes', 'downvotes', 'score', 'comment_count', 'is_bookmarked', 'user_vote',
+                  'search_highlight', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'slug', 'author', 'upvotes', 'downvotes', 'score', 'comment_count',
+                            'created_at', 'updated_at']
+        list_serializer_class = ViewerStateListSerializer
 
     def get_tags(self, obj):
+        if hasattr(obj, 'prefetched_tags'):
+            return obj.prefetched_tags
         taggables = Taggable.objects.filter(
             taggable_type=2, taggable_id=obj.id).select_related('tag')
         return [t.tag.name for t in taggables]
 
+    def get_views(self, obj):
+        return get_view_count(obj, 2)
+
 
 class ToolCreateUpdateSerializer(serializers.ModelSerializer):
     type_id = serializers.UUIDField(required=False)
-    tags = serializers.ListField(child=serializers.CharField(), required=False)
+    tags = serializers.ListField(child=serializers.CharField(max_length=50), required=False)
 
     class Meta:
         model = Tool
         fields = ['name', 'description', 'url', 'type_id', 'tags']
 
+    @transaction.atomic
     def create(self, validated_data):
         tags_data = validated_data.pop('tags', [])
         type_id = validated_data.pop('type_id', None)
@@ -148,13 +180,11 @@ class ToolCreateUpdateSerializer(serializers.ModelSerializer):
 
         tool = Tool.objects.create(**validated_data)
 
-        for tag_name in tags_data:
-            tag, _ = Tag.objects.get_or_create(name=tag_name.lower())
-            Taggable.objects.create(
-                tag=tag, taggable_type=2, taggable_id=tool.id)
+        set_tags(2, tool.id, tags_data, is_new=True)
 
         return tool
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         tags_data = validated_data.pop('tags', None)
         type_id = validated_data.pop('type_id', None)
@@ -167,11 +197,6 @@ class ToolCreateUpdateSerializer(serializers.ModelSerializer):
         instance.save()
 
         if tags_data is not None:
-            Taggable.objects.filter(
-                taggable_type=2, taggable_id=instance.id).delete()
-            for tag_name in tags_data:
-                tag, _ = Tag.objects.get_or_create(name=tag_name.lower())
-                Taggable.objects.create(
-                    tag=tag, taggable_type=2, taggable_id=instance.id)
+            set_tags(2, instance.id, tags_data)
 
         return instance
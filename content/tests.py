@@ -1,3 +1,35 @@
 from django.test import TestCase
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+from config.pagination import KeysetCursorPagination
+from .models import ToolType
 
 
+class ToolTypeCursorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        ToolType.objects.bulk_create([ToolType(name=name) for name in ('Video', 'Audio', 'Code', 'Image')])
+
+    def test_cursor_pages_by_name(self):
+        client = APIClient()
+        response = client.get('/api/tool-types/', {'cursor': '', 'page_size': 3})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['name'] for item in response.data['results']], ['Audio', 'Code', 'Image'])
+        response = client.get(response.data['next'])
+        self.assertEqual([item['name'] for item in response.data['results']], ['Video'])
+        self.assertIsNone(response.data['next'])
+
+    def test_models_without_the_key_fields_page_by_pk(self):
+        view = type('View', (), {'cursor_ordering_fields': ['created_at']})()
+        paginator = KeysetCursorPagination(page_size=2)
+        request = Request(APIRequestFactory().get('/api/tool-types/', {'cursor': ''}))
+        first = paginator.paginate_queryset(ToolType.objects.all(), request, view)
+        self.assertEqual(paginator.ordering, '-pk')
+
+        next_link = paginator.get_next_link()
+        request = Request(APIRequestFactory().get(next_link))
+        second = paginator.paginate_queryset(ToolType.objects.all(), request, view)
+        self.assertEqual(
+            [tool_type.pk for tool_type in first + second],
+            list(ToolType.objects.order_by('-pk').values_list('pk', flat=True)),
+        )
@@ -1,4 +1,4 @@
-from rest_framework import viewsets, filters
+from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
 from django_filters.rest_framework import DjangoFilterBackend
 from .models import Blog, News, Tool, ToolType
@@ -9,20 +9,28 @@ from .serializers import (
     ToolTypeSerializer
 )
 from accounts.permissions import IsModeratorOrReadOnly, CanModerateContent
-from django.db import models
+from interactions.view_counter import record_view, get_view_count
+from search.filters import FullTextSearchFilter
+from caching.conditional import ConditionalGetMixin
+from caching.mixins import CachedResponseMixin
+from trending.filters import TrendingOrderingFilter
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework import status  
 
 
 
-class BlogViewSet(viewsets.ModelViewSet):
-    queryset = Blog.objects.select_related('author').all()
+class BlogViewSet(ConditionalGetMixin, CachedResponseMixin, viewsets.ModelViewSet):
+    queryset = Blog.objects.select_related('author').with_tags(4)
     permission_classes = [IsModeratorOrReadOnly, CanModerateContent]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter, TrendingOrderingFilter]
     search_fields = ['title', 'content']
-    ordering_fields = ['created_at', 'title']
+    search_content_type = 4
+    ordering_fields = ['created_at', 'title', 'score']
+    cursor_ordering_fields = ['created_at', 'score']
     lookup_field = 'slug'
+    cache_dependencies = ['content.Blog', 'tags.Tag', 'tags.Taggable', 'interactions.Vote', 'interactions.Comment']
+    etag_fields = ['score', 'upvotes', 'downvotes', 'comment_count', 'views']
     
     def get_serializer_class(self):
         if self.action in ['create', 'update', 'partial_update']:
@@ -31,25 +39,23 @@ class BlogViewSet(viewsets.ModelViewSet):
     
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
-
-"""     @action(detail=True, methods=['post'])
+    
+    @action(detail=True, methods=['post'])
     def increment_view(self, request, slug=None):
-        try:
-            blog = self.get_object()
-            blog.views = models.F('views') + 1
-            blog.save(update_fields=['views'])
-            blog.refresh_from_db()  
-            return Response({'views': blog.views}, status=status.HTTP_200_OK)
-        except Exception as e:
-            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
- """
-class NewsViewSet(viewsets.ModelViewSet):
-    queryset = News.objects.select_related('author').all()
+        blog = self.get_object()
+        record_view(4, blog.pk)
+        return Response({'views': get_view_count(blog, 4)}, status=status.HTTP_200_OK)
+
+class NewsViewSet(ConditionalGetMixin, CachedResponseMixin, viewsets.ModelViewSet):
+    queryset = News.objects.select_related('author').with_tags(3)
     permission_classes = [IsModeratorOrReadOnly, CanModerateContent]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter, TrendingOrderingFilter]
     search_fields = ['title', 'content']
-    ordering_fields = ['created_at', 'title']
+    search_content_type = 3
+    ordering_fields = ['created_at', 'title', 'score']
     lookup_field = 'slug'
+    cache_dependencies = ['content.News', 'tags.Tag', 'tags.Taggable', 'interactions.Vote', 'interactions.Comment']
+    etag_fields = ['score', 'upvotes', 'downvotes', 'comment_count', 'views']
     
     def get_serializer_class(self):
         if self.action in ['create', 'update', 'partial_update']:
@@ -59,14 +65,23 @@ class NewsViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
     
-class ToolViewSet(viewsets.ModelViewSet):
-    queryset = Tool.objects.select_related('author', 'type').all()
+    @action(detail=True, methods=['post'])
+    def increment_view(self, request, slug=None):
+        news = self.get_object()
+        record_view(3, news.pk)
+        return Response({'views': get_view_count(news, 3)}, status=status.HTTP_200_OK)
+    
+class ToolViewSet(ConditionalGetMixin, CachedResponseMixin, viewsets.ModelViewSet):
+    queryset = Tool.objects.select_related('author', 'type').with_tags(2)
     permission_classes = [IsModeratorOrReadOnly, CanModerateContent]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter, TrendingOrderingFilter]
     filterset_fields = ['type']
     search_fields = ['name', 'description']
-    ordering_fields = ['created_at', 'name']
+    search_content_type = 2
+    ordering_fields = ['created_at', 'name', 'score']
     lookup_field = 'slug'
+    cache_dependencies = ['content.Tool', 'content.ToolType', 'tags.Tag', 'tags.Taggable', 'interactions.Vote', 'interactions.Comment']
+    etag_fields = ['score', 'upvotes', 'downvotes', 'comment_count', 'views']
     
     def get_serializer_class(self):
         if self.action in ['create', 'update', 'partial_update']:
@@ -79,11 +94,11 @@ class ToolViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['post'])
     def increment_view(self, request, slug=None):
         tool = self.get_object()
-        tool.views = models.F('views') + 1
-        tool.save(update_fields=['views'])
-        tool.refresh_from_db()
-        return Response({'views': tool.views}, status=status.HTTP_200_OK)
+        record_view(2, tool.pk)
+        return Response({'views': get_view_count(tool, 2)}, status=status.HTTP_200_OK)
 class ToolTypeViewSet(viewsets.ModelViewSet):
     queryset = ToolType.objects.all()
     serializer_class = ToolTypeSerializer
-    permission_classes = [IsModeratorOrReadOnly]
\ No newline at end of file
+    permission_classes = [IsModeratorOrReadOnly]
+    cursor_ordering_fields = ['name']
+    cursor_default_ordering = 'name'
\ No newline at end of file
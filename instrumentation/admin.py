@@ -0,0 +1,45 @@
+from django.contrib import admin
+from django.core.exceptions import PermissionDenied
+from django.http import FileResponse, Http404
+from django.shortcuts import get_object_or_404
+from django.urls import path, reverse
+from django.utils.html import format_html
+from .models import RequestProfile
+
+
+@admin.register(RequestProfile)
+class RequestProfileAdmin(admin.ModelAdmin):
+    list_display = ['created_at', 'method', 'path', 'status', 'duration_ms', 'db_queries', 'samples', 'trigger',
+                    'user', 'flame_graph']
+    list_filter = ['trigger', 'method', 'view', 'created_at']
+    search_fields = ['path', 'view']
+    readonly_fields = ['created_at', 'method', 'path', 'view', 'status', 'duration_ms', 'db_queries', 'samples',
+                       'trigger', 'user', 'filename', 'flame_graph']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def get_urls(self):
+        return [
+            path('<int:pk>/folded/', self.admin_site.admin_view(self.download_view),
+                 name='instrumentation_requestprofile_folded'),
+            *super().get_urls(),
+        ]
+
+    def download_view(self, request, pk):
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        profile = get_object_or_404(RequestProfile, pk=pk)
+        if not profile.file_path.exists():
+            raise Http404('The profile file is gone')
+        return FileResponse(open(profile.file_path, 'rb'), as_attachment=True, filename=profile.filename,
+                            content_type='text/plain')
+
+    def flame_graph(self, obj):
+        """Folded stacks: open in https://www.speedscope.app or pipe to flamegraph.pl"""
+        url = reverse('admin:instrumentation_requestprofile_folded', args=[obj.pk])
+        return format_html('<a href="{}">{}</a>', url, obj.filename)
+    flame_graph.short_description = 'Flame graph'
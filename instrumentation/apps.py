@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class InstrumentationConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'instrumentation'
+
+    def ready(self):
+        from . import hooks, signals  # noqa: F401
+        hooks.install()
@@ -0,0 +1,26 @@
+from functools import wraps
+from rest_framework.request import Request
+from rest_framework.serializers import BaseSerializer
+from .metrics import timed
+
+# Serializers and authenticators have no common base class in this project
+# (and include third-party ones such as simplejwt's), so their DRF entry
+# points are wrapped once at startup instead.
+
+
+def _timed_function(name, function):
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        with timed(name):
+            return function(*args, **kwargs)
+    wrapper.instrumented = True
+    return wrapper
+
+
+def install():
+    """Time serializer output (`.data`) and input (`is_valid`), and DRF authentication."""
+    if getattr(BaseSerializer.is_valid, 'instrumented', False):
+        return
+    BaseSerializer.data = property(_timed_function('serializer', BaseSerializer.data.fget))
+    BaseSerializer.is_valid = _timed_function('serializer', BaseSerializer.is_valid)
+    Request._authenticate = _timed_function('auth', Request._authenticate)
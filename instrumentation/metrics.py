@@ -0,0 +1,65 @@
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_current = ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    """
+    What one request spent its time on: database queries (counted by
+    `execute_wrapper`, installed on every connection by the middleware) and
+    named sections timed with `timed()`. Times are in seconds.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.query_time = 0.0
+        self.timings = defaultdict(float)
+        self._active = set()
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.query_time += time.perf_counter() - start
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+
+def current_metrics():
+    """The RequestMetrics of the request being handled, or None outside one."""
+    return _current.get()
+
+
+def activate(metrics):
+    return _current.set(metrics)
+
+
+def deactivate(token):
+    _current.reset(token)
+
+
+@contextmanager
+def timed(name):
+    """
+    Add the time spent in the block to the current request's `name` timing.
+    Nested blocks of the same name (a serializer rendering another) are
+    counted once; outside a request this does nothing.
+    """
+    metrics = _current.get()
+    if metrics is None or name in metrics._active:
+        yield
+        return
+    metrics._active.add(name)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.timings[name] += time.perf_counter() - start
+        metrics._active.discard(name)
@@ -0,0 +1,78 @@
+from contextlib import ExitStack
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+from .metrics import RequestMetrics, activate, deactivate
+from .prometheus import metrics_store
+from .writer import request_log
+
+
+def response_size(response):
+    if response.streaming:
+        length = response.get('Content-Length')
+        return int(length) if length else None
+    return len(response.content)
+
+
+def server_timing(record):
+    """Server-Timing header value; durations in ms as the header expects."""
+    return ', '.join([
+        f'db;dur={record["db_ms"]};desc="{record["db_queries"]} queries"',
+        f'serializer;dur={record["serializer_ms"]}',
+        f'auth;dur={record["auth_ms"]}',
+        f'total;dur={record["duration_ms"]}',
+    ])
+
+
+class RequestInstrumentationMiddleware:
+    """
+    Measures every request: query count and time on all database
+    connections, time spent in serializers and authentication (see
+    instrumentation.hooks), total time and response size. Sends the timings
+    as a Server-Timing header (INSTRUMENTATION_SERVER_TIMING), queues one
+    JSON record per request for logs/requests.jsonl (instrumentation.writer)
+    and adds it to the /metrics totals (instrumentation.prometheus).
+    Keep it first in MIDDLEWARE so the total covers the other middleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not getattr(settings, 'INSTRUMENTATION_ENABLED', True):
+            return self.get_response(request)
+
+        metrics = RequestMetrics()
+        token = activate(metrics)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(metrics.execute_wrapper))
+                response = self.get_response(request)
+        finally:
+            deactivate(token)
+
+        record = self.build_record(request, response, metrics)
+        if getattr(settings, 'INSTRUMENTATION_SERVER_TIMING', settings.DEBUG):
+            response['Server-Timing'] = server_timing(record)
+        request_log.write(record)
+        metrics_store.observe(record)
+        return response
+
+    def build_record(self, request, response, metrics):
+        match = request.resolver_match
+        return {
+            'ts': timezone.now().isoformat(),
+            'method': request.method,
+            'path': request.path,
+            'route': match.route if match else None,
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+            'duration_ms': round(metrics.elapsed() * 1000, 2),
+            'db_queries': metrics.queries,
+            'db_ms': round(metrics.query_time * 1000, 2),
+            'serializer_ms': round(metrics.timings['serializer'] * 1000, 2),
+            'auth_ms': round(metrics.timings['auth'] * 1000, 2),
+            'response_bytes': response_size(response),
+            'cache': response.get('X-Cache', '').lower() or None,
+        }
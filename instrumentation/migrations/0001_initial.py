@@ -0,0 +1,38 @@
+# Generated by Django 5.2.8 on 2026-10-18 11:12
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RequestProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('method', models.CharField(max_length=10)),
+                ('path', models.CharField(max_length=2000)),
+                ('view', models.CharField(blank=True, max_length=200)),
+                ('status', models.PositiveSmallIntegerField()),
+                ('duration_ms', models.FloatField()),
+                ('db_queries', models.PositiveIntegerField(blank=True, null=True)),
+                ('samples', models.PositiveIntegerField()),
+                ('trigger', models.CharField(choices=[('requested', 'Requested'), ('sampled', 'Sampled')], max_length=10)),
+                ('filename', models.CharField(max_length=255)),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'request_profiles',
+                'ordering': ['-created_at', '-id'],
+            },
+        ),
+    ]
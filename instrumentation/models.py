@@ -0,0 +1,40 @@
+from pathlib import Path
+from django.conf import settings
+from django.db import models
+
+
+class RequestProfile(models.Model):
+    """
+    One profiled request (instrumentation.profiler). The sampled stacks are
+    stored as folded stacks in PROFILER_DIR/`filename`, ready for
+    flamegraph.pl or speedscope.
+    """
+    TRIGGERS = [
+        ('requested', 'Requested'),
+        ('sampled', 'Sampled'),
+    ]
+
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    method = models.CharField(max_length=10)
+    path = models.CharField(max_length=2000)
+    view = models.CharField(max_length=200, blank=True)
+    status = models.PositiveSmallIntegerField()
+    duration_ms = models.FloatField()
+    db_queries = models.PositiveIntegerField(null=True, blank=True)
+    samples = models.PositiveIntegerField()
+    trigger = models.CharField(max_length=10, choices=TRIGGERS)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.SET_NULL, related_name='+'
+    )
+    filename = models.CharField(max_length=255)
+
+    class Meta:
+        db_table = 'request_profiles'
+        ordering = ['-created_at', '-id']
+
+    def __str__(self):
+        return f"{self.method} {self.path} ({self.duration_ms:.0f} ms)"
+
+    @property
+    def file_path(self):
+        return Path(settings.PROFILER_DIR) / self.filename
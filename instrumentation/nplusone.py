@@ -0,0 +1,149 @@
+import logging
+import re
+import sys
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+from django.conf import settings
+from django.db import connections
+from rest_framework.serializers import Serializer
+
+logger = logging.getLogger(__name__)
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST_RE = re.compile(r'\bIN \((?:\?, )*\?\)', re.IGNORECASE)
+_SPACE_RE = re.compile(r'\s+')
+_TO_REPRESENTATION = Serializer.to_representation.__code__
+# The query, serializer and middleware wrappers sit between the query and its caller
+_WRAPPER_FILES = {
+    str(Path(__file__).resolve().with_name(name))
+    for name in ('hooks.py', 'metrics.py', 'middleware.py', 'nplusone.py', 'profiler.py')
+}
+
+
+class NPlusOneError(AssertionError):
+    """A query shape ran more than NPLUSONE_THRESHOLD times in one request."""
+
+
+def normalize_sql(sql):
+    """
+    The shape of a query: literals and placeholders become ?, IN lists
+    collapse to IN (...), so per-row lookups that differ only in their
+    parameters (or in how many they batch) have the same shape.
+    """
+    sql = _STRING_RE.sub('?', sql)
+    sql = _NUMBER_RE.sub('?', sql.replace('%s', '?'))
+    sql = _SPACE_RE.sub(' ', sql).strip()
+    return _IN_LIST_RE.sub('IN (...)', sql)
+
+
+def find_origin():
+    """
+    Where the current query comes from: the serializer field being rendered
+    (innermost, for nested serializers) and the innermost frame of project
+    code, e.g. 'PromptSerializer.tags at prompts/serializers.py:31 in get_tags'.
+    """
+    base_dir = str(settings.BASE_DIR)
+    field = location = None
+    frame = sys._getframe(1)
+    while frame is not None and (field is None or location is None):
+        code = frame.f_code
+        if field is None and code is _TO_REPRESENTATION and 'field' in frame.f_locals:
+            field = f'{type(frame.f_locals["self"]).__name__}.{frame.f_locals["field"].field_name}'
+        filename = code.co_filename
+        if (
+            location is None and filename.startswith(base_dir) and filename not in _WRAPPER_FILES
+            and 'site-packages' not in filename
+        ):
+            location = f'{Path(filename).relative_to(base_dir)}:{frame.f_lineno} in {code.co_name}'
+        frame = frame.f_back
+    return ' at '.join(part for part in (field, location) if part) or 'unknown'
+
+
+class QueryShapeDetector:
+    """
+    Database execute wrapper that counts SELECTs by shape (normalize_sql) and
+    remembers where the first repeat of each shape came from.
+    """
+
+    def __init__(self, threshold=None, ignore=None):
+        self.threshold = threshold if threshold is not None else getattr(settings, 'NPLUSONE_THRESHOLD', 5)
+        self.ignore = [re.compile(pattern) for pattern in (
+            ignore if ignore is not None else getattr(settings, 'NPLUSONE_IGNORE', ())
+        )]
+        self.shapes = Counter()
+        self.origins = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        if not many and sql.lstrip()[:6].upper() == 'SELECT':
+            shape = normalize_sql(sql)
+            self.shapes[shape] += 1
+            if self.shapes[shape] == 2:
+                self.origins[shape] = find_origin()
+        return execute(sql, params, many, context)
+
+    def repeated(self):
+        """[(shape, count, origin)] of shapes over the threshold, most frequent first."""
+        return [
+            (shape, count, self.origins.get(shape, 'unknown'))
+            for shape, count in self.shapes.most_common()
+            if count > self.threshold and not any(pattern.search(shape) for pattern in self.ignore)
+        ]
+
+    def report(self, label, action=None):
+        """Raise NPlusOneError or log a warning (NPLUSONE_ACTION) if any shape repeated too often."""
+        repeated = self.repeated()
+        if not repeated:
+            return
+        message = '\n'.join([
+            f'Possible N+1 queries in {label}:',
+            *(f'  {count} x {shape[:300]}\n    from {origin}' for shape, count, origin in repeated),
+        ])
+        if (action or getattr(settings, 'NPLUSONE_ACTION', 'raise')) == 'raise':
+            raise NPlusOneError(message)
+        logger.warning(message)
+
+
+@contextmanager
+def detect_n_plus_one(label='block', threshold=None, action=None):
+    """
+    Check the queries run in the block, e.g. in a test:
+
+        with detect_n_plus_one('feed rendering'):
+            PromptSerializer(prompts, many=True).data
+    """
+    detector = QueryShapeDetector(threshold)
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(detector))
+        yield detector
+    detector.report(label, action)
+
+
+class NPlusOneDetectionMiddleware:
+    """
+    With NPLUSONE_DETECTION on (DEBUG, and always under the test runner),
+    fails the request when a query shape repeats more than NPLUSONE_THRESHOLD
+    times, naming the view, the serializer field and the line that ran it.
+    Server errors are passed through unchecked.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not getattr(settings, 'NPLUSONE_DETECTION', False):
+            return self.get_response(request)
+
+        detector = QueryShapeDetector()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(detector))
+            response = self.get_response(request)
+        if response.status_code >= 500:
+            # Don't mask the real error; its queries are cut short anyway
+            return response
+        match = request.resolver_match
+        detector.report(f'{request.method} {request.path} ({match.view_name if match else "no route"})')
+        return response
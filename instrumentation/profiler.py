@@ -0,0 +1,175 @@
+import logging
+import random
+import sys
+import sysconfig
+import threading
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+from django.conf import settings
+from django.urls import Resolver404, resolve
+from django.utils import timezone
+from rest_framework.exceptions import AuthenticationFailed
+from accounts.authentication import CachedJWTAuthentication
+from .metrics import current_metrics
+from .models import RequestProfile
+
+logger = logging.getLogger(__name__)
+
+_STDLIB = sysconfig.get_paths()['stdlib']
+_frame_labels = {}
+
+
+def _frame_label(code):
+    label = _frame_labels.get(code)
+    if label is None:
+        filename = code.co_filename
+        if 'site-packages' in filename:
+            filename = filename.rsplit('site-packages', 1)[1].lstrip('/\\')
+        elif filename.startswith(str(settings.BASE_DIR)):
+            filename = str(Path(filename).relative_to(settings.BASE_DIR))
+        elif filename.startswith(_STDLIB):
+            filename = filename[len(_STDLIB):].lstrip('/\\')
+        label = _frame_labels[code] = f'{code.co_name} ({filename}:{code.co_firstlineno})'.replace(';', ',')
+    return label
+
+
+class StackSampler:
+    """
+    Samples one thread's Python stack every `interval` seconds from a
+    background thread and counts how often each stack was seen. Stacks stop
+    at `root` (the frame that started sampling), so they begin at the code
+    being profiled. The sampler needs the GIL to take a sample, so busy pure
+    Python code is sampled about every sys.getswitchinterval() (5 ms).
+    """
+
+    def __init__(self, interval, root=None):
+        self.interval = interval
+        self.root = root
+        self.thread_id = threading.get_ident()
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[self._fold(frame)] += 1
+
+    def _fold(self, frame):
+        labels = []
+        while frame is not None and frame is not self.root:
+            labels.append(_frame_label(frame.f_code))
+            frame = frame.f_back
+        return ';'.join(reversed(labels))
+
+    @property
+    def samples(self):
+        return sum(self.stacks.values())
+
+    def folded(self):
+        """'outer;inner;innermost count' lines, the input format of flamegraph.pl and speedscope."""
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+
+def requesting_superuser(request):
+    """The superuser making the request (session or JWT), or None."""
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        try:
+            result = CachedJWTAuthentication().authenticate(request)
+        except AuthenticationFailed:
+            return None
+        user = result[0] if result else None
+    return user if user is not None and user.is_superuser else None
+
+
+def sample_rate(request):
+    """Fraction of requests to this route to profile (PROFILER_SAMPLE_RATES; '*' for any route)."""
+    rates = getattr(settings, 'PROFILER_SAMPLE_RATES', None)
+    if not rates:
+        return 0
+    try:
+        view_name = resolve(request.path_info).view_name
+    except Resolver404:
+        return 0
+    return rates.get(view_name, rates.get('*', 0))
+
+
+def save_profile(request, response, sampler, trigger, duration, user=None):
+    """Write the folded stacks and their RequestProfile row, keeping PROFILER_MAX_PROFILES."""
+    directory = Path(settings.PROFILER_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    filename = f'{timezone.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:8]}.folded'
+    (directory / filename).write_text(sampler.folded())
+
+    metrics = current_metrics()
+    match = request.resolver_match
+    profile = RequestProfile.objects.create(
+        method=request.method,
+        path=request.get_full_path()[:2000],
+        view=match.view_name if match else '',
+        status=response.status_code,
+        duration_ms=round(duration * 1000, 2),
+        db_queries=metrics.queries if metrics else None,
+        samples=sampler.samples,
+        trigger=trigger,
+        user=user,
+        filename=filename,
+    )
+    # Deleting through the ORM removes the files too (instrumentation.signals)
+    stale = RequestProfile.objects.values_list('pk', flat=True)[getattr(settings, 'PROFILER_MAX_PROFILES', 1000):]
+    if stale:
+        RequestProfile.objects.filter(pk__in=list(stale)).delete()
+    return profile
+
+
+class ProfilingMiddleware:
+    """
+    Profiles a request with StackSampler when a superuser asks for it (an
+    `X-Profile: 1` header or `?_profile=1`) or when it falls in the
+    PROFILER_SAMPLE_RATES fraction for its route. The result is stored as a
+    RequestProfile (see the admin) and its id returned in X-Profile-Id.
+    Keep it after AuthenticationMiddleware so admin sessions count.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        user = None
+        trigger = None
+        if request.headers.get('X-Profile') or request.GET.get('_profile'):
+            user = requesting_superuser(request)
+            trigger = 'requested' if user else None
+        if trigger is None:
+            rate = sample_rate(request)
+            trigger = 'sampled' if rate and random.random() < rate else None
+        if trigger is None:
+            return self.get_response(request)
+
+        sampler = StackSampler(getattr(settings, 'PROFILER_INTERVAL', 0.001), root=sys._getframe())
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            sampler.stop()
+        duration = time.perf_counter() - started
+
+        try:
+            profile = save_profile(request, response, sampler, trigger, duration, user)
+        except Exception:
+            logger.exception('Failed to store the profile of %s %s', request.method, request.path)
+            return response
+        response['X-Profile-Id'] = str(profile.pk)
+        return response
@@ -0,0 +1,318 @@
+import atexit
+import json
+import os
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from collections import Counter
+from pathlib import Path
+from django.conf import settings
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)  # seconds
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+HISTOGRAMS = {
+    'duration': ('http_request_duration_seconds', 'Request latency in seconds.', DURATION_BUCKETS),
+    'queries': ('http_request_db_queries', 'Database queries per request.', QUERY_BUCKETS),
+}
+UNMATCHED_VIEW = '<unmatched>'
+RETIRED_FILENAME = 'retired.json'
+COMPACT_LOCK_FILENAME = 'compact.lock'
+COMPACT_LOCK_TIMEOUT = 60  # seconds before a lock left by a crashed worker is broken
+
+
+class Histogram:
+    """Per-bucket (not cumulative) counts, with +Inf last, and the sum of observations."""
+
+    def __init__(self, buckets, counts=None, total=0.0):
+        self.buckets = buckets
+        self.counts = counts or [0] * (len(buckets) + 1)
+        self.total = total
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+
+    def merge(self, counts, total):
+        for i, count in enumerate(counts):
+            self.counts[i] += count
+        self.total += total
+
+
+class MetricsSnapshot:
+    """Request metrics keyed by (view, method, ...) labels; mergeable across processes."""
+
+    def __init__(self):
+        self.requests = Counter()  # (view, method, status class) -> count
+        self.cache = Counter()  # (view, method, 'hit' | 'miss') -> count
+        self.histograms = {name: {} for name in HISTOGRAMS}  # name -> {(view, method): Histogram}
+
+    def histogram(self, name, labels):
+        histograms = self.histograms[name]
+        if labels not in histograms:
+            histograms[labels] = Histogram(HISTOGRAMS[name][2])
+        return histograms[labels]
+
+    def observe(self, record):
+        labels = (record['view'] or UNMATCHED_VIEW, record['method'])
+        self.requests[(*labels, f'{record["status"] // 100}xx')] += 1
+        if record.get('cache'):
+            self.cache[(*labels, record['cache'])] += 1
+        self.histogram('duration', labels).observe(record['duration_ms'] / 1000)
+        self.histogram('queries', labels).observe(record['db_queries'])
+
+    def to_json(self):
+        return {
+            'requests': [[*labels, count] for labels, count in self.requests.items()],
+            'cache': [[*labels, count] for labels, count in self.cache.items()],
+            **{
+                name: [[*labels, h.counts, h.total] for labels, h in histograms.items()]
+                for name, histograms in self.histograms.items()
+            },
+        }
+
+    def merge_json(self, data):
+        for *labels, count in data.get('requests', []):
+            self.requests[tuple(labels)] += count
+        for *labels, count in data.get('cache', []):
+            self.cache[tuple(labels)] += count
+        for name in HISTOGRAMS:
+            for view, method, counts, total in data.get(name, []):
+                self.histogram(name, (view, method)).merge(counts, total)
+
+
+def _file_pid(path):
+    """The worker pid a `<pid>-<suffix>.json` file belongs to, or None for other files."""
+    try:
+        return int(path.name.split('-', 1)[0])
+    except ValueError:
+        return None
+
+
+def _pid_alive(pid):
+    if os.name != 'posix':
+        # os.kill would terminate the process on Windows; never compact there
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+
+class MetricsStore:
+    """
+    Request metrics for the whole worker fleet, for /metrics.
+    Each process counts in memory and writes its totals to its own file in
+    METRICS_DIR every METRICS_FLUSH_INTERVAL seconds (and at exit); `collect`
+    sums every file in the directory. Before each scrape the files of exited
+    workers are folded into one retired.json (`compact`), so the directory
+    does not grow with worker restarts and the totals never go backwards.
+    METRICS_DIR must be local to the host, since liveness is checked by pid.
+    Point METRICS_DIR at a tmpfs (/dev/shm) to keep the writes in memory.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot = MetricsSnapshot()
+        self._dirty = False
+        self._last_flush = time.monotonic()
+        self._pid = None
+        self._filename = None
+
+    @property
+    def directory(self):
+        return getattr(settings, 'METRICS_DIR', None)
+
+    @property
+    def flush_interval(self):
+        return getattr(settings, 'METRICS_FLUSH_INTERVAL', 5)
+
+    def observe(self, record):
+        with self._lock:
+            self._check_process()
+            self._snapshot.observe(record)
+            self._dirty = True
+            due = time.monotonic() - self._last_flush >= self.flush_interval
+        if due:
+            self.flush()
+
+    def _check_process(self):
+        # A forked worker starts from zero in a file of its own, so it neither
+        # counts the parent's requests twice nor overwrites the parent's file
+        if self._pid != os.getpid():
+            if self._pid is not None:
+                self._snapshot = MetricsSnapshot()
+            self._pid = os.getpid()
+            self._filename = f'{self._pid}-{uuid.uuid4().hex[:8]}.json'
+
+    def flush(self):
+        if not self.directory:
+            return
+        with self._lock:
+            self._last_flush = time.monotonic()
+            self._check_process()
+            if not self._dirty:
+                return
+            path = Path(self.directory) / self._filename
+            data = json.dumps(self._snapshot.to_json(), separators=(',', ':'))
+            self._dirty = False
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix('.tmp')
+        tmp.write_text(data)
+        os.replace(tmp, path)
+
+    def collect(self):
+        """A MetricsSnapshot of every process, this one up to date."""
+        total = MetricsSnapshot()
+        if not self.directory:
+            with self._lock:
+                total.merge_json(self._snapshot.to_json())
+            return total
+        self.flush()
+        self.compact()
+        directory = Path(self.directory)
+        # List the files before reading retired.json: a file compacted in
+        # between is then either still listed in `merged` or already gone
+        paths = [path for path in directory.glob('*.json') if path.name != RETIRED_FILENAME]
+        retired = self._read_retired(directory)
+        total.merge_json(retired)
+        merged = set(retired.get('merged', []))
+        for path in paths:
+            if path.name in merged:
+                continue
+            try:
+                total.merge_json(json.loads(path.read_text()))
+            except (OSError, ValueError):
+                # Removed or being replaced mid-read; counted on the next scrape
+                continue
+        return total
+
+    @staticmethod
+    def _read_retired(directory):
+        try:
+            return json.loads((directory / RETIRED_FILENAME).read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def compact(self):
+        """
+        Fold the files of exited workers into retired.json. The folded names
+        are recorded there, and the files are only deleted by the next
+        compaction, so a concurrent `collect` never counts one twice.
+        Returns the number of files folded.
+        """
+        if not self.directory:
+            return 0
+        directory = Path(self.directory)
+        existing = {path.name: path for path in directory.glob('*.json') if path.name != RETIRED_FILENAME}
+        candidates = [
+            path for path in existing.values()
+            if (pid := _file_pid(path)) is not None and pid != os.getpid() and not _pid_alive(pid)
+        ]
+        retired = self._read_retired(directory)
+        merged = set(retired.get('merged', []))
+        if not candidates and not merged:
+            return 0
+
+        lock = directory / COMPACT_LOCK_FILENAME
+        try:
+            os.close(os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        except FileExistsError:
+            try:
+                if time.time() - lock.stat().st_mtime > COMPACT_LOCK_TIMEOUT:
+                    lock.unlink(missing_ok=True)
+            except OSError:
+                pass
+            return 0
+        except OSError:
+            return 0
+
+        try:
+            # Re-read under the lock: another worker may have compacted since
+            retired = self._read_retired(directory)
+            merged = set(retired.get('merged', []))
+            snapshot = MetricsSnapshot()
+            snapshot.merge_json(retired)
+
+            folded = []
+            for path in candidates:
+                if path.name in merged:
+                    continue
+                try:
+                    snapshot.merge_json(json.loads(path.read_text()))
+                except (OSError, ValueError):
+                    continue
+                folded.append(path.name)
+
+            # Names folded by an earlier compaction: delete those files now and
+            # forget the ones already gone
+            stale = merged.intersection(existing)
+            data = snapshot.to_json()
+            data['merged'] = sorted(stale.union(folded))
+            tmp = directory / f'{RETIRED_FILENAME}.tmp'
+            tmp.write_text(json.dumps(data, separators=(',', ':')))
+            os.replace(tmp, directory / RETIRED_FILENAME)
+            for name in stale:
+                (directory / name).unlink(missing_ok=True)
+            return len(folded)
+        finally:
+            lock.unlink(missing_ok=True)
+
+    def reset(self):
+        with self._lock:
+            self._snapshot = MetricsSnapshot()
+            self._dirty = False
+        if self.directory:
+            for path in Path(self.directory).glob('*.json'):
+                path.unlink(missing_ok=True)
+
+
+metrics_store = MetricsStore()
+atexit.register(metrics_store.flush)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values, extra=''):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}'
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render(snapshot):
+    """The snapshot in the Prometheus text exposition format (version 0.0.4)."""
+    lines = [
+        '# HELP http_requests_total Requests by DRF route name, method and status class.',
+        '# TYPE http_requests_total counter',
+    ]
+    for labels, count in sorted(snapshot.requests.items()):
+        lines.append(f'http_requests_total{_labels(("view", "method", "status"), labels)} {count}')
+
+    lines += [
+        '# HELP http_response_cache_total Anonymous response cache lookups by outcome.',
+        '# TYPE http_response_cache_total counter',
+    ]
+    for labels, count in sorted(snapshot.cache.items()):
+        lines.append(f'http_response_cache_total{_labels(("view", "method", "outcome"), labels)} {count}')
+
+    for name, (metric, help_text, buckets) in HISTOGRAMS.items():
+        lines += [f'# HELP {metric} {help_text}', f'# TYPE {metric} histogram']
+        for labels, histogram in sorted(snapshot.histograms[name].items()):
+            cumulative = 0
+            for bound, count in zip([*buckets, '+Inf'], histogram.counts):
+                cumulative += count
+                le = 'le="+Inf"' if bound == '+Inf' else f'le="{_number(bound)}"'
+                lines.append(f'{metric}_bucket{_labels(("view", "method"), labels, le)} {cumulative}')
+            lines.append(f'{metric}_sum{_labels(("view", "method"), labels)} {_number(histogram.total)}')
+            lines.append(f'{metric}_count{_labels(("view", "method"), labels)} {cumulative}')
+    return '\n'.join(lines) + '\n'
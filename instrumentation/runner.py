@@ -0,0 +1,28 @@
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+from interactions.view_counter import view_counter
+
+
+class NPlusOneDetectingRunner(DiscoverRunner):
+    """
+    The default test runner with the N+1 detector (instrumentation.nplusone)
+    raising on every request the tests make, so a new per-row query pattern
+    fails the build rather than just slowing production down. The view
+    counter flushes inline instead of from its thread, and what tests left
+    buffered goes to the test database before it is destroyed.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._nplusone_settings = override_settings(
+            NPLUSONE_DETECTION=True, NPLUSONE_ACTION='raise', VIEW_COUNTER_FLUSH_INTERVAL=0,
+        )
+        self._nplusone_settings.enable()
+
+    def teardown_databases(self, old_config, **kwargs):
+        view_counter.flush()
+        super().teardown_databases(old_config, **kwargs)
+
+    def teardown_test_environment(self, **kwargs):
+        self._nplusone_settings.disable()
+        super().teardown_test_environment(**kwargs)
@@ -0,0 +1,8 @@
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from .models import RequestProfile
+
+
+@receiver(post_delete, sender=RequestProfile)
+def delete_profile_file(sender, instance, **kwargs):
+    instance.file_path.unlink(missing_ok=True)
@@ -0,0 +1,281 @@
+import json
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from rest_framework import serializers
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from accounts.models import User
+from prompts.models import Prompt
+from .models import RequestProfile
+from .nplusone import NPlusOneDetectionMiddleware, NPlusOneError, detect_n_plus_one, normalize_sql
+from .profiler import StackSampler
+from .prometheus import MetricsSnapshot, MetricsStore, metrics_store
+
+SAMPLE_RE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{(?:[a-zA-Z_]\w*="(?:[^"\\]|\\.)*",?)*\})? (\S+)$')
+LABEL_RE = re.compile(r'([a-zA-Z_]\w*)="((?:[^"\\]|\\.)*)"')
+
+
+def parse_exposition(text):
+    """{(name, frozenset(labels)): value}, failing on any line that isn't valid exposition format."""
+    samples, typed = {}, set()
+    for line in text.splitlines():
+        if line.startswith('# TYPE '):
+            typed.add(line.split()[2])
+            continue
+        if line.startswith('#'):
+            continue
+        match = SAMPLE_RE.match(line)
+        if not match:
+            raise AssertionError(f'Not a valid sample line: {line!r}')
+        name, labels, value = match.groups()
+        family = re.sub(r'_(bucket|sum|count)$', '', name)
+        if name not in typed and family not in typed:
+            raise AssertionError(f'Sample without a TYPE line: {line!r}')
+        samples[(name, frozenset(LABEL_RE.findall(labels or '')))] = float(value)
+    return samples
+
+
+class MetricsScrapeTests(TestCase):
+    def setUp(self):
+        self.metrics_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.metrics_dir.cleanup)
+        overrides = override_settings(METRICS_DIR=self.metrics_dir.name, INSTRUMENTATION_LOG_PATH=None)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        metrics_store.reset()
+
+        author = User.objects.create_user(email='author@example.com', username='author', password='pass12345')
+        Prompt.objects.create(title='Prompt', body='body', author=author, type='text')
+        self.client = APIClient()
+
+    def scrape(self, **headers):
+        response = self.client.get('/metrics', **headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/plain; version=0.0.4; charset=utf-8')
+        return parse_exposition(response.content.decode())
+
+    def test_requests_latency_queries_and_cache(self):
+        for _ in range(3):
+            self.client.get('/api/prompts/')
+        self.client.get('/api/no-such-route/')
+        samples = self.scrape()
+
+        labels = {('view', 'prompt-list'), ('method', 'GET')}
+        self.assertEqual(samples[('http_requests_total', frozenset(labels | {('status', '2xx')}))], 3)
+        self.assertEqual(samples[('http_requests_total', frozenset(
+            {('view', '<unmatched>'), ('method', 'GET'), ('status', '4xx')}))], 1)
+        self.assertEqual(samples[('http_response_cache_total', frozenset(labels | {('outcome', 'miss')}))], 1)
+        self.assertEqual(samples[('http_response_cache_total', frozenset(labels | {('outcome', 'hit')}))], 2)
+
+        for metric in ('http_request_duration_seconds', 'http_request_db_queries'):
+            buckets = sorted(
+                (float(dict(key[1])['le']), value) for key, value in samples.items()
+                if key[0] == f'{metric}_bucket' and labels <= key[1]
+            )
+            self.assertEqual(buckets[-1], (float('inf'), 3))
+            self.assertEqual([value for _, value in buckets], sorted(value for _, value in buckets))
+            self.assertEqual(samples[(f'{metric}_count', frozenset(labels))], 3)
+            self.assertGreater(samples[(f'{metric}_sum', frozenset(labels))], 0)
+
+    def test_totals_include_other_workers(self):
+        self.client.get('/api/prompts/')
+        other_worker = MetricsStore()
+        for status in (200, 500):
+            other_worker.observe({
+                'view': 'prompt-list', 'method': 'GET', 'status': status,
+                'duration_ms': 20, 'db_queries': 4, 'cache': None,
+            })
+        other_worker.flush()
+
+        samples = self.scrape()
+        labels = {('view', 'prompt-list'), ('method', 'GET')}
+        self.assertEqual(samples[('http_requests_total', frozenset(labels | {('status', '2xx')}))], 2)
+        self.assertEqual(samples[('http_requests_total', frozenset(labels | {('status', '5xx')}))], 1)
+        self.assertEqual(samples[('http_request_duration_seconds_count', frozenset(labels))], 3)
+
+    @override_settings(METRICS_TOKEN='scrape-secret')
+    def test_token_required_when_configured(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 401)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong').status_code, 401)
+        self.scrape(HTTP_AUTHORIZATION='Bearer scrape-secret')
+
+    @override_settings(METRICS_ALLOWED_IPS=['10.0.0.0/8', '192.168.1.5'])
+    def test_without_a_token_only_allowed_addresses_may_scrape(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        self.scrape(REMOTE_ADDR='10.1.2.3')
+        self.scrape(REMOTE_ADDR='192.168.1.5')
+        with self.settings(DEBUG=True):
+            self.scrape()
+
+    def test_files_of_exited_workers_are_compacted(self):
+        exited = subprocess.Popen([sys.executable, '-c', 'pass'])
+        exited.wait()
+        snapshot = MetricsSnapshot()
+        snapshot.observe({'view': 'prompt-list', 'method': 'GET', 'status': 200, 'duration_ms': 20, 'db_queries': 4})
+        directory = Path(self.metrics_dir.name)
+        directory.joinpath(f'{exited.pid}-deadbeef.json').write_text(json.dumps(snapshot.to_json()))
+        self.client.get('/api/prompts/')
+
+        labels = frozenset({('view', 'prompt-list'), ('method', 'GET'), ('status', '2xx')})
+        for _ in range(3):
+            self.assertEqual(self.scrape()[('http_requests_total', labels)], 2)
+        self.assertEqual({path.name for path in directory.glob('*.json')}, {'retired.json', metrics_store._filename})
+
+
+@override_settings(INSTRUMENTATION_LOG_PATH=None)
+class ServerTimingTests(TestCase):
+    def test_header_only_when_enabled(self):
+        with self.settings(INSTRUMENTATION_SERVER_TIMING=True):
+            header = APIClient().get('/api/prompts/')['Server-Timing']
+        self.assertRegex(header, r'^db;dur=[\d.]+;desc="\d+ queries", serializer;dur=[\d.]+, auth;dur=[\d.]+, total;dur=[\d.]+$')
+        with self.settings(INSTRUMENTATION_SERVER_TIMING=False):
+            self.assertNotIn('Server-Timing', APIClient().get('/api/prompts/'))
+
+
+class AuthorEmailSerializer(serializers.ModelSerializer):
+    author_email = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Prompt
+        fields = ['id', 'author_email']
+
+    def get_author_email(self, obj):
+        return User.objects.get(pk=obj.author_id).email
+
+
+class NPlusOneDetectorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(email='author@example.com', username='author', password='pass12345')
+        Prompt.objects.bulk_create([
+            Prompt(title=f'Prompt {i}', slug=f'prompt-{i}', body='body', author=cls.author, type='text')
+            for i in range(8)
+        ])
+
+    def test_shapes_ignore_literals_and_in_list_length(self):
+        self.assertEqual(
+            normalize_sql('SELECT "id" FROM "prompts" WHERE "id" IN (%s, %s, %s) AND "title" = \'x\' LIMIT 21'),
+            normalize_sql('SELECT  "id" FROM "prompts" WHERE "id" IN (%s) AND "title" = \'yy\' LIMIT 5'),
+        )
+
+    def test_points_at_serializer_field(self):
+        with self.assertRaises(NPlusOneError) as raised:
+            with detect_n_plus_one('serializing prompts'):
+                AuthorEmailSerializer(Prompt.objects.all(), many=True).data
+        message = str(raised.exception)
+        self.assertIn('8 x SELECT', message)
+        self.assertIn('AuthorEmailSerializer.author_email at instrumentation/tests.py', message)
+        self.assertIn('in get_author_email', message)
+
+    def test_batched_queries_pass(self):
+        with detect_n_plus_one('serializing prompts') as detector:
+            list(Prompt.objects.select_related('author'))
+        self.assertEqual(detector.repeated(), [])
+
+    def test_middleware_fails_or_logs_the_request(self):
+        def per_row_view(request):
+            for prompt in Prompt.objects.all():
+                User.objects.get(pk=prompt.author_id)
+            return HttpResponse()
+
+        middleware = NPlusOneDetectionMiddleware(per_row_view)
+        request = RequestFactory().get('/feed/')
+        with self.assertRaisesMessage(NPlusOneError, 'Possible N+1 queries in GET /feed/'):
+            middleware(request)
+        with self.settings(NPLUSONE_ACTION='log'), self.assertLogs('instrumentation.nplusone', 'WARNING'):
+            self.assertEqual(middleware(request).status_code, 200)
+        with self.settings(NPLUSONE_DETECTION=False), self.assertNoLogs('instrumentation.nplusone'):
+            middleware(request)
+
+    def test_server_errors_are_not_reported(self):
+        def failing_view(request):
+            for prompt in Prompt.objects.all():
+                User.objects.get(pk=prompt.author_id)
+            return HttpResponse(status=500)
+
+        with self.assertNoLogs('instrumentation.nplusone'):
+            self.assertEqual(NPlusOneDetectionMiddleware(failing_view)(RequestFactory().get('/feed/')).status_code, 500)
+
+
+def slow_function():
+    time.sleep(0.05)
+
+
+class ProfilerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(email='admin@example.com', username='admin', password='pass12345')
+        cls.user = User.objects.create_user(email='user@example.com', username='user', password='pass12345')
+
+    def setUp(self):
+        profile_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(profile_dir.cleanup)
+        overrides = override_settings(PROFILER_DIR=profile_dir.name, INSTRUMENTATION_LOG_PATH=None, METRICS_DIR=None)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        self.client = APIClient()
+
+    def authenticate(self, user):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+
+    def test_sampler_folds_stacks(self):
+        sampler = StackSampler(0.001)
+        sampler.start()
+        slow_function()
+        sampler.stop()
+        self.assertGreater(sampler.samples, 5)
+        lines = sampler.folded().splitlines()
+        self.assertTrue(any(';slow_function (instrumentation/tests.py:' in line for line in lines))
+        self.assertTrue(all(re.fullmatch(r'[^;]+(;[^;]+)* \d+', line) for line in lines))
+
+    def test_superuser_requests_a_profile(self):
+        self.authenticate(self.admin)
+        response = self.client.get('/api/tags/popular/', HTTP_X_PROFILE='1')
+        profile = RequestProfile.objects.get()
+        self.assertEqual(response['X-Profile-Id'], str(profile.pk))
+        self.assertEqual(
+            (profile.view, profile.trigger, profile.user, profile.status), ('tag-popular', 'requested', self.admin, 200)
+        )
+        self.assertTrue(profile.file_path.exists())
+
+        self.client.get('/api/tags/popular/?_profile=1')
+        self.assertEqual(RequestProfile.objects.count(), 2)
+
+    def test_other_users_cannot_request_profiles(self):
+        self.client.get('/api/tags/popular/?_profile=1')
+        self.authenticate(self.user)
+        response = self.client.get('/api/tags/popular/', HTTP_X_PROFILE='1')
+        self.assertNotIn('X-Profile-Id', response)
+        self.assertFalse(RequestProfile.objects.exists())
+
+    @override_settings(PROFILER_SAMPLE_RATES={'tag-popular': 1.0}, PROFILER_MAX_PROFILES=2)
+    def test_sampled_routes_and_retention(self):
+        self.client.get('/api/tags/')
+        self.assertFalse(RequestProfile.objects.exists())
+
+        for _ in range(3):
+            self.client.get('/api/tags/popular/')
+        profiles = list(RequestProfile.objects.all())
+        self.assertEqual(len(profiles), 2)
+        self.assertEqual({profile.trigger for profile in profiles}, {'sampled'})
+        self.assertEqual(
+            {path.name for path in profiles[0].file_path.parent.iterdir()},
+            {profile.filename for profile in profiles},
+        )
+
+    def test_admin_lists_and_downloads_profiles(self):
+        self.authenticate(self.admin)
+        profile_id = self.client.get('/api/tags/popular/', HTTP_X_PROFILE='1')['X-Profile-Id']
+        self.client.force_login(self.admin)
+
+        response = self.client.get('/admin/instrumentation/requestprofile/')
+        self.assertContains(response, '/api/tags/popular/')
+        response = self.client.get(f'/admin/instrumentation/requestprofile/{profile_id}/folded/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/plain')
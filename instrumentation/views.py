@@ -0,0 +1,39 @@
+import ipaddress
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.http import require_GET
+from .prometheus import metrics_store, render
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def client_allowed(request):
+    """Whether REMOTE_ADDR is in METRICS_ALLOWED_IPS (addresses or CIDR networks)."""
+    try:
+        address = ipaddress.ip_address(request.META.get('REMOTE_ADDR', ''))
+    except ValueError:
+        return False
+    for allowed in getattr(settings, 'METRICS_ALLOWED_IPS', ['127.0.0.1', '::1']):
+        try:
+            if address in ipaddress.ip_network(allowed.strip(), strict=False):
+                return True
+        except ValueError:
+            continue
+    return False
+
+
+@require_GET
+def metrics(request):
+    """
+    Request metrics of every worker in the Prometheus text format.
+    Scrapes must send METRICS_TOKEN when it is set; otherwise, outside
+    DEBUG, they must come from METRICS_ALLOWED_IPS.
+    """
+    token = getattr(settings, 'METRICS_TOKEN', None)
+    if token:
+        if not constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}'):
+            return HttpResponse('Unauthorized\n', status=401, content_type=CONTENT_TYPE)
+    elif not settings.DEBUG and not client_allowed(request):
+        return HttpResponse('Forbidden\n', status=403, content_type=CONTENT_TYPE)
+    return HttpResponse(render(metrics_store.collect()), content_type=CONTENT_TYPE)
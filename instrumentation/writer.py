@@ -0,0 +1,77 @@
+import atexit
+import json
+import logging
+import os
+import threading
+from collections import deque
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class JSONLWriter:
+    """
+    Appends records to INSTRUMENTATION_LOG_PATH as JSON lines without
+    blocking the request: `write` only queues the record, and a background
+    thread appends the queue to the file every INSTRUMENTATION_FLUSH_INTERVAL
+    seconds (and at exit). When more than INSTRUMENTATION_MAX_PENDING records
+    are waiting (a slow disk) new ones are dropped and counted in `dropped`.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = deque()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._pid = None
+        self.dropped = 0
+
+    @property
+    def path(self):
+        return getattr(settings, 'INSTRUMENTATION_LOG_PATH', None)
+
+    def write(self, record):
+        if not self.path:
+            return
+        with self._lock:
+            if len(self._pending) >= getattr(settings, 'INSTRUMENTATION_MAX_PENDING', 10000):
+                self.dropped += 1
+                return
+            self._pending.append(record)
+        self._ensure_thread()
+
+    def _ensure_thread(self):
+        # Threads don't survive fork, so pre-forked workers start their own
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='instrumentation-writer', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(getattr(settings, 'INSTRUMENTATION_FLUSH_INTERVAL', 1))
+            self._wakeup.clear()
+            self.flush()
+
+    def flush(self):
+        """Append every queued record to the file. Returns the number written."""
+        with self._lock:
+            pending, self._pending = self._pending, deque()
+        if not pending or not self.path:
+            return 0
+        lines = ''.join(json.dumps(record, separators=(',', ':'), default=str) + '\n' for record in pending)
+        try:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(lines)
+        except OSError:
+            logger.exception('Failed to write %d request records to %s', len(pending), self.path)
+            return 0
+        return len(pending)
+
+
+request_log = JSONLWriter()
+atexit.register(request_log.flush)
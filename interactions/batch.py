@@ -0,0 +1,171 @@
+from collections import defaultdict
+from functools import partial
+from django.db import connection, transaction
+from django.utils import timezone
+from caching.generations import bump_generation
+from config.sql import column, prep, table_name
+from .counters import apply_vote_changes, get_content_model
+from .models import Bookmark
+from .votes import delete_votes, upsert_votes
+
+MAX_OPERATIONS = 500
+VOTE_OPS = ('vote', 'unvote')
+BOOKMARK_OPS = ('bookmark', 'unbookmark')
+
+
+def find_missing_targets(operations):
+    """Targets (type, id) that do not exist, with one query per content type."""
+    ids_by_type = defaultdict(set)
+    for operation in operations:
+        ids_by_type[operation['type']].add(operation['id'])
+    missing = set()
+    for content_type, ids in ids_by_type.items():
+        found = set(get_content_model(content_type)._base_manager.filter(pk__in=ids).values_list('pk', flat=True))
+        missing.update((content_type, obj_id) for obj_id in ids - found)
+    return missing
+
+
+_bookmark_column = partial(column, Bookmark)
+
+
+def _returned_targets(cursor):
+    id_field = Bookmark._meta.get_field('bookmarkable_id')
+    return {(content_type, id_field.to_python(obj_id)) for content_type, obj_id in cursor.fetchall()}
+
+
+def _insert_bookmarks(user, targets):
+    """
+    Raw INSERT ... ON CONFLICT DO NOTHING RETURNING: the per-object signals
+    are replaced by one batched update. Returns the targets actually inserted
+    (a concurrent request may have bookmarked some first).
+    """
+    if not targets:
+        return set()
+    now = timezone.now()
+    names = ['user', 'bookmarkable_type', 'bookmarkable_id', 'created_at']
+    params = []
+    for content_type, obj_id in targets:
+        params.extend(
+            prep(Bookmark, name, value)
+            for name, value in zip(names, (user.pk, content_type, obj_id, now))
+        )
+    table = table_name(Bookmark)
+    row = '(' + ', '.join(['%s'] * len(names)) + ')'
+    sql = (
+        f'INSERT INTO {table} ({", ".join(_bookmark_column(name) for name in names)}) '
+        f'VALUES {", ".join([row] * len(targets))} '
+        f'ON CONFLICT ({", ".join(_bookmark_column(name) for name in names[:3])}) DO NOTHING '
+        f'RETURNING {_bookmark_column("bookmarkable_type")}, {_bookmark_column("bookmarkable_id")}'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return _returned_targets(cursor)
+
+
+def _delete_bookmarks(pks):
+    """Raw DELETE ... RETURNING, like _insert_bookmarks. Returns the targets actually removed."""
+    if not pks:
+        return set()
+    table = table_name(Bookmark)
+    sql = (
+        f'DELETE FROM {table} WHERE {_bookmark_column("id")} IN ({", ".join(["%s"] * len(pks))}) '
+        f'RETURNING {_bookmark_column("bookmarkable_type")}, {_bookmark_column("bookmarkable_id")}'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [prep(Bookmark, 'id', pk) for pk in pks])
+        return _returned_targets(cursor)
+
+
+def _apply_votes(user, operations):
+    final = {}
+    for operation in operations:
+        final[(operation['type'], operation['id'])] = operation.get('value') if operation['op'] == 'vote' else None
+
+    upserted = upsert_votes(user, {target: value for target, value in final.items() if value is not None})
+    initial = {(vote.votable_type, vote.votable_id): vote.previous_value for vote in upserted}
+    initial.update(delete_votes(user, [target for target, value in final.items() if value is None]))
+
+    apply_vote_changes({target: (initial.get(target), value) for target, value in final.items()})
+    if upserted or any(initial.values()):
+        bump_generation('interactions.Vote')
+    return initial
+
+
+def _apply_bookmarks(user, operations):
+    from trending.engine import get_weights, record_activity
+
+    final = {}
+    for operation in operations:
+        final[(operation['type'], operation['id'])] = operation['op'] == 'bookmark'
+
+    existing = {
+        (bookmarkable_type, bookmarkable_id): pk
+        for pk, bookmarkable_type, bookmarkable_id in Bookmark.objects.filter(
+            user=user, bookmarkable_id__in={obj_id for _, obj_id in final}
+        ).values_list('pk', 'bookmarkable_type', 'bookmarkable_id')
+    }
+    to_add = [target for target, wanted in final.items() if wanted and target not in existing]
+    to_remove = [target for target, wanted in final.items() if not wanted and target in existing]
+
+    added = _insert_bookmarks(user, to_add)
+    removed = _delete_bookmarks([existing[target] for target in to_remove])
+
+    # Only rows this batch really wrote move the ranks
+    weight = get_weights()['bookmark']
+    trending = defaultdict(dict)
+    for content_type, obj_id in added:
+        trending[content_type][obj_id] = weight
+    for content_type, obj_id in removed:
+        trending[content_type][obj_id] = -weight
+    for content_type, weights in trending.items():
+        record_activity(content_type, weights)
+    if added or removed:
+        bump_generation('interactions.Bookmark')
+
+    # Targets a concurrent request got to first were already in their final state
+    initial = {target: target in existing for target in final}
+    initial.update({target: True for target in to_add if target not in added})
+    initial.update({target: False for target in to_remove if target not in removed})
+    return initial
+
+
+def apply_batch(user, operations):
+    """
+    Apply validated vote/unvote/bookmark/unbookmark operations, in order,
+    in one transaction. Several operations on the same target collapse to
+    the last one, so every target is written once: votes with one bulk
+    upsert and one bulk delete, bookmarks with one bulk insert and one bulk
+    delete, and counters once per affected object.
+    operations is a list of (index, {'op', 'type', 'id', 'value'}).
+    Returns {index: result}.
+    """
+    results = {}
+    with transaction.atomic():
+        missing = find_missing_targets([operation for _, operation in operations])
+        valid = []
+        for index, operation in operations:
+            if (operation['type'], operation['id']) in missing:
+                results[index] = {'index': index, 'status': 'error', 'errors': {'id': ['Object not found']}}
+            else:
+                valid.append((index, operation))
+
+        votes = [operation for _, operation in valid if operation['op'] in VOTE_OPS]
+        bookmarks = [operation for _, operation in valid if operation['op'] in BOOKMARK_OPS]
+        vote_state = _apply_votes(user, votes) if votes else {}
+        bookmark_state = _apply_bookmarks(user, bookmarks) if bookmarks else {}
+
+    # Replay the operations from the state before the batch for per-operation results
+    for index, operation in valid:
+        target = (operation['type'], operation['id'])
+        result = {'index': index, 'status': 'ok', 'op': operation['op'],
+                  'type': operation['type'], 'id': operation['id']}
+        if operation['op'] in VOTE_OPS:
+            new_value = operation.get('value') if operation['op'] == 'vote' else None
+            result.update(previous_value=vote_state.get(target), value=new_value)
+            vote_state[target] = new_value
+        else:
+            wanted = operation['op'] == 'bookmark'
+            result.update(bookmarked=wanted, changed=bookmark_state.get(target, False) != wanted)
+            bookmark_state[target] = wanted
+        results[index] = result
+    return results
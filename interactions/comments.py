@@ -0,0 +1,24 @@
+from django.core.cache import cache
+from django.db import transaction
+
+FIRST_PAGE_CACHE_PREFIX = 'comments:first-page:'
+FIRST_PAGE_CACHE_TIMEOUT = 60 * 10
+
+
+def first_page_key(commentable_type, commentable_id):
+    return f'{FIRST_PAGE_CACHE_PREFIX}{int(commentable_type)}:{commentable_id}'
+
+
+def get_first_page(commentable_type, commentable_id):
+    """Cached {'count', 'results'} of the newest comments on an object, or None."""
+    return cache.get(first_page_key(commentable_type, commentable_id))
+
+
+def set_first_page(commentable_type, commentable_id, data):
+    cache.set(first_page_key(commentable_type, commentable_id), data, FIRST_PAGE_CACHE_TIMEOUT)
+
+
+def invalidate_first_page(commentable_type, commentable_id):
+    """Drop the cached first page once the current transaction commits."""
+    key = first_page_key(commentable_type, commentable_id)
+    transaction.on_commit(lambda: cache.delete(key))
@@ -0,0 +1,71 @@
+from collections import defaultdict
+from django.apps import apps
+from django.db.models import F
+
+# Type mapping shared by comments, votes, bookmarks and taggables
+CONTENT_MODELS = {
+    1: 'prompts.Prompt',
+    2: 'content.Tool',
+    3: 'content.News',
+    4: 'content.Blog',
+}
+
+
+def get_content_model(content_type):
+    """Return the model class for a polymorphic type id, or None."""
+    try:
+        model_label = CONTENT_MODELS.get(int(content_type))
+    except (TypeError, ValueError):
+        return None
+    return apps.get_model(model_label) if model_label else None
+
+
+def vote_deltas(old_value, new_value):
+    """
+    Counter deltas for a vote going from old_value to new_value.
+    None means "no vote", so None -> 1 is a new upvote and 1 -> -1 is a flip.
+    """
+    old_value = int(old_value) if old_value is not None else None
+    new_value = int(new_value) if new_value is not None else None
+    return {
+        'upvotes': (new_value == 1) - (old_value == 1),
+        'downvotes': (new_value == -1) - (old_value == -1),
+        'score': (new_value or 0) - (old_value or 0),
+    }
+
+
+def apply_vote_changes(changes):
+    """
+    Apply vote changes, {(votable_type, votable_id): (old_value, new_value)},
+    to the stored upvotes/downvotes/score columns and the trending ranks.
+    Objects whose counters move by the same deltas share one F-expression
+    UPDATE, so a batch costs a handful of statements, not one per object.
+    """
+    from trending.engine import record_activity, vote_weight
+
+    groups = defaultdict(list)
+    trending = defaultdict(dict)
+    for (votable_type, votable_id), (old_value, new_value) in changes.items():
+        if get_content_model(votable_type) is None:
+            continue
+        trending[int(votable_type)][votable_id] = vote_weight(new_value) - vote_weight(old_value)
+        deltas = tuple((field, delta) for field, delta in vote_deltas(old_value, new_value).items() if delta)
+        if deltas:
+            groups[(int(votable_type), deltas)].append(votable_id)
+
+    updated = 0
+    for (votable_type, deltas), ids in groups.items():
+        updated += get_content_model(votable_type).objects.filter(pk__in=ids).update(
+            **{field: F(field) + delta for field, delta in deltas}
+        )
+    for votable_type, weights in trending.items():
+        record_activity(votable_type, weights)
+    return updated
+
+
+def apply_comment_change(commentable_type, commentable_id, delta):
+    """Move the stored comment_count of the commented object by delta."""
+    Model = get_content_model(commentable_type)
+    if Model is None or not delta:
+        return 0
+    return Model.objects.filter(pk=commentable_id).update(comment_count=F('comment_count') + delta)
@@ -0,0 +1,41 @@
+from django.db import migrations
+from django.db.models import Count, Q, Sum
+
+VOTABLE_MODELS = {
+    1: ('prompts', 'Prompt'),
+    2: ('content', 'Tool'),
+    3: ('content', 'News'),
+    4: ('content', 'Blog'),
+}
+
+
+def backfill_vote_scores(apps, schema_editor):
+    Vote = apps.get_model('interactions', 'Vote')
+    totals = Vote.objects.values('votable_type', 'votable_id').annotate(
+        up=Count('id', filter=Q(value=1)),
+        down=Count('id', filter=Q(value=-1)),
+        total=Sum('value'),
+    )
+    for row in totals.iterator():
+        app_label, model_name = VOTABLE_MODELS.get(row['votable_type'], (None, None))
+        if not app_label:
+            continue
+        Model = apps.get_model(app_label, model_name)
+        Model.objects.filter(pk=row['votable_id']).update(
+            upvotes=row['up'],
+            downvotes=row['down'],
+            score=row['total'] or 0,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('interactions', '0003_vote_prompts'),
+        ('prompts', '0002_prompt_downvotes_prompt_score_prompt_upvotes_and_more'),
+        ('content', '0004_blog_downvotes_blog_score_blog_upvotes_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_vote_scores, migrations.RunPython.noop),
+    ]
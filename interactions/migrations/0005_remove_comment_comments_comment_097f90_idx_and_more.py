@@ -0,0 +1,27 @@
+# Generated by Django 5.2.8 on 2026-10-18 10:26
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('interactions', '0004_backfill_vote_scores'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='comment',
+            name='comments_comment_097f90_idx',
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['commentable_type', 'commentable_id', '-created_at', '-id'], name='comments_comment_b9fd06_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['-created_at', '-id'], name='comments_created_b6d679_idx'),
+        ),
+    ]
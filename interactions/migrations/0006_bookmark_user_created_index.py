@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-18 10:29
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('interactions', '0005_remove_comment_comments_comment_097f90_idx_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bookmark',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='bookmarks_user_id_918d57_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+from django.db import migrations
+from django.db.models import Count
+
+COMMENTABLE_MODELS = {
+    1: ('prompts', 'Prompt'),
+    2: ('content', 'Tool'),
+    3: ('content', 'News'),
+    4: ('content', 'Blog'),
+}
+
+
+def backfill_comment_counts(apps, schema_editor):
+    Comment = apps.get_model('interactions', 'Comment')
+    totals = Comment.objects.values('commentable_type', 'commentable_id').annotate(
+        total=Count('id')
+    ).order_by()
+    for row in totals.iterator():
+        app_label, model_name = COMMENTABLE_MODELS.get(row['commentable_type'], (None, None))
+        if not app_label:
+            continue
+        Model = apps.get_model(app_label, model_name)
+        Model.objects.filter(pk=row['commentable_id']).update(comment_count=row['total'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('interactions', '0006_bookmark_user_created_index'),
+        ('prompts', '0004_prompt_comment_count'),
+        ('content', '0007_blog_comment_count_news_comment_count_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_comment_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 10:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('interactions', '0007_backfill_comment_counts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vote',
+            name='previous_value',
+            field=models.IntegerField(blank=True, editable=False, help_text='value before the last upsert (see interactions.votes)', null=True),
+        ),
+    ]
@@ -28,8 +28,9 @@ class Comment(models.Model):
     class Meta:
         db_table = 'comments'
         indexes = [
-            models.Index(fields=['commentable_type', 'commentable_id']),
+            models.Index(fields=['commentable_type', 'commentable_id', '-created_at', '-id']),
             models.Index(fields=['author']),
+            models.Index(fields=['-created_at', '-id']),
         ]
         ordering = ['-created_at']
     
@@ -60,6 +61,7 @@ class Bookmark(models.Model):
         unique_together = ['user', 'bookmarkable_type', 'bookmarkable_id']
         indexes = [
             models.Index(fields=['bookmarkable_type', 'bookmarkable_id']),
+            models.Index(fields=['user', '-created_at', '-id']),
         ]
     
     def __str__(self):
@@ -71,6 +73,8 @@ class Bookmark(models.Model):
 
     def get_content_object(self):
         """Resolve and return the actual bookmarked object instance (or None)."""
+        if hasattr(self, 'resolved_content_object'):
+            return self.resolved_content_object
         try:
             model_map = {
                 1: 'prompts.Prompt',
@@ -113,6 +117,8 @@ class Vote(models.Model):
     votable_type = models.IntegerField(choices=VOTABLE_TYPES)
     votable_id = models.UUIDField()
     value = models.IntegerField(choices=VOTE_VALUES)
+    previous_value = models.IntegerField(null=True, blank=True, editable=False,
+                                         help_text='value before the last upsert (see interactions.votes)')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
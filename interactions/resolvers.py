@@ -0,0 +1,53 @@
+from collections import defaultdict
+from django.db import models
+from rest_framework import serializers
+from .counters import get_content_model
+
+# Relations the content serializers read, per content type
+CONTENT_RELATED = {
+    1: ['author'],
+    2: ['author', 'type'],
+    3: ['author'],
+    4: ['author'],
+}
+
+
+def resolve_content_objects(rows, type_field, id_field, to_attr='resolved_content_object',
+                            related=CONTENT_RELATED):
+    """
+    Resolve the polymorphic targets of a page of bookmarks, comments or votes.
+    Rows are grouped by `type_field` and each content model is fetched once
+    with pk__in; every row gets the object (or None) as `to_attr`.
+    """
+    rows = [row for row in rows if isinstance(row, models.Model)]
+    ids_by_type = defaultdict(set)
+    for row in rows:
+        ids_by_type[getattr(row, type_field)].add(getattr(row, id_field))
+
+    objects = {}
+    for content_type, ids in ids_by_type.items():
+        Model = get_content_model(content_type)
+        if Model is None:
+            continue
+        queryset = Model._base_manager.filter(pk__in=ids)
+        if related and related.get(content_type):
+            queryset = queryset.select_related(*related[content_type])
+        for obj in queryset:
+            objects[(content_type, obj.pk)] = obj
+
+    for row in rows:
+        setattr(row, to_attr, objects.get((getattr(row, type_field), getattr(row, id_field))))
+    return rows
+
+
+class ContentObjectListSerializer(serializers.ListSerializer):
+    """
+    Resolves the content objects of the whole page before rendering.
+    The child serializer names its polymorphic columns with
+    `content_type_field` / `content_id_field`.
+    """
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, models.manager.BaseManager) else data
+        items = list(iterable)
+        resolve_content_objects(items, self.child.content_type_field, self.child.content_id_field)
+        return super().to_representation(items)
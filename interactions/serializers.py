@@ -1,6 +1,9 @@
 from rest_framework import serializers
 from .models import Comment, Vote, Bookmark
 from accounts.serializers import UserSerializer
+from .batch import MAX_OPERATIONS
+from .counters import get_content_model
+from .resolvers import ContentObjectListSerializer
 
 class CommentSerializer(serializers.ModelSerializer):
     author = UserSerializer(read_only=True)
@@ -40,14 +43,28 @@ class VoteSerializer(serializers.ModelSerializer):
         model = Vote
         fields = ['votable_type', 'votable_id', 'value', 'created_at']
         read_only_fields = ['created_at']
+    
+    def validate(self, data):
+        Model = get_content_model(data['votable_type'])
+        if not Model.objects.filter(pk=data['votable_id']).exists():
+            raise serializers.ValidationError({'votable_id': 'Object not found'})
+        return data
+
+
+class VoteTargetSerializer(serializers.Serializer):
+    votable_type = serializers.ChoiceField(choices=Vote.VOTABLE_TYPES)
+    votable_id = serializers.UUIDField()
 
 
 class BookmarkSerializer(serializers.ModelSerializer):
     content_object = serializers.SerializerMethodField()
+    content_type_field = 'bookmarkable_type'
+    content_id_field = 'bookmarkable_id'
     
     class Meta:
         model = Bookmark
         fields = ['bookmarkable_type', 'bookmarkable_id', 'created_at', 'content_object']
+        list_serializer_class = ContentObjectListSerializer
     
     def get_content_object(self, obj):
         """Return the actual bookmarked content"""
@@ -71,3 +88,21 @@ class BookmarkSerializer(serializers.ModelSerializer):
             return None
         except:
             return None
+
+
+class BatchOperationSerializer(serializers.Serializer):
+    """One operation of POST /interactions/batch/"""
+    op = serializers.ChoiceField(choices=['vote', 'unvote', 'bookmark', 'unbookmark'])
+    type = serializers.ChoiceField(choices=Vote.VOTABLE_TYPES)
+    id = serializers.UUIDField()
+    value = serializers.ChoiceField(choices=Vote.VOTE_VALUES, required=False)
+    
+    def validate(self, data):
+        if data['op'] == 'vote' and 'value' not in data:
+            raise serializers.ValidationError({'value': 'Required for vote (1 or -1)'})
+        return data
+
+
+class InteractionBatchSerializer(serializers.Serializer):
+    operations = serializers.ListField(child=serializers.DictField(), allow_empty=False,
+                                       max_length=MAX_OPERATIONS)
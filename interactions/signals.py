@@ -0,0 +1,18 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .comments import invalidate_first_page
+from .counters import apply_comment_change
+from .models import Comment
+
+
+@receiver(post_save, sender=Comment, dispatch_uid='comment_saved')
+def comment_saved(sender, instance, created, **kwargs):
+    if created:
+        apply_comment_change(instance.commentable_type, instance.commentable_id, 1)
+    invalidate_first_page(instance.commentable_type, instance.commentable_id)
+
+
+@receiver(post_delete, sender=Comment, dispatch_uid='comment_deleted')
+def comment_deleted(sender, instance, **kwargs):
+    apply_comment_change(instance.commentable_type, instance.commentable_id, -1)
+    invalidate_first_page(instance.commentable_type, instance.commentable_id)
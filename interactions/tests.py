@@ -1,3 +1,324 @@
-from django.test import TestCase
+import threading
+import time
+import uuid
+from unittest import mock
+from django.db import DatabaseError, connection
+from django.db.models import Count, Q, Sum
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from accounts.models import User
+from prompts.models import Prompt
+from trending.models import TrendingScore
+from .batch import _insert_bookmarks
+from .comments import get_first_page
+from .models import Bookmark, Comment, Vote
+from .view_counter import ViewCounter, get_view_count, record_view, view_counter
+from .votes import cast_vote, remove_vote
 
 
+class ConcurrentVoteTests(TransactionTestCase):
+    """Many threads voting on one prompt must leave counters equal to the vote rows."""
+    threads = 8
+    rounds = 6
+
+    def setUp(self):
+        self.author = User.objects.create_user(email='author@example.com', username='author', password='pass12345')
+        self.prompt = Prompt.objects.create(title='Viral', body='body', author=self.author, type='text')
+        self.voters = [
+            User.objects.create_user(email=f'voter{i}@example.com', username=f'voter{i}', password='pass12345')
+            for i in range(self.threads)
+        ]
+
+    def hammer(self, work):
+        """Run work(index) on every thread at once and re-raise the first error."""
+        barrier = threading.Barrier(self.threads)
+        errors = []
+
+        def run(index):
+            try:
+                barrier.wait()
+                for round_number in range(self.rounds):
+                    work(index, round_number)
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=run, args=(i,)) for i in range(self.threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        if errors:
+            raise errors[0]
+
+    def assertCountersMatchVotes(self):
+        self.prompt.refresh_from_db()
+        totals = Vote.objects.filter(votable_type=1, votable_id=self.prompt.pk).aggregate(
+            up=Count('id', filter=Q(value=1)),
+            down=Count('id', filter=Q(value=-1)),
+            total=Sum('value'),
+        )
+        self.assertEqual(self.prompt.upvotes, totals['up'])
+        self.assertEqual(self.prompt.downvotes, totals['down'])
+        self.assertEqual(self.prompt.score, totals['total'] or 0)
+
+    def test_many_users_flipping_votes(self):
+        def work(index, round_number):
+            value = 1 if (index + round_number) % 2 else -1
+            cast_vote(self.voters[index], 1, self.prompt.pk, value)
+
+        self.hammer(work)
+        self.assertEqual(Vote.objects.count(), self.threads)
+        self.assertCountersMatchVotes()
+
+    def test_one_user_racing_itself(self):
+        voter = self.voters[0]
+
+        def work(index, round_number):
+            if (index + round_number) % 3 == 0:
+                remove_vote(voter, 1, self.prompt.pk)
+            else:
+                cast_vote(voter, 1, self.prompt.pk, 1 if index % 2 else -1)
+
+        self.hammer(work)
+        self.assertLessEqual(Vote.objects.filter(user=voter).count(), 1)
+        self.assertCountersMatchVotes()
+
+    def test_upsert_returns_previous_value(self):
+        voter = self.voters[0]
+        vote, old_value = cast_vote(voter, 1, self.prompt.pk, 1)
+        self.assertIsNone(old_value)
+        self.assertEqual(vote.prompts_id, self.prompt.pk)
+        vote, old_value = cast_vote(voter, 1, self.prompt.pk, -1)
+        self.assertEqual((old_value, vote.value), (1, -1))
+        self.assertEqual(remove_vote(voter, 1, self.prompt.pk), -1)
+        self.assertIsNone(remove_vote(voter, 1, self.prompt.pk))
+        self.assertCountersMatchVotes()
+
+
+class VoteRouteTests(TestCase):
+    """Every vote route must keep the counters in step with the vote rows."""
+
+    def setUp(self):
+        author = User.objects.create_user(email='author@example.com', username='author', password='pass12345')
+        self.voter = User.objects.create_user(email='voter@example.com', username='voter', password='pass12345')
+        self.prompt = Prompt.objects.create(title='Prompt', body='body', author=author, type='text')
+        self.client = APIClient()
+        self.client.force_authenticate(self.voter)
+
+    def vote(self, value):
+        return self.client.post('/api/votes/', {'votable_type': 1, 'votable_id': str(self.prompt.pk), 'value': value})
+
+    def assertCounters(self, score, upvotes, downvotes):
+        self.prompt.refresh_from_db()
+        self.assertEqual((self.prompt.score, self.prompt.upvotes, self.prompt.downvotes), (score, upvotes, downvotes))
+
+    def test_put_moves_counters(self):
+        self.assertEqual(self.vote(1).status_code, 201)
+        vote = Vote.objects.get(user=self.voter)
+        response = self.client.put(
+            f'/api/votes/{vote.pk}/', {'votable_type': 1, 'votable_id': str(self.prompt.pk), 'value': -1}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['value'], -1)
+        self.assertCounters(-1, 0, 1)
+
+    def test_put_cannot_move_the_vote(self):
+        self.vote(1)
+        other = Prompt.objects.create(title='Other', body='body', author=self.voter, type='text')
+        vote = Vote.objects.get(user=self.voter)
+        response = self.client.put(
+            f'/api/votes/{vote.pk}/', {'votable_type': 1, 'votable_id': str(other.pk), 'value': 1}
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertCounters(1, 1, 0)
+
+    def test_delete_moves_counters(self):
+        self.vote(1)
+        vote = Vote.objects.get(user=self.voter)
+        self.assertEqual(self.client.delete(f'/api/votes/{vote.pk}/').status_code, 204)
+        self.assertFalse(Vote.objects.exists())
+        self.assertCounters(0, 0, 0)
+
+    def test_remove_vote_moves_counters(self):
+        self.vote(-1)
+        response = self.client.delete(f'/api/votes/remove_vote/?votable_type=1&votable_id={self.prompt.pk}')
+        self.assertEqual(response.status_code, 204)
+        self.assertCounters(0, 0, 0)
+
+
+class ViewCounterTests(TransactionTestCase):
+    def setUp(self):
+        author = User.objects.create_user(email='author@example.com', username='author', password='pass12345')
+        self.prompt = Prompt.objects.create(title='Prompt', body='body', author=author, type='text')
+
+    def assertStoredViews(self, expected, timeout=5):
+        """Wait for the flush thread to store `expected` views."""
+        deadline = time.monotonic() + timeout
+        while True:
+            views = Prompt.objects.values_list('views', flat=True).get(pk=self.prompt.pk)
+            if views == expected or time.monotonic() > deadline:
+                break
+            time.sleep(0.02)
+        self.assertEqual(views, expected)
+
+    @override_settings(VIEW_COUNTER_FLUSH_INTERVAL=60, VIEW_COUNTER_FLUSH_THRESHOLD=3)
+    def test_threshold_wakes_the_flush_thread(self):
+        counter = ViewCounter()
+        counter.record(1, self.prompt.pk, 2)
+        self.assertEqual(counter.pending(1, self.prompt.pk), 2)
+        counter.record(1, self.prompt.pk)
+        self.assertStoredViews(3)
+        self.assertEqual(counter.pending(1, self.prompt.pk), 0)
+
+    @override_settings(VIEW_COUNTER_FLUSH_INTERVAL=0.05, VIEW_COUNTER_FLUSH_THRESHOLD=1000)
+    def test_interval_flushes_a_quiet_worker(self):
+        counter = ViewCounter()
+        counter.record(1, self.prompt.pk)
+        self.assertStoredViews(1)
+
+    @override_settings(VIEW_COUNTER_FLUSH_INTERVAL=0, VIEW_COUNTER_FLUSH_THRESHOLD=100)
+    def test_displayed_count_includes_pending_views(self):
+        for _ in range(3):
+            record_view(1, self.prompt.pk)
+        self.prompt.refresh_from_db()
+        self.assertEqual((self.prompt.views, get_view_count(self.prompt, 1)), (0, 3))
+        view_counter.flush()
+        self.prompt.refresh_from_db()
+        self.assertEqual((self.prompt.views, get_view_count(self.prompt, 1)), (3, 3))
+
+
+class CommentTests(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(email='author@example.com', username='author', password='pass12345')
+        self.prompt = Prompt.objects.create(title='Prompt', body='body', author=self.author, type='text')
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+        self.list_params = {'commentable_type': 1, 'commentable_id': str(self.prompt.pk)}
+
+    def comment(self, body):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/comments/', {**self.list_params, 'body': body})
+        self.assertEqual(response.status_code, 201)
+        return Comment.objects.get(body=body)
+
+    def first_page(self):
+        response = self.client.get('/api/comments/', self.list_params)
+        self.assertEqual(response.status_code, 200)
+        return response.data['count'], [comment['body'] for comment in response.data['results']]
+
+    def test_comment_count_follows_creates_and_deletes(self):
+        first = self.comment('First')
+        self.comment('Second')
+        self.prompt.refresh_from_db()
+        self.assertEqual(self.prompt.comment_count, 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.client.delete(f'/api/comments/{first.pk}/').status_code, 204)
+        self.prompt.refresh_from_db()
+        self.assertEqual(self.prompt.comment_count, 1)
+
+    def test_first_page_is_cached_until_the_next_write(self):
+        comment = self.comment('First')
+        self.assertEqual(self.first_page(), (1, ['First']))
+        self.assertIsNotNone(get_first_page(1, self.prompt.pk))
+        with self.assertNumQueries(1):  # the cache read (DatabaseCache)
+            self.assertEqual(self.first_page(), (1, ['First']))
+
+        self.comment('Second')
+        self.assertEqual(self.first_page(), (2, ['Second', 'First']))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.put(f'/api/comments/{comment.pk}/', {**self.list_params, 'body': 'First, edited'})
+        self.assertEqual(self.first_page(), (2, ['Second', 'First, edited']))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f'/api/comments/{comment.pk}/')
+        self.assertEqual(self.first_page(), (1, ['Second']))
+
+
+class InteractionBatchTests(TestCase):
+    def setUp(self):
+        author = User.objects.create_user(email='author@example.com', username='author', password='pass12345')
+        self.user = User.objects.create_user(email='user@example.com', username='user', password='pass12345')
+        self.first = Prompt.objects.create(title='First', body='body', author=author, type='text')
+        self.second = Prompt.objects.create(title='Second', body='body', author=author, type='text')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def batch(self, *operations):
+        response = self.client.post('/api/interactions/batch/', {'operations': list(operations)}, format='json')
+        self.assertEqual(response.status_code, 200)
+        return response.data['results']
+
+    def rank(self, prompt):
+        return TrendingScore.objects.get(object_id=prompt.pk).rank
+
+    def test_operations_on_one_target_collapse(self):
+        target = {'type': 1, 'id': str(self.first.pk)}
+        results = self.batch(
+            {'op': 'vote', 'value': 1, **target},
+            {'op': 'vote', 'value': -1, **target},
+            {'op': 'unvote', **target},
+            {'op': 'vote', 'value': 1, **target},
+        )
+        self.assertEqual(
+            [(result['previous_value'], result['value']) for result in results],
+            [(None, 1), (1, -1), (-1, None), (None, 1)],
+        )
+        self.first.refresh_from_db()
+        self.assertEqual((self.first.score, self.first.upvotes, self.first.downvotes), (1, 1, 0))
+        self.assertEqual(Vote.objects.filter(user=self.user).count(), 1)
+
+    def test_per_operation_results(self):
+        results = self.batch(
+            {'op': 'bookmark', 'type': 1, 'id': str(self.first.pk)},
+            {'op': 'vote', 'type': 1, 'id': str(self.second.pk)},
+            {'op': 'vote', 'value': 1, 'type': 1, 'id': str(uuid.uuid4())},
+            {'op': 'bookmark', 'type': 1, 'id': str(self.first.pk)},
+        )
+        self.assertEqual([result['status'] for result in results], ['ok', 'error', 'error', 'ok'])
+        self.assertIn('value', results[1]['errors'])
+        self.assertEqual(results[2]['errors'], {'id': ['Object not found']})
+        self.assertEqual([results[0]['changed'], results[3]['changed']], [True, False])
+        self.assertTrue(Bookmark.objects.filter(user=self.user, bookmarkable_id=self.first.pk).exists())
+
+    def test_counters_are_updated_once_per_batch(self):
+        operations = [
+            {'op': 'vote', 'value': value, 'type': 1, 'id': str(prompt.pk)}
+            for prompt in (self.first, self.second) for value in (1, -1, 1)
+        ]
+        with CaptureQueriesContext(connection) as queries:
+            self.batch(*operations)
+        counter_updates = [query for query in queries if query['sql'].startswith('UPDATE "prompts"')]
+        self.assertEqual(len(counter_updates), 1)
+        self.assertEqual(
+            list(Prompt.objects.order_by('title').values_list('title', 'score')), [('First', 1), ('Second', 1)]
+        )
+
+    def test_existing_bookmarks_do_not_move_ranks(self):
+        Bookmark.objects.create(user=self.user, bookmarkable_type=1, bookmarkable_id=self.first.pk)
+        rank = self.rank(self.first)
+        results = self.batch({'op': 'bookmark', 'type': 1, 'id': str(self.first.pk)})
+        self.assertFalse(results[0]['changed'])
+        self.assertEqual(self.rank(self.first), rank)
+
+        results = self.batch({'op': 'bookmark', 'type': 1, 'id': str(self.second.pk)})
+        self.assertTrue(results[0]['changed'])
+        self.assertEqual(
+            _insert_bookmarks(self.user, [(1, self.first.pk), (1, self.second.pk)]), set()
+        )
+
+    def test_one_transaction(self):
+        operations = [
+            {'op': 'vote', 'value': 1, 'type': 1, 'id': str(self.first.pk)},
+            {'op': 'bookmark', 'type': 1, 'id': str(self.second.pk)},
+        ]
+        with mock.patch('interactions.batch._apply_bookmarks', side_effect=DatabaseError('bookmarks failed')):
+            with self.assertRaises(DatabaseError):
+                self.client.post('/api/interactions/batch/', {'operations': operations}, format='json')
+        self.first.refresh_from_db()
+        self.assertFalse(Vote.objects.exists())
+        self.assertEqual(self.first.score, 0)
@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import CommentViewSet, VoteViewSet, BookmarkViewSet
+from .views import CommentViewSet, VoteViewSet, BookmarkViewSet, InteractionBatchView
 
 router = DefaultRouter()
 router.register(r'comments', CommentViewSet, basename='comment')
@@ -8,5 +8,6 @@ router.register(r'votes', VoteViewSet, basename='vote')
 router.register(r'bookmarks', BookmarkViewSet, basename='bookmark')
 
 urlpatterns = [
+    path('interactions/batch/', InteractionBatchView.as_view(), name='interaction-batch'),
     path('', include(router.urls)),
 ]
@@ -0,0 +1,135 @@
+import atexit
+import logging
+import os
+import threading
+from collections import Counter, defaultdict
+from django.conf import settings
+from django.db import connections, models
+from django.db.models import Case, F, Value, When
+from .counters import get_content_model
+
+logger = logging.getLogger(__name__)
+
+
+class ViewCounter:
+    """
+    Write-behind view counter.
+    Increments are buffered in process memory per (content_type, id) and
+    written with one UPDATE per model by a background thread every
+    VIEW_COUNTER_FLUSH_INTERVAL seconds, or as soon as the buffer reaches
+    VIEW_COUNTER_FLUSH_THRESHOLD, so no request waits on the flush. Whatever
+    is left is flushed at exit. With VIEW_COUNTER_FLUSH_INTERVAL = 0 there
+    is no thread and record() flushes inline at the threshold.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = Counter()
+        self._flushing = Counter()  # taken from _pending, not yet written
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    @property
+    def flush_interval(self):
+        return getattr(settings, 'VIEW_COUNTER_FLUSH_INTERVAL', 10)
+
+    @property
+    def flush_threshold(self):
+        return getattr(settings, 'VIEW_COUNTER_FLUSH_THRESHOLD', 100)
+
+    def record(self, content_type, obj_id, count=1):
+        with self._lock:
+            self._pending[(int(content_type), obj_id)] += count
+            full = sum(self._pending.values()) >= self.flush_threshold
+        if not self.flush_interval:
+            if full:
+                self.flush()
+            return
+        self._ensure_thread()
+        if full:
+            self._wakeup.set()
+
+    def _ensure_thread(self):
+        # Threads don't survive fork, so pre-forked workers start their own
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='view-counter-flush', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval or None)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('View counter flush failed')
+            finally:
+                # This thread's connections; the next flush opens fresh ones
+                connections.close_all()
+
+    def pending(self, content_type, obj_id):
+        with self._lock:
+            key = (int(content_type), obj_id)
+            return self._pending.get(key, 0) + self._flushing.get(key, 0)
+
+    def flush(self):
+        """Write all buffered increments. Returns the number of rows updated."""
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+            self._flushing.update(pending)
+        if not pending:
+            return 0
+
+        by_type = defaultdict(dict)
+        for (content_type, obj_id), count in pending.items():
+            by_type[content_type][obj_id] = count
+
+        from trending.engine import get_weights, record_activity
+
+        updated = 0
+        for content_type, counts in by_type.items():
+            Model = get_content_model(content_type)
+            written = False
+            try:
+                if Model is not None:
+                    updated += Model.objects.filter(pk__in=list(counts)).update(
+                        views=F('views') + Case(
+                            *[When(pk=obj_id, then=Value(count)) for obj_id, count in counts.items()],
+                            default=Value(0),
+                            output_field=models.IntegerField(),
+                        )
+                    )
+                    written = True
+            except Exception:
+                logger.exception('Failed to flush view counts, re-queueing')
+            keys = Counter({(content_type, obj_id): count for obj_id, count in counts.items()})
+            with self._lock:
+                self._flushing -= keys
+                if Model is not None and not written:
+                    self._pending.update(keys)
+            if not written:
+                continue
+            try:
+                view_weight = get_weights()['view']
+                record_activity(content_type, {obj_id: count * view_weight for obj_id, count in counts.items()})
+            except Exception:
+                logger.exception('Failed to add views to trending ranks')
+        return updated
+
+
+view_counter = ViewCounter()
+atexit.register(view_counter.flush)
+
+
+def record_view(content_type, obj_id):
+    view_counter.record(content_type, obj_id)
+
+
+def get_view_count(obj, content_type):
+    """Stored views plus the increments still waiting to be flushed."""
+    return (obj.views or 0) + view_counter.pending(content_type, obj.pk)
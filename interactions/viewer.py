@@ -0,0 +1,79 @@
+from django.db import models
+from rest_framework import serializers
+from .models import Bookmark, Vote
+
+
+def load_viewer_state(instances, content_type, user):
+    """
+    Attach the user's bookmark flag and vote value to a page of objects of one
+    content type. Runs two IN queries (served by the unique
+    (user, type, id) indexes on bookmarks and votes) instead of two per row.
+    """
+    instances = [obj for obj in instances if isinstance(obj, models.Model)]
+    if not instances or not user or not user.is_authenticated:
+        return instances
+
+    ids = {obj.pk for obj in instances}
+    bookmarked = set(Bookmark.objects.filter(
+        user=user,
+        bookmarkable_type=content_type,
+        bookmarkable_id__in=ids
+    ).values_list('bookmarkable_id', flat=True))
+    votes = dict(Vote.objects.filter(
+        user=user,
+        votable_type=content_type,
+        votable_id__in=ids
+    ).values_list('votable_id', 'value'))
+
+    for obj in instances:
+        obj.viewer_bookmarked = obj.pk in bookmarked
+        obj.viewer_vote = votes.get(obj.pk)
+    return instances
+
+
+class ViewerStateListSerializer(serializers.ListSerializer):
+    """
+    Loads the requesting user's bookmarks and votes for the whole page once
+    before the child serializer renders each row.
+    """
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, models.manager.BaseManager) else data
+        items = list(iterable)
+        request = self.context.get('request')
+        if request and request.user.is_authenticated:
+            load_viewer_state(items, self.child.viewer_content_type, request.user)
+        return super().to_representation(items)
+
+
+class ViewerStateMixin:
+    """
+    is_bookmarked / user_vote for serializers of bookmarkable, votable content.
+    Set `viewer_content_type` (1=prompts, 2=tools, 3=news, 4=blogs) and
+    Meta.list_serializer_class = ViewerStateListSerializer.
+    """
+    viewer_content_type = None
+
+    def get_is_bookmarked(self, obj):
+        if hasattr(obj, 'viewer_bookmarked'):
+            return obj.viewer_bookmarked
+        request = self.context.get('request')
+        if request and request.user.is_authenticated:
+            return Bookmark.objects.filter(
+                user=request.user,
+                bookmarkable_type=self.viewer_content_type,
+                bookmarkable_id=obj.id
+            ).exists()
+        return False
+
+    def get_user_vote(self, obj):
+        if hasattr(obj, 'viewer_vote'):
+            return obj.viewer_vote
+        request = self.context.get('request')
+        if request and request.user.is_authenticated:
+            vote = Vote.objects.filter(
+                user=request.user,
+                votable_type=self.viewer_content_type,
+                votable_id=obj.id
+            ).first()
+            return vote.value if vote else None
+        return None
@@ -1,14 +1,30 @@
+import logging
+import uuid
+from collections import OrderedDict
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
+from rest_framework.utils.urls import replace_query_param
+from config.pagination import KeysetCursorPagination
 from .models import Comment, Vote, Bookmark
+from .comments import get_first_page, set_first_page
+from . import votes
+from .batch import apply_batch
+from .counters import CONTENT_MODELS
 from .serializers import (
     CommentSerializer, CommentCreateUpdateSerializer,
-    VoteSerializer, BookmarkSerializer
+    VoteSerializer, VoteTargetSerializer, BookmarkSerializer,
+    BatchOperationSerializer, InteractionBatchSerializer
 )
+
+logger = logging.getLogger(__name__)
+
+
 class CommentViewSet(viewsets.ModelViewSet):
-    queryset = Comment.objects.select_related('author').all()
+    queryset = Comment.objects.select_related('author').order_by('-created_at', '-id')
     permission_classes = [IsAuthenticatedOrReadOnly]
     
     def get_serializer_class(self):
@@ -16,33 +32,79 @@ class CommentViewSet(viewsets.ModelViewSet):
             return CommentCreateUpdateSerializer
         return CommentSerializer
     
-    def get_queryset(self):
-        queryset = super().get_queryset()
+    def get_commentable(self):
+        """(commentable_type, commentable_id) from the query params; either may be None."""
         commentable_type = self.request.query_params.get('commentable_type')
         commentable_id = self.request.query_params.get('commentable_id')
-        
-        if commentable_type and commentable_id:
-            queryset = queryset.filter(
-                commentable_type=commentable_type,
-                commentable_id=commentable_id
-            )
+        if commentable_type is not None:
+            if not commentable_type.isdigit() or int(commentable_type) not in CONTENT_MODELS:
+                raise ValidationError({'commentable_type': 'Must be 1=prompt, 2=tool, 3=news, 4=blog'})
+            commentable_type = int(commentable_type)
+        if commentable_id is not None:
+            try:
+                commentable_id = uuid.UUID(commentable_id)
+            except ValueError:
+                raise ValidationError({'commentable_id': 'Must be a valid UUID'})
+        if commentable_id is not None and commentable_type is None:
+            raise ValidationError({'commentable_type': 'Required with commentable_id'})
+        return commentable_type, commentable_id
+    
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action != 'list':
+            return queryset
+        commentable_type, commentable_id = self.get_commentable()
+        if commentable_type is not None:
+            queryset = queryset.filter(commentable_type=commentable_type)
+        if commentable_id is not None:
+            queryset = queryset.filter(commentable_id=commentable_id)
         return queryset
     
-    def create(self, request, *args, **kwargs):
-        print(f"🔍 USER: {request.user.username if request.user.is_authenticated else 'AnonymousUser'}")
-        print(f"🔍 DATA: {request.data}")
+    @property
+    def paginator(self):
+        """Listings not scoped to one object are keyset-paginated (no COUNT over the table)."""
+        if self.action == 'list' and not hasattr(self, '_paginator') and self.get_commentable()[1] is None:
+            self._paginator = KeysetCursorPagination(page_size=self.pagination_class().get_page_size(self.request))
+        return super().paginator
+    
+    def list(self, request, *args, **kwargs):
+        commentable_type, commentable_id = self.get_commentable()
+        is_first_page = (
+            commentable_id is not None
+            and request.query_params.get('page', '1') == '1'
+            and 'cursor' not in request.query_params
+            and 'page_size' not in request.query_params
+        )
+        if not is_first_page:
+            return super().list(request, *args, **kwargs)
         
+        # The newest comments of an object are its hottest read: cached until the next comment write
+        data = get_first_page(commentable_type, commentable_id)
+        if data is None:
+            queryset = self.get_queryset()
+            page = self.paginate_queryset(queryset)
+            serializer = self.get_serializer(page, many=True)
+            data = {'count': self.paginator.page.paginator.count, 'results': serializer.data}
+            set_first_page(commentable_type, commentable_id, data)
+        
+        has_next = data['count'] > self.paginator.page_size
+        return Response(OrderedDict([
+            ('count', data['count']),
+            ('next', replace_query_param(request.build_absolute_uri(), 'page', 2) if has_next else None),
+            ('previous', None),
+            ('results', data['results']),
+        ]))
+    
+    def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         if serializer.is_valid():
             try:
-                comment = serializer.save(author=request.user)
-                print(f"✅ CREATED COMMENT ID: {comment.id}")
+                serializer.save(author=request.user)
                 headers = self.get_success_headers(serializer.data)
                 return Response(serializer.data, status=201, headers=headers)
             except Exception as e:
-                print(f"❌ SAVE ERROR: {e}")
+                logger.exception('Failed to save comment')
                 return Response({"error": str(e)}, status=400)
-        print(f"❌ ERRORS: {serializer.errors}")
         return Response(serializer.errors, status=400)
     
     def perform_update(self, serializer):
@@ -68,33 +130,36 @@ class VoteViewSet(viewsets.ModelViewSet):
         return self.queryset.filter(user=self.request.user)
     
     def create(self, request, *args, **kwargs):
-        votable_type = request.data.get('votable_type')
-        votable_id = request.data.get('votable_id')
-        value = request.data.get('value')
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
         
-        
-        vote, created = Vote.objects.update_or_create(
-            user=request.user,
-            votable_type=votable_type,
-            votable_id=votable_id,
-            defaults={'value': value}
-        )
+        vote, old_value = votes.cast_vote(request.user, data['votable_type'], data['votable_id'], data['value'])
         
         serializer = self.get_serializer(vote)
-        status_code = status.HTTP_201_CREATED if created else status.HTTP_200_OK
+        status_code = status.HTTP_201_CREATED if old_value is None else status.HTTP_200_OK
         return Response(serializer.data, status=status_code)
     
+    # Updates and deletes go through interactions.votes as well, so they move the counters
+    def perform_update(self, serializer):
+        instance = serializer.instance
+        data = serializer.validated_data
+        if (data['votable_type'], data['votable_id']) != (instance.votable_type, instance.votable_id):
+            raise ValidationError({'votable_id': "A vote's target cannot be changed"})
+        serializer.instance, _ = votes.cast_vote(
+            self.request.user, instance.votable_type, instance.votable_id, data['value']
+        )
+    
+    def perform_destroy(self, instance):
+        votes.remove_vote(self.request.user, instance.votable_type, instance.votable_id)
+    
     @action(detail=False, methods=['delete'])
     def remove_vote(self, request):
-        votable_type = request.query_params.get('votable_type')
-        votable_id = request.query_params.get('votable_id')
-        
-        Vote.objects.filter(
-            user=request.user,
-            votable_type=votable_type,
-            votable_id=votable_id
-        ).delete()
+        serializer = VoteTargetSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
         
+        votes.remove_vote(request.user, serializer.validated_data['votable_type'],
+                          serializer.validated_data['votable_id'])
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 class BookmarkViewSet(viewsets.ModelViewSet):
@@ -104,7 +169,7 @@ class BookmarkViewSet(viewsets.ModelViewSet):
     http_method_names = ['get', 'post', 'delete']
     
     def get_queryset(self):
-        return self.queryset.filter(user=self.request.user)
+        return self.queryset.filter(user=self.request.user).order_by('-created_at', '-id')
     
     def create(self, request, *args, **kwargs):
         bookmarkable_type = request.data.get('bookmarkable_type')
@@ -131,4 +196,30 @@ class BookmarkViewSet(viewsets.ModelViewSet):
             bookmarkable_id=bookmarkable_id
         ).delete()
         
-        return Response(status=status.HTTP_204_NO_CONTENT)
\ No newline at end of file
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class InteractionBatchView(APIView):
+    """
+    Apply many vote/bookmark operations in one request and one transaction.
+    Invalid operations get an error result; the others are still applied.
+    """
+    permission_classes = [IsAuthenticated]
+    
+    def post(self, request):
+        serializer = InteractionBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        operations = serializer.validated_data['operations']
+        
+        results = {}
+        valid = []
+        for index, data in enumerate(operations):
+            operation = BatchOperationSerializer(data=data)
+            if operation.is_valid():
+                valid.append((index, operation.validated_data))
+            else:
+                results[index] = {'index': index, 'status': 'error', 'errors': operation.errors}
+        
+        if valid:
+            results.update(apply_batch(request.user, valid))
+        return Response({'results': [results[index] for index in range(len(operations))]})
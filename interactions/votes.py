@@ -0,0 +1,125 @@
+from functools import partial
+from django.db import connection, transaction
+from django.utils import timezone
+from caching.generations import bump_generation
+from config.sql import column, prep, table_name
+from .counters import apply_vote_changes
+from .models import Vote
+
+# votable_type -> Vote FK field
+VOTE_FK_FIELDS = {
+    1: 'prompts',
+    2: 'tool',
+    3: 'news',
+    4: 'blog',
+}
+FK_COLUMNS = list(VOTE_FK_FIELDS.values())
+
+
+_column = partial(column, Vote)
+_prep = partial(prep, Vote)
+
+
+def upsert_votes(user, values):
+    """
+    Insert or update several of the user's votes with one
+    INSERT ... VALUES (...), (...) ON CONFLICT DO UPDATE ... RETURNING.
+    The UPDATE copies the current value into previous_value before
+    overwriting it, so each returned row carries both: previous_value is
+    None when the vote was just created.
+    values is {(votable_type, votable_id): value}; returns the Votes.
+    """
+    if not values:
+        return []
+    now = timezone.now()
+    names = ['user', 'votable_type', 'votable_id', 'value', 'previous_value', 'created_at', 'updated_at', *FK_COLUMNS]
+    rows, params = [], []
+    for (votable_type, votable_id), value in values.items():
+        row = {
+            'user': user.pk,
+            'votable_type': votable_type,
+            'votable_id': votable_id,
+            'value': value,
+            'previous_value': None,
+            'created_at': now,
+            'updated_at': now,
+            **{fk: None for fk in FK_COLUMNS},
+            VOTE_FK_FIELDS[votable_type]: votable_id,
+        }
+        rows.append('(' + ', '.join(['%s'] * len(names)) + ')')
+        params.extend(_prep(name, row[name]) for name in names)
+
+    table = table_name(Vote)
+    columns = ', '.join(_column(name) for name in names)
+    conflict = ', '.join(_column(name) for name in ('user', 'votable_type', 'votable_id'))
+    sql = (
+        f'INSERT INTO {table} ({columns}) VALUES {", ".join(rows)} '
+        f'ON CONFLICT ({conflict}) DO UPDATE SET '
+        f'{_column("previous_value")} = {table}.{_column("value")}, '
+        f'{_column("value")} = EXCLUDED.{_column("value")}, '
+        f'{_column("updated_at")} = EXCLUDED.{_column("updated_at")} '
+        f'RETURNING *'
+    )
+    return list(Vote.objects.raw(sql, params))
+
+
+def upsert_vote(user, votable_type, votable_id, value):
+    return upsert_votes(user, {(votable_type, votable_id): value})[0]
+
+
+def delete_votes(user, targets):
+    """
+    Delete several of the user's votes with one DELETE ... RETURNING.
+    targets is an iterable of (votable_type, votable_id); returns
+    {(votable_type, votable_id): removed value} for the votes that existed.
+    """
+    targets = list(targets)
+    if not targets:
+        return {}
+    table = table_name(Vote)
+    match = ' OR '.join([f'({_column("votable_type")} = %s AND {_column("votable_id")} = %s)'] * len(targets))
+    sql = (
+        f'DELETE FROM {table} WHERE {_column("user")} = %s AND ({match}) '
+        f'RETURNING {_column("votable_type")}, {_column("votable_id")}, {_column("value")}'
+    )
+    params = [_prep('user', user.pk)]
+    for votable_type, votable_id in targets:
+        params.extend([votable_type, _prep('votable_id', votable_id)])
+
+    id_field = Vote._meta.get_field('votable_id')
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return {
+            (votable_type, id_field.to_python(votable_id)): value
+            for votable_type, votable_id, value in cursor.fetchall()
+        }
+
+
+def delete_vote(user, votable_type, votable_id):
+    """Delete the user's vote; returns the removed value or None."""
+    return delete_votes(user, [(votable_type, votable_id)]).get((votable_type, votable_id))
+
+
+@transaction.atomic
+def cast_vote(user, votable_type, votable_id, value):
+    """
+    Record a vote and move the object's counters by the difference to the
+    previous vote. Safe under concurrency: the upsert is a single statement,
+    so the (old, new) pair it returns is exactly the change it made.
+    Returns (vote, old_value).
+    """
+    vote = upsert_vote(user, votable_type, votable_id, value)
+    apply_vote_changes({(votable_type, votable_id): (vote.previous_value, vote.value)})
+    # Raw SQL sends no model signals
+    bump_generation('interactions.Vote')
+    return vote, vote.previous_value
+
+
+@transaction.atomic
+def remove_vote(user, votable_type, votable_id):
+    """Delete a vote and take it off the counters. Returns the removed value or None."""
+    old_value = delete_vote(user, votable_type, votable_id)
+    if old_value is not None:
+        apply_vote_changes({(votable_type, votable_id): (old_value, None)})
+        bump_generation('interactions.Vote')
+    return old_value
@@ -0,0 +1,86 @@
+from collections import namedtuple
+from django.core.cache import cache
+from django.db.models import Q
+from .models import PromptRelation
+
+Edge = namedtuple('Edge', ['source', 'target', 'relation_type'])
+
+ADJACENCY_CACHE_PREFIX = 'prompts:adjacency:'
+ADJACENCY_CACHE_TIMEOUT = 60 * 60
+MAX_DEPTH = 5
+MAX_NODES = 200
+
+
+def adjacency_key(prompt_id):
+    return f'{ADJACENCY_CACHE_PREFIX}{prompt_id}'
+
+
+def get_adjacency(prompt_ids):
+    """
+    Return {prompt_id: [Edge, ...]} with every relation touching each prompt
+    (both directions). Served from the cache; misses are loaded with one query
+    and cached per prompt.
+    """
+    prompt_ids = list(prompt_ids)
+    cached = cache.get_many([adjacency_key(pk) for pk in prompt_ids])
+    adjacency = {pk: cached[adjacency_key(pk)] for pk in prompt_ids if adjacency_key(pk) in cached}
+
+    missing = [pk for pk in prompt_ids if pk not in adjacency]
+    if missing:
+        loaded = {pk: [] for pk in missing}
+        rows = PromptRelation.objects.filter(
+            Q(source_prompt_id__in=missing) | Q(target_prompt_id__in=missing)
+        ).values_list('source_prompt_id', 'target_prompt_id', 'relation_type')
+        for source, target, relation_type in rows:
+            edge = Edge(source, target, relation_type)
+            if source in loaded:
+                loaded[source].append(edge)
+            if target in loaded and target != source:
+                loaded[target].append(edge)
+        cache.set_many({adjacency_key(pk): edges for pk, edges in loaded.items()}, ADJACENCY_CACHE_TIMEOUT)
+        adjacency.update(loaded)
+    return adjacency
+
+
+def invalidate_adjacency(*prompt_ids):
+    cache.delete_many([adjacency_key(pk) for pk in prompt_ids])
+
+
+def traverse(root_id, depth=1, relation_types=None, direction='both', max_nodes=MAX_NODES):
+    """
+    Breadth-first walk of the relation graph from root_id.
+    direction is 'out' (source -> target), 'in' or 'both'; relation_types
+    limits which edges are followed. Returns (node_ids, edges, truncated),
+    with node_ids in discovery order.
+    """
+    depth = max(0, min(depth, MAX_DEPTH))
+    visited = {root_id: None}
+    edges = {}
+    frontier = [root_id]
+    truncated = False
+
+    for _ in range(depth):
+        if not frontier:
+            break
+        next_frontier = []
+        adjacency = get_adjacency(frontier)
+        for node in frontier:
+            for edge in adjacency.get(node, []):
+                if relation_types and edge.relation_type not in relation_types:
+                    continue
+                if edge.source == node and direction in ('out', 'both'):
+                    neighbor = edge.target
+                elif edge.target == node and direction in ('in', 'both'):
+                    neighbor = edge.source
+                else:
+                    continue
+                if neighbor not in visited:
+                    if len(visited) >= max_nodes:
+                        truncated = True
+                        continue
+                    visited[neighbor] = None
+                    next_frontier.append(neighbor)
+                edges[edge] = None
+        frontier = next_frontier
+
+    return list(visited), list(edges), truncated
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.8 on 2026-10-18 10:20
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('prompts', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='prompt',
+            name='downvotes',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='prompt',
+            name='score',
+            field=models.IntegerField(default=0, help_text='upvotes - downvotes, maintained on every vote write'),
+        ),
+        migrations.AddField(
+            model_name='prompt',
+            name='upvotes',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='prompt',
+            index=models.Index(fields=['-score'], name='prompts_score_93479d_idx'),
+        ),
+    ]
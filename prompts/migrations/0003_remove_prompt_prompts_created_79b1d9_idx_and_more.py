@@ -0,0 +1,35 @@
+# Generated by Django 5.2.8 on 2026-10-18 10:26
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('prompts', '0002_prompt_downvotes_prompt_score_prompt_upvotes_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='prompt',
+            name='prompts_created_79b1d9_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='prompt',
+            name='prompts_score_93479d_idx',
+        ),
+        migrations.AddIndex(
+            model_name='prompt',
+            index=models.Index(fields=['-created_at', '-id'], name='prompts_created_a1ffcb_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='prompt',
+            index=models.Index(fields=['-score', '-id'], name='prompts_score_8e3545_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='prompt',
+            index=models.Index(fields=['-views', '-id'], name='prompts_views_8d67a0_idx'),
+        ),
+    ]
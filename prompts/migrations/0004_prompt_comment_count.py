@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 10:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('prompts', '0003_remove_prompt_prompts_created_79b1d9_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='prompt',
+            name='comment_count',
+            field=models.IntegerField(default=0, help_text='maintained on every comment create/delete'),
+        ),
+    ]
@@ -2,6 +2,7 @@ import uuid
 from django.db import models
 from django.conf import settings
 from django.utils.text import slugify
+from tags.prefetch import TaggedQuerySet
 
 class Prompt(models.Model):
     PROMPT_TYPES = [
@@ -18,16 +19,25 @@ class Prompt(models.Model):
     context = models.JSONField(blank=True, null=True, help_text='Type-specific parameters')
     author = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='prompts')
     views = models.IntegerField(default=0)
+    upvotes = models.IntegerField(default=0)
+    downvotes = models.IntegerField(default=0)
+    score = models.IntegerField(default=0, help_text='upvotes - downvotes, maintained on every vote write')
+    comment_count = models.IntegerField(default=0, help_text='maintained on every comment create/delete')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = TaggedQuerySet.as_manager()
+    
     class Meta:
         db_table = 'prompts'
         unique_together = ['slug', 'type']
         indexes = [
             models.Index(fields=['type']),
             models.Index(fields=['author']),
-            models.Index(fields=['-created_at']),
+            # Keyset pagination keys: (field, id)
+            models.Index(fields=['-created_at', '-id']),
+            models.Index(fields=['-score', '-id']),
+            models.Index(fields=['-views', '-id']),
         ]
         ordering = ['-created_at']
     
@@ -41,13 +51,7 @@ class Prompt(models.Model):
     
     @property
     def vote_count(self):
-        from interactions.models import Vote
-        return Vote.objects.filter(
-            votable_type=1, 
-            votable_id=self.id
-        ).aggregate(
-            total=models.Sum('value')
-        )['total'] or 0
+        return self.score
 
 class PromptRelation(models.Model):
     RELATION_TYPES = [
@@ -1,67 +1,58 @@
+from django.db import transaction
 from rest_framework import serializers
 from .models import Prompt, PromptRelation, MediaAsset
 from accounts.serializers import UserSerializer
-from tags.models import Taggable, Tag
+from tags.models import Taggable
+from tags.services import set_tags
+from interactions.viewer import ViewerStateMixin, ViewerStateListSerializer
+from interactions.view_counter import get_view_count
 
-class PromptSerializer(serializers.ModelSerializer):
+class PromptSerializer(ViewerStateMixin, serializers.ModelSerializer):
     author = UserSerializer(read_only=True)
+    views = serializers.SerializerMethodField()
     vote_count = serializers.ReadOnlyField()
     tags = serializers.SerializerMethodField()
     is_bookmarked = serializers.SerializerMethodField()
     user_vote = serializers.SerializerMethodField()
+    search_highlight = serializers.CharField(read_only=True, allow_null=True)
+    viewer_content_type = 1
     
     class Meta:
         model = Prompt
         fields = ['id', 'type', 'title', 'slug', 'body', 'context', 
-                  'author', 'views', 'vote_count', 'tags', 'is_bookmarked',
-                  'user_vote', 'created_at', 'updated_at']
-        read_only_fields = ['id', 'slug', 'author', 'views', 'created_at', 'updated_at']
+                  'author', 'views', 'vote_count', 'upvotes', 'downvotes', 'score', 'comment_count',
+                  'tags', 'is_bookmarked', 'user_vote', 'search_highlight',
+                  'created_at', 'updated_at']
+        read_only_fields = ['id', 'slug', 'author', 'views', 'upvotes', 'downvotes',
+                            'score', 'comment_count', 'created_at', 'updated_at']
+        list_serializer_class = ViewerStateListSerializer
     
     def get_tags(self, obj):
+        if hasattr(obj, 'prefetched_tags'):
+            return obj.prefetched_tags
         taggables = Taggable.objects.filter(taggable_type=1, taggable_id=obj.id).select_related('tag')
         return [t.tag.name for t in taggables]
     
-    def get_is_bookmarked(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            from interactions.models import Bookmark
-            return Bookmark.objects.filter(
-                user=request.user,
-                bookmarkable_type=1,
-                bookmarkable_id=obj.id
-            ).exists()
-        return False
-    
-    def get_user_vote(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            from interactions.models import Vote
-            vote = Vote.objects.filter(
-                user=request.user,
-                votable_type=1,
-                votable_id=obj.id
-            ).first()
-            return vote.value if vote else None
-        return None
+    def get_views(self, obj):
+        return get_view_count(obj, 1)
 
 class PromptCreateUpdateSerializer(serializers.ModelSerializer):
-    tags = serializers.ListField(child=serializers.CharField(), required=False)
+    tags = serializers.ListField(child=serializers.CharField(max_length=50), required=False)
     
     class Meta:
         model = Prompt
         fields = ['type', 'title', 'body', 'context', 'tags']
     
+    @transaction.atomic
     def create(self, validated_data):
         tags_data = validated_data.pop('tags', [])
         prompt = Prompt.objects.create(**validated_data)
         
-        
-        for tag_name in tags_data:
-            tag, _ = Tag.objects.get_or_create(name=tag_name.lower())
-            Taggable.objects.create(tag=tag, taggable_type=1, taggable_id=prompt.id)
+        set_tags(1, prompt.id, tags_data, is_new=True)
         
         return prompt
     
+    @transaction.atomic
     def update(self, instance, validated_data):
         tags_data = validated_data.pop('tags', None)
         
@@ -72,10 +63,7 @@ class PromptCreateUpdateSerializer(serializers.ModelSerializer):
         
         
         if tags_data is not None:
-            Taggable.objects.filter(taggable_type=1, taggable_id=instance.id).delete()
-            for tag_name in tags_data:
-                tag, _ = Tag.objects.get_or_create(name=tag_name.lower())
-                Taggable.objects.create(tag=tag, taggable_type=1, taggable_id=instance.id)
+            set_tags(1, instance.id, tags_data)
         
         return instance
 
@@ -0,0 +1,21 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from .graph import invalidate_adjacency
+from .models import PromptRelation
+
+
+@receiver(pre_save, sender=PromptRelation)
+def invalidate_previous_endpoints(sender, instance, **kwargs):
+    """An edited relation may have moved away from its old prompts."""
+    if instance.pk:
+        old = PromptRelation.objects.filter(pk=instance.pk).values_list(
+            'source_prompt_id', 'target_prompt_id'
+        ).first()
+        if old:
+            invalidate_adjacency(*old)
+
+
+@receiver(post_save, sender=PromptRelation)
+@receiver(post_delete, sender=PromptRelation)
+def invalidate_relation_endpoints(sender, instance, **kwargs):
+    invalidate_adjacency(instance.source_prompt_id, instance.target_prompt_id)
@@ -1,3 +1,84 @@
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
+from django.db import DatabaseError
 from django.test import TestCase
+from rest_framework.test import APIClient
+from accounts.models import User
+from .models import Prompt
+from .serializers import PromptCreateUpdateSerializer
 
 
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user(email='author@example.com', username='author', password='pass12345')
+        cls.prompts = [
+            Prompt.objects.create(title=f'Prompt {i}', body='body', author=author, type='text', score=i % 3)
+            for i in range(7)
+        ]
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def walk(self, params, direction='next'):
+        """Follow `direction` links from the first page; returns the ids of every page."""
+        pages = []
+        response = self.client.get('/api/prompts/', {'cursor': '', 'page_size': 3, **params})
+        while True:
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('count', response.data)
+            pages.append([item['id'] for item in response.data['results']])
+            link = response.data[direction]
+            if link is None:
+                return pages, response
+            response = self.client.get('/api/prompts/', {k: v[0] for k, v in parse_qs(urlparse(link).query).items()})
+
+    def test_round_trip_by_created_at(self):
+        pages, last = self.walk({})
+        expected = [str(prompt.pk) for prompt in sorted(
+            self.prompts, key=lambda prompt: (prompt.created_at, str(prompt.pk)), reverse=True
+        )]
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+        self.assertEqual(sum(pages, []), expected)
+
+        previous = self.client.get(last.data['previous'])
+        self.assertEqual([item['id'] for item in previous.data['results']], pages[1])
+
+    def test_round_trip_with_ties(self):
+        pages, _ = self.walk({'ordering': '-score'})
+        ids = sum(pages, [])
+        self.assertEqual(sorted(ids), sorted(str(prompt.pk) for prompt in self.prompts))
+        scores = {str(prompt.pk): prompt.score for prompt in self.prompts}
+        self.assertEqual([scores[pk] for pk in ids], sorted(scores.values(), reverse=True))
+
+    def test_invalid_cursors(self):
+        self.assertEqual(self.client.get('/api/prompts/', {'cursor': 'not-a-cursor'}).status_code, 404)
+        next_link = self.client.get('/api/prompts/', {'cursor': '', 'page_size': 3}).data['next']
+        cursor = parse_qs(urlparse(next_link).query)['cursor'][0]
+        # A cursor only continues the ordering it was issued for
+        response = self.client.get('/api/prompts/', {'cursor': cursor, 'ordering': '-score'})
+        self.assertEqual(response.status_code, 404)
+
+
+class PromptWriteTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(email='author@example.com', username='author', password='pass12345')
+
+    def test_failed_tagging_rolls_back_the_prompt(self):
+        serializer = PromptCreateUpdateSerializer(data={'type': 'text', 'title': 'Tagged', 'body': 'body', 'tags': ['a']})
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        with mock.patch('prompts.serializers.set_tags', side_effect=DatabaseError('tagging failed')):
+            with self.assertRaises(DatabaseError):
+                serializer.save(author=self.author)
+        self.assertFalse(Prompt.objects.exists())
+
+    def test_failed_tagging_rolls_back_the_edit(self):
+        prompt = Prompt.objects.create(title='Before', body='body', author=self.author, type='text')
+        serializer = PromptCreateUpdateSerializer(prompt, data={'title': 'After', 'tags': ['a']}, partial=True)
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        with mock.patch('prompts.serializers.set_tags', side_effect=DatabaseError('tagging failed')):
+            with self.assertRaises(DatabaseError):
+                serializer.save()
+        prompt.refresh_from_db()
+        self.assertEqual(prompt.title, 'Before')
@@ -1,21 +1,31 @@
-from rest_framework import viewsets, status, filters
+import uuid
+from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
 from django_filters.rest_framework import DjangoFilterBackend
 from .models import Prompt, PromptRelation
+from .graph import traverse
 from .serializers import PromptSerializer, PromptCreateUpdateSerializer, PromptRelationSerializer
 from accounts.permissions import IsOwnerOrReadOnly, CanModerateContent
-from django.db import models
+from interactions.view_counter import record_view, get_view_count
+from search.filters import FullTextSearchFilter
+from caching.conditional import ConditionalGetMixin
+from caching.mixins import CachedResponseMixin
+from trending.filters import TrendingOrderingFilter
 
-class PromptViewSet(viewsets.ModelViewSet):
-    queryset = Prompt.objects.select_related('author').all()
+class PromptViewSet(ConditionalGetMixin, CachedResponseMixin, viewsets.ModelViewSet):
+    queryset = Prompt.objects.select_related('author').with_tags(1)
     permission_classes = [IsAuthenticatedOrReadOnly, CanModerateContent]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter, TrendingOrderingFilter]
     filterset_fields = ['type', 'author__username']
     search_fields = ['title', 'body']
-    ordering_fields = ['created_at', 'views', 'title']
+    search_content_type = 1
+    ordering_fields = ['created_at', 'views', 'title', 'score']
+    cursor_ordering_fields = ['created_at', 'score', 'views']
     lookup_field = 'slug'
+    cache_dependencies = ['prompts.Prompt', 'tags.Tag', 'tags.Taggable', 'interactions.Vote', 'interactions.Comment']
+    etag_fields = ['score', 'upvotes', 'downvotes', 'comment_count', 'views']
     
     def get_serializer_class(self):
         if self.action in ['create', 'update', 'partial_update']:
@@ -26,12 +36,11 @@ class PromptViewSet(viewsets.ModelViewSet):
         serializer.save(author=self.request.user)
     
     def retrieve(self, request, *args, **kwargs):
-        instance = self.get_object()
-        
-        instance.views += 1
-        instance.save(update_fields=['views'])
-        serializer = self.get_serializer(instance)
-        return Response(serializer.data)
+        response = super().retrieve(request, *args, **kwargs)
+        # Counted after the (possibly cached) response so cache hits are views too
+        if response.status_code == status.HTTP_200_OK:
+            record_view(1, uuid.UUID(str(response.data['id'])))
+        return response
     
     @action(detail=True, methods=['get'])
     def relations(self, request, slug=None):
@@ -42,6 +51,44 @@ class PromptViewSet(viewsets.ModelViewSet):
         serializer = PromptRelationSerializer(relations, many=True)
         return Response(serializer.data)
     
+    @action(detail=True, methods=['get'])
+    def graph(self, request, slug=None):
+        """
+        Relation graph around a prompt: nodes are serialized once, edges listed separately.
+        ?depth=1..5, ?relation_type=improved_version (repeatable), ?direction=out|in|both
+        """
+        prompt = self.get_object()
+        
+        try:
+            depth = int(request.query_params.get('depth', 1))
+        except ValueError:
+            return Response({'error': 'depth must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        direction = request.query_params.get('direction', 'both')
+        if direction not in ('out', 'in', 'both'):
+            return Response({'error': 'direction must be out, in or both'}, status=status.HTTP_400_BAD_REQUEST)
+        relation_types = set(request.query_params.getlist('relation_type'))
+        valid_types = {choice for choice, _ in PromptRelation.RELATION_TYPES}
+        if not relation_types <= valid_types:
+            return Response({'error': f'relation_type must be one of {sorted(valid_types)}'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        
+        node_ids, edges, truncated = traverse(
+            prompt.pk, depth=depth, relation_types=relation_types, direction=direction
+        )
+        nodes = {node.pk: node for node in self.queryset.filter(pk__in=node_ids)}
+        serializer = PromptSerializer(
+            [nodes[pk] for pk in node_ids if pk in nodes], many=True, context=self.get_serializer_context()
+        )
+        return Response({
+            'root': prompt.pk,
+            'nodes': serializer.data,
+            'edges': [
+                {'source': edge.source, 'target': edge.target, 'relation_type': edge.relation_type}
+                for edge in edges if edge.source in nodes and edge.target in nodes
+            ],
+            'truncated': truncated,
+        })
+    
     @action(detail=False, methods=['get'])
     def my_prompts(self, request):
         if not request.user.is_authenticated:
@@ -56,7 +103,5 @@ class PromptViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['post'])
     def increment_view(self, request, slug=None):
         prompt = self.get_object()  
-        prompt.views = models.F('views') + 1
-        prompt.save(update_fields=['views'])
-        prompt.refresh_from_db()
-        return Response({'views': prompt.views})
+        record_view(1, prompt.pk)
+        return Response({'views': get_view_count(prompt, 1)})
@@ -0,0 +1,169 @@
+import re
+import uuid
+from collections import namedtuple
+from django.conf import settings
+from django.db import connection
+from django.utils.module_loading import import_string
+from .models import SearchDocument
+
+SearchMatch = namedtuple('SearchMatch', ['object_id', 'rank'])
+
+HIGHLIGHT_START = '<mark>'
+HIGHLIGHT_STOP = '</mark>'
+
+
+def _db_ids(object_ids):
+    field = SearchDocument._meta.get_field('object_id')
+    return [field.get_db_prep_value(object_id, connection) for object_id in object_ids]
+
+
+def _within_clause(within):
+    """An `AND d.object_id IN (...)` clause and its params for search()."""
+    if within is None:
+        return '', []
+    sql, params = within
+    return f'AND d.object_id IN ({sql})', list(params)
+
+
+def _to_uuid(value):
+    return value if isinstance(value, uuid.UUID) else uuid.UUID(str(value))
+
+
+class BaseSearchBackend:
+    """
+    Full-text search over SearchDocument.
+    search() returns the best matches for one content type ordered by relevance,
+    among the object ids `within` selects when given (an (sql, params) subquery),
+    so the limit applies after the view's other filters;
+    highlight() builds snippets for just the objects that end up on a page.
+    """
+    def search(self, content_type, query, limit, within=None):
+        raise NotImplementedError
+
+    def highlight(self, content_type, query, object_ids):
+        raise NotImplementedError
+
+    def optimize(self):
+        """Compact the index after a bulk rebuild."""
+
+
+class SQLiteFTSBackend(BaseSearchBackend):
+    """
+    FTS5 index `search_fts` kept in sync with search_documents by triggers.
+    Ranking is bm25 with the title weighted above the body.
+    """
+    TITLE_WEIGHT = 10.0
+    BODY_WEIGHT = 1.0
+    SNIPPET_TOKENS = 24
+
+    @staticmethod
+    def to_match_expression(query):
+        # Quote every term so user input can never be parsed as FTS5 syntax;
+        # the last term is a prefix match for search-as-you-type.
+        terms = re.findall(r'\w+', query, flags=re.UNICODE)
+        if not terms:
+            return None
+        quoted = ['"%s"' % term.replace('"', '""') for term in terms]
+        quoted[-1] += '*'
+        return ' '.join(quoted)
+
+    def search(self, content_type, query, limit, within=None):
+        match = self.to_match_expression(query)
+        if not match:
+            return []
+        within_sql, within_params = _within_clause(within)
+        sql = f"""
+            SELECT d.object_id, bm25(search_fts, %s, %s) AS rank
+            FROM search_fts
+            JOIN search_documents d ON d.id = search_fts.rowid
+            WHERE search_fts MATCH %s AND d.content_type = %s {within_sql}
+            ORDER BY rank
+            LIMIT %s
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [self.TITLE_WEIGHT, self.BODY_WEIGHT, match, content_type, *within_params, limit])
+            return [SearchMatch(_to_uuid(object_id), -rank) for object_id, rank in cursor.fetchall()]
+
+    def highlight(self, content_type, query, object_ids):
+        match = self.to_match_expression(query)
+        if not match or not object_ids:
+            return {}
+        ids = _db_ids(object_ids)
+        sql = """
+            SELECT d.object_id, snippet(search_fts, -1, %%s, %%s, '…', %%s)
+            FROM search_fts
+            JOIN search_documents d ON d.id = search_fts.rowid
+            WHERE search_fts MATCH %%s AND d.content_type = %%s AND d.object_id IN (%s)
+        """ % ', '.join(['%s'] * len(ids))
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [HIGHLIGHT_START, HIGHLIGHT_STOP, self.SNIPPET_TOKENS,
+                                 match, content_type, *ids])
+            return {_to_uuid(object_id): snippet for object_id, snippet in cursor.fetchall()}
+
+    def optimize(self):
+        with connection.cursor() as cursor:
+            cursor.execute("INSERT INTO search_fts(search_fts) VALUES ('optimize')")
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    """
+    Generated `search_vector` tsvector column (title weight A, body weight B)
+    with a GIN index. Queries use websearch syntax, ranking is ts_rank_cd.
+    """
+    CONFIG = 'english'
+
+    def search(self, content_type, query, limit, within=None):
+        if not query.strip():
+            return []
+        within_sql, within_params = _within_clause(within)
+        sql = f"""
+            SELECT d.object_id, ts_rank_cd(d.search_vector, q) AS rank
+            FROM search_documents d, websearch_to_tsquery(%s::regconfig, %s) q
+            WHERE d.content_type = %s AND d.search_vector @@ q {within_sql}
+            ORDER BY rank DESC
+            LIMIT %s
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [self.CONFIG, query, content_type, *within_params, limit])
+            return [SearchMatch(_to_uuid(object_id), rank) for object_id, rank in cursor.fetchall()]
+
+    def highlight(self, content_type, query, object_ids):
+        if not query.strip() or not object_ids:
+            return {}
+        options = 'StartSel=%s, StopSel=%s, MaxFragments=2, MaxWords=24, MinWords=8' % (
+            HIGHLIGHT_START, HIGHLIGHT_STOP
+        )
+        sql = """
+            SELECT d.object_id, ts_headline(%s::regconfig, d.title || ' ' || d.body, q, %s)
+            FROM search_documents d, websearch_to_tsquery(%s::regconfig, %s) q
+            WHERE d.content_type = %s AND d.object_id = ANY(%s)
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [self.CONFIG, options, self.CONFIG, query,
+                                 content_type, _db_ids(object_ids)])
+            return {_to_uuid(object_id): snippet for object_id, snippet in cursor.fetchall()}
+
+
+VENDOR_BACKENDS = {
+    'sqlite': SQLiteFTSBackend,
+    'postgresql': PostgresSearchBackend,
+}
+
+_backends = {}
+
+
+def get_search_backend():
+    """
+    Return the search backend for the default database, or None when the
+    vendor has no full-text support (callers fall back to icontains search).
+    SEARCH_BACKEND can point at a custom BaseSearchBackend subclass.
+    """
+    backend_path = getattr(settings, 'SEARCH_BACKEND', None)
+    key = backend_path or connection.vendor
+    if key not in _backends:
+        if backend_path:
+            backend_class = import_string(backend_path)
+        else:
+            backend_class = VENDOR_BACKENDS.get(connection.vendor)
+        _backends[key] = backend_class() if backend_class else None
+    return _backends[key]
@@ -0,0 +1,74 @@
+from django.apps import apps as global_apps
+from .models import SearchDocument
+
+# content type -> (model label, title field, body field)
+SEARCHABLE_MODELS = {
+    1: ('prompts.Prompt', 'title', 'body'),
+    2: ('content.Tool', 'name', 'description'),
+    3: ('content.News', 'title', 'content'),
+    4: ('content.Blog', 'title', 'content'),
+}
+
+
+def get_searchable_model(content_type, apps=global_apps):
+    model_label, _, _ = SEARCHABLE_MODELS[content_type]
+    return apps.get_model(model_label)
+
+
+def get_content_type(model):
+    """Return the polymorphic type id for a searchable model class, or None."""
+    for content_type, (model_label, _, _) in SEARCHABLE_MODELS.items():
+        if model._meta.label == model_label:
+            return content_type
+    return None
+
+
+def build_document(content_type, obj, document_model=SearchDocument):
+    _, title_field, body_field = SEARCHABLE_MODELS[content_type]
+    return document_model(
+        content_type=content_type,
+        object_id=obj.pk,
+        title=getattr(obj, title_field) or '',
+        body=getattr(obj, body_field) or '',
+    )
+
+
+def index_objects(content_type, objects, document_model=SearchDocument):
+    """Insert or refresh the search documents for objects in one statement."""
+    documents = [build_document(content_type, obj, document_model) for obj in objects]
+    if documents:
+        document_model.objects.bulk_create(
+            documents,
+            update_conflicts=True,
+            unique_fields=['content_type', 'object_id'],
+            update_fields=['title', 'body', 'updated_at'],
+        )
+    return len(documents)
+
+
+def index_all(content_type, chunk_size=2000, apps=global_apps):
+    """
+    Index every object of one content type, chunk_size rows at a time.
+    Pass a migration's `apps` to run with the historical models.
+    Returns the number of objects indexed.
+    """
+    Model = get_searchable_model(content_type, apps)
+    document_model = apps.get_model('search', 'SearchDocument')
+    _, title_field, body_field = SEARCHABLE_MODELS[content_type]
+    queryset = Model._base_manager.only('pk', title_field, body_field).order_by('pk')
+    indexed = 0
+    last_pk = None
+    while True:
+        chunk = queryset.filter(pk__gt=last_pk) if last_pk else queryset
+        chunk = list(chunk[:chunk_size])
+        if not chunk:
+            return indexed
+        indexed += index_objects(content_type, chunk, document_model)
+        last_pk = chunk[-1].pk
+
+
+def remove_objects(content_type, object_ids):
+    return SearchDocument.objects.filter(
+        content_type=content_type,
+        object_id__in=list(object_ids)
+    ).delete()[0]
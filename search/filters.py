@@ -0,0 +1,50 @@
+from functools import partial
+from django.conf import settings
+from django.db.models import Case, IntegerField, Value, When
+from rest_framework import filters
+from .backends import get_search_backend
+
+
+def attach_highlights(instances, backend, content_type, query):
+    highlights = backend.highlight(content_type, query, [obj.pk for obj in instances])
+    for obj in instances:
+        obj.search_highlight = highlights.get(obj.pk)
+
+
+class FullTextSearchFilter(filters.SearchFilter):
+    """
+    ?search= backed by the full-text index for views that set
+    `search_content_type`. Results come back in relevance order (unless
+    ?ordering= is given) and rows get a highlighted `search_highlight`
+    snippet. Falls back to SearchFilter's icontains over search_fields when
+    the database has no full-text backend. List it after the backends that
+    filter (DjangoFilterBackend): their filters are pushed into the search,
+    so SEARCH_MAX_RESULTS caps the matches that survive them.
+    """
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '').strip()
+        content_type = getattr(view, 'search_content_type', None)
+        backend = get_search_backend()
+        if not query or content_type is None or backend is None:
+            return super().filter_queryset(request, queryset, view)
+
+        within = None
+        if queryset.query.has_filters():
+            within = queryset.order_by().values('pk').query.sql_with_params()
+        matches = backend.search(content_type, query, limit=settings.SEARCH_MAX_RESULTS, within=within)
+        if not matches:
+            return queryset.none()
+
+        ids = [match.object_id for match in matches]
+        queryset = queryset.filter(pk__in=ids).annotate(
+            search_rank=Case(
+                *[When(pk=object_id, then=Value(position)) for position, object_id in enumerate(ids)],
+                output_field=IntegerField(),
+            )
+        ).order_by('search_rank')
+
+        if hasattr(queryset, 'attach'):
+            queryset = queryset.attach(
+                partial(attach_highlights, backend=backend, content_type=content_type, query=query)
+            )
+        return queryset
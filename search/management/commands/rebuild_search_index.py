@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+from search.backends import get_search_backend
+from search.documents import SEARCHABLE_MODELS, get_searchable_model, index_all
+from search.models import SearchDocument
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index for prompts, tools, news and blogs in chunks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--type', type=int, choices=sorted(SEARCHABLE_MODELS),
+                            help='Only rebuild one content type (1=prompts, 2=tools, 3=news, 4=blogs)')
+        parser.add_argument('--chunk-size', type=int, default=2000)
+        parser.add_argument('--clear', action='store_true',
+                            help='Delete the existing documents before indexing')
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        if backend is None:
+            raise CommandError('No full-text search backend for this database')
+
+        chunk_size = options['chunk_size']
+        content_types = [options['type']] if options['type'] else sorted(SEARCHABLE_MODELS)
+
+        for content_type in content_types:
+            Model = get_searchable_model(content_type)
+            documents = SearchDocument.objects.filter(content_type=content_type)
+            if options['clear']:
+                documents.delete()
+
+            indexed = index_all(content_type, chunk_size)
+
+            # Drop documents whose objects no longer exist
+            stale = documents.exclude(object_id__in=Model._base_manager.values('pk')).delete()[0]
+            self.stdout.write(self.style.SUCCESS(
+                f'{Model.__name__}: {indexed} indexed, {stale} stale removed'
+            ))
+
+        backend.optimize()
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.8 on 2026-10-18 10:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_type', models.IntegerField(choices=[(1, 'Prompt'), (2, 'Tool'), (3, 'News'), (4, 'Blog')])),
+                ('object_id', models.UUIDField()),
+                ('title', models.CharField(max_length=255)),
+                ('body', models.TextField(blank=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'search_documents',
+                'unique_together': {('content_type', 'object_id')},
+            },
+        ),
+    ]
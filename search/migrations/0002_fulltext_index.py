@@ -0,0 +1,71 @@
+from django.db import migrations
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE search_fts USING fts5(
+        title, body,
+        content='search_documents', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER search_documents_ai AFTER INSERT ON search_documents BEGIN
+        INSERT INTO search_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END
+    """,
+    """
+    CREATE TRIGGER search_documents_ad AFTER DELETE ON search_documents BEGIN
+        INSERT INTO search_fts(search_fts, rowid, title, body) VALUES ('delete', old.id, old.title, old.body);
+    END
+    """,
+    """
+    CREATE TRIGGER search_documents_au AFTER UPDATE ON search_documents BEGIN
+        INSERT INTO search_fts(search_fts, rowid, title, body) VALUES ('delete', old.id, old.title, old.body);
+        INSERT INTO search_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END
+    """,
+]
+
+SQLITE_REVERSE = [
+    'DROP TRIGGER IF EXISTS search_documents_au',
+    'DROP TRIGGER IF EXISTS search_documents_ad',
+    'DROP TRIGGER IF EXISTS search_documents_ai',
+    'DROP TABLE IF EXISTS search_fts',
+]
+
+POSTGRES_FORWARD = [
+    """
+    ALTER TABLE search_documents ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(body, '')), 'B')
+    ) STORED
+    """,
+    'CREATE INDEX search_documents_vector_gin ON search_documents USING GIN (search_vector)',
+]
+
+POSTGRES_REVERSE = [
+    'DROP INDEX IF EXISTS search_documents_vector_gin',
+    'ALTER TABLE search_documents DROP COLUMN IF EXISTS search_vector',
+]
+
+
+def run_for_vendor(statements):
+    def run(apps, schema_editor):
+        for statement in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_for_vendor({'sqlite': SQLITE_FORWARD, 'postgresql': POSTGRES_FORWARD}),
+            run_for_vendor({'sqlite': SQLITE_REVERSE, 'postgresql': POSTGRES_REVERSE}),
+        ),
+    ]
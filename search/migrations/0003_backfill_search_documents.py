@@ -0,0 +1,22 @@
+from django.db import migrations
+from search.documents import SEARCHABLE_MODELS, index_all
+
+
+def backfill(apps, schema_editor):
+    # Content saved before the index existed has no documents; the signals
+    # only index rows saved from now on
+    for content_type in SEARCHABLE_MODELS:
+        index_all(content_type, apps=apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0002_fulltext_index'),
+        ('prompts', '0004_prompt_comment_count'),
+        ('content', '0007_blog_comment_count_news_comment_count_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+from django.db import models
+
+
+class SearchDocument(models.Model):
+    """
+    Denormalized text of every searchable object.
+    Type mapping: 1=prompts, 2=tools, 3=news, 4=blogs
+    The full-text index itself is created per database vendor in the
+    migrations (FTS5 table on SQLite, tsvector column + GIN index on Postgres).
+    """
+    DOCUMENT_TYPES = [
+        (1, 'Prompt'),
+        (2, 'Tool'),
+        (3, 'News'),
+        (4, 'Blog'),
+    ]
+
+    content_type = models.IntegerField(choices=DOCUMENT_TYPES)
+    object_id = models.UUIDField()
+    title = models.CharField(max_length=255)
+    body = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'search_documents'
+        unique_together = ['content_type', 'object_id']
+
+    def __str__(self):
+        return f"{self.get_content_type_display()}#{self.object_id}: {self.title}"
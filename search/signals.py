@@ -0,0 +1,26 @@
+from django.db.models.signals import post_delete, post_save
+from .backends import get_search_backend
+from .documents import SEARCHABLE_MODELS, get_content_type, get_searchable_model, index_objects, remove_objects
+
+
+def index_on_save(sender, instance, update_fields=None, **kwargs):
+    if get_search_backend() is None:
+        return
+    content_type = get_content_type(sender)
+    _, title_field, body_field = SEARCHABLE_MODELS[content_type]
+    # Counter-only saves (views, scores, ...) don't touch the indexed text
+    if update_fields is not None and not {title_field, body_field} & set(update_fields):
+        return
+    index_objects(content_type, [instance])
+
+
+def remove_on_delete(sender, instance, **kwargs):
+    if get_search_backend() is None:
+        return
+    remove_objects(get_content_type(sender), [instance.pk])
+
+
+for content_type in SEARCHABLE_MODELS:
+    model = get_searchable_model(content_type)
+    post_save.connect(index_on_save, sender=model, dispatch_uid=f'search_index_{content_type}')
+    post_delete.connect(remove_on_delete, sender=model, dispatch_uid=f'search_remove_{content_type}')
@@ -0,0 +1,86 @@
+from django.db import connection
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from accounts.models import User
+from prompts.models import Prompt
+from .backends import SQLiteFTSBackend, get_search_backend
+from .documents import index_all
+from .models import SearchDocument
+
+
+class SQLiteFTSTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(email='author@example.com', username='author', password='pass12345')
+        cls.in_body = Prompt.objects.create(
+            title='Weekly planner', body='Plan the week around one kubernetes migration.', author=cls.author, type='text'
+        )
+        cls.in_title = Prompt.objects.create(
+            title='Kubernetes troubleshooting', body='Find out why the pods restart.', author=cls.author, type='text'
+        )
+        Prompt.objects.create(title='Haiku', body='Five, seven, five.', author=cls.author, type='text')
+
+    def setUp(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('SQLite FTS5 backend')
+        self.backend = get_search_backend()
+
+    def search(self, query):
+        return [match.object_id for match in self.backend.search(1, query, limit=10)]
+
+    def test_title_matches_rank_above_body_matches(self):
+        self.assertIsInstance(self.backend, SQLiteFTSBackend)
+        self.assertEqual(self.search('kubernetes'), [self.in_title.pk, self.in_body.pk])
+
+    def test_last_term_is_a_prefix(self):
+        self.assertEqual(self.search('troubleshoot'), [self.in_title.pk])
+        self.assertEqual(self.search('pods rest'), [self.in_title.pk])
+
+    def test_user_input_is_never_fts_syntax(self):
+        self.assertEqual(self.search('"kubernetes" -pods'), [self.in_title.pk])
+        self.assertEqual(self.search('NEAR(* -:'), [])
+        self.assertIsNone(SQLiteFTSBackend.to_match_expression('***'))
+
+    def test_triggers_follow_saves_and_deletes(self):
+        self.in_body.title = 'Monthly review'
+        self.in_body.body = 'Look back at the month.'
+        self.in_body.save()
+        self.assertEqual(self.search('kubernetes'), [self.in_title.pk])
+        self.assertEqual(self.search('monthly'), [self.in_body.pk])
+
+        self.in_title.delete()
+        self.assertEqual(self.search('kubernetes'), [])
+        self.assertEqual(SearchDocument.objects.filter(content_type=1).count(), 2)
+
+    def test_counter_saves_do_not_reindex(self):
+        document = SearchDocument.objects.get(content_type=1, object_id=self.in_body.pk)
+        Prompt.objects.filter(pk=self.in_body.pk).update(title='Not indexed')
+        self.in_body.refresh_from_db()
+        self.in_body.save(update_fields=['views'])
+        self.assertEqual(SearchDocument.objects.get(pk=document.pk).title, 'Weekly planner')
+
+    def test_highlight(self):
+        snippets = self.backend.highlight(1, 'kubernetes', [self.in_title.pk, self.in_body.pk])
+        self.assertEqual(set(snippets), {self.in_title.pk, self.in_body.pk})
+        self.assertIn('<mark>Kubernetes</mark>', snippets[self.in_title.pk])
+
+    def test_search_endpoint_orders_by_relevance(self):
+        response = APIClient().get('/api/prompts/', {'search': 'kubernetes'})
+        self.assertEqual(response.status_code, 200)
+        results = response.data['results']
+        self.assertEqual([result['id'] for result in results], [str(self.in_title.pk), str(self.in_body.pk)])
+        self.assertIn('<mark>', results[0]['search_highlight'])
+        self.assertEqual(APIClient().get('/api/prompts/', {'search': 'zebra'}).data['results'], [])
+
+    def test_index_all_backfills_unindexed_content(self):
+        SearchDocument.objects.all().delete()
+        self.assertEqual(self.search('kubernetes'), [])
+        self.assertEqual(index_all(1, chunk_size=2), 3)
+        self.assertEqual(self.search('kubernetes'), [self.in_title.pk, self.in_body.pk])
+
+    @override_settings(SEARCH_MAX_RESULTS=1)
+    def test_the_limit_applies_after_the_other_filters(self):
+        self.in_body.type = 'image'
+        self.in_body.save()
+        response = APIClient().get('/api/prompts/', {'search': 'kubernetes', 'type': 'image'})
+        self.assertEqual([item['id'] for item in response.data['results']], [str(self.in_body.pk)])
@@ -4,11 +4,10 @@ from .models import Tag, Taggable
 
 @admin.register(Tag)
 class TagAdmin(admin.ModelAdmin):
-    list_display = ['name', 'created_at', 'usage_count']
+    list_display = ['name', 'created_at', 'usage_count', 'prompt_count', 'tool_count',
+                    'news_count', 'blog_count']
     search_fields = ['name']
-
-    def usage_count(self, obj):
-        return Taggable.objects.filter(tag=obj).count()
+    readonly_fields = ['usage_count', 'prompt_count', 'tool_count', 'news_count', 'blog_count']
 
 
 @admin.register(Taggable)
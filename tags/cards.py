@@ -0,0 +1,53 @@
+from collections import defaultdict
+from django.apps import apps
+from .models import TAGGABLE_MODELS
+
+# taggable_type -> (type name, title field)
+CARD_FIELDS = {
+    1: ('prompt', 'title'),
+    2: ('tool', 'name'),
+    3: ('news', 'title'),
+    4: ('blog', 'title'),
+}
+
+
+def build_item_cards(taggables):
+    """
+    Turn a page of Taggable rows into lightweight cards of the tagged objects.
+    Objects are fetched with one query per type; rows whose object no longer
+    exists are skipped. Cards keep the order of `taggables`.
+    """
+    ids_by_type = defaultdict(set)
+    for taggable in taggables:
+        ids_by_type[taggable.taggable_type].add(taggable.taggable_id)
+
+    objects = {}
+    for taggable_type, ids in ids_by_type.items():
+        if taggable_type not in TAGGABLE_MODELS:
+            continue
+        Model = apps.get_model(TAGGABLE_MODELS[taggable_type])
+        _, title_field = CARD_FIELDS[taggable_type]
+        queryset = Model._base_manager.filter(pk__in=ids).select_related('author').only(
+            'id', 'slug', title_field, 'score', 'created_at', 'author__username'
+        )
+        for obj in queryset:
+            objects[(taggable_type, obj.pk)] = obj
+
+    cards = []
+    for taggable in taggables:
+        obj = objects.get((taggable.taggable_type, taggable.taggable_id))
+        if obj is None:
+            continue
+        type_name, title_field = CARD_FIELDS[taggable.taggable_type]
+        cards.append({
+            'type': taggable.taggable_type,
+            'type_name': type_name,
+            'id': str(obj.pk),
+            'slug': obj.slug,
+            'title': getattr(obj, title_field),
+            'author': obj.author.username if obj.author else None,
+            'score': obj.score,
+            'created_at': obj.created_at,
+            'tagged_at': taggable.created_at,
+        })
+    return cards
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from tags.services import reconcile_usage_counts
+
+
+class Command(BaseCommand):
+    help = 'Recompute stored tag usage counters from the taggables table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only report how many tags have drifted')
+
+    def handle(self, *args, **options):
+        fixed = reconcile_usage_counts(chunk_size=options['chunk_size'], dry_run=options['dry_run'])
+        verb = 'would be fixed' if options['dry_run'] else 'fixed'
+        self.stdout.write(self.style.SUCCESS(f'{fixed} tag(s) {verb}'))
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.8 on 2026-10-18 10:27
+
+from django.db import migrations, models
+from django.db.models import Count
+
+USAGE_COUNT_FIELDS = {1: 'prompt_count', 2: 'tool_count', 3: 'news_count', 4: 'blog_count'}
+
+
+def backfill_usage_counts(apps, schema_editor):
+    Tag = apps.get_model('tags', 'Tag')
+    Taggable = apps.get_model('tags', 'Taggable')
+    rows = Taggable.objects.values('tag_id', 'taggable_type').annotate(total=Count('id')).order_by()
+    for row in rows.iterator():
+        field = USAGE_COUNT_FIELDS.get(row['taggable_type'])
+        if not field:
+            continue
+        Tag.objects.filter(pk=row['tag_id']).update(
+            usage_count=models.F('usage_count') + row['total'],
+            **{field: row['total']}
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tags', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tag',
+            name='blog_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='tag',
+            name='news_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='tag',
+            name='prompt_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='tag',
+            name='tool_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='tag',
+            name='usage_count',
+            field=models.IntegerField(default=0, help_text='Number of Taggable rows, maintained by tags.services'),
+        ),
+        migrations.AddIndex(
+            model_name='tag',
+            index=models.Index(fields=['-usage_count'], name='tags_usage_c_d48fae_idx'),
+        ),
+        migrations.RunPython(backfill_usage_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.8 on 2026-10-18 10:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tags', '0002_tag_usage_counts'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='taggable',
+            name='taggables_tag_id_3342d2_idx',
+        ),
+        migrations.AddIndex(
+            model_name='taggable',
+            index=models.Index(fields=['tag', '-created_at', '-id'], name='taggables_tag_id_88b1f3_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='taggable',
+            index=models.Index(fields=['tag', 'taggable_type', '-created_at', '-id'], name='taggables_tag_id_962447_idx'),
+        ),
+    ]
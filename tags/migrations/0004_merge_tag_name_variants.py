@@ -0,0 +1,59 @@
+from django.db import migrations
+from django.db.models import Count
+
+USAGE_COUNT_FIELDS = {1: 'prompt_count', 2: 'tool_count', 3: 'news_count', 4: 'blog_count'}
+
+
+def normalize_tag_name(name):
+    # Same as tags.services.normalize_tag_names, frozen for this migration
+    return ' '.join(str(name).split()).lower()
+
+
+def merge_tag_name_variants(apps, schema_editor):
+    """
+    Tag names are now stored lowercased with collapsed whitespace. Merge the
+    tags saved before that differ only in spelling ("Python", "python ")
+    into one, so later edits don't create duplicates next to them.
+    """
+    Tag = apps.get_model('tags', 'Tag')
+    Taggable = apps.get_model('tags', 'Taggable')
+
+    groups = {}
+    for pk, name in Tag.objects.order_by('created_at', 'pk').values_list('pk', 'name'):
+        groups.setdefault(normalize_tag_name(name), []).append((pk, name))
+
+    for name, tags in groups.items():
+        if not name or (len(tags) == 1 and tags[0][1] == name):
+            continue
+        # Keep the tag already spelled that way, else the oldest
+        keeper = next((pk for pk, spelling in tags if spelling == name), tags[0][0])
+        others = [pk for pk, _ in tags if pk != keeper]
+
+        tagged = set(Taggable.objects.filter(tag_id=keeper).values_list('taggable_type', 'taggable_id'))
+        for taggable in Taggable.objects.filter(tag_id__in=others).order_by('created_at', 'pk'):
+            item = (taggable.taggable_type, taggable.taggable_id)
+            if item in tagged:
+                taggable.delete()
+            else:
+                tagged.add(item)
+                Taggable.objects.filter(pk=taggable.pk).update(tag_id=keeper)
+        Tag.objects.filter(pk__in=others).delete()
+
+        counts = dict.fromkeys(USAGE_COUNT_FIELDS.values(), 0)
+        rows = Taggable.objects.filter(tag_id=keeper).values('taggable_type').annotate(total=Count('id')).order_by()
+        for row in rows:
+            field = USAGE_COUNT_FIELDS.get(row['taggable_type'])
+            if field:
+                counts[field] = row['total']
+        Tag.objects.filter(pk=keeper).update(name=name, usage_count=sum(counts.values()), **counts)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tags', '0003_taggable_item_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_tag_name_variants, migrations.RunPython.noop),
+    ]
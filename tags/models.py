@@ -3,17 +3,41 @@ from django.db import models
 from django.core.exceptions import ValidationError
 
 class Tag(models.Model):
+    # taggable_type -> per-type usage counter column
+    USAGE_COUNT_FIELDS = {
+        1: 'prompt_count',
+        2: 'tool_count',
+        3: 'news_count',
+        4: 'blog_count',
+    }
+    
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     name = models.CharField(max_length=50, unique=True)
+    usage_count = models.IntegerField(default=0, help_text='Number of Taggable rows, maintained by tags.services')
+    prompt_count = models.IntegerField(default=0)
+    tool_count = models.IntegerField(default=0)
+    news_count = models.IntegerField(default=0)
+    blog_count = models.IntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
         db_table = 'tags'
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['-usage_count']),
+        ]
     
     def __str__(self):
         return self.name
 
+# Type mapping: 1=prompts, 2=tools, 3=news, 4=blogs
+TAGGABLE_MODELS = {
+    1: 'prompts.Prompt',
+    2: 'content.Tool',
+    3: 'content.News',
+    4: 'content.Blog',
+}
+
 class Taggable(models.Model):
     """
     Polymorphic tagging system
@@ -36,7 +60,9 @@ class Taggable(models.Model):
         unique_together = ['tag', 'taggable_type', 'taggable_id']
         indexes = [
             models.Index(fields=['taggable_type', 'taggable_id']),
-            models.Index(fields=['tag']),
+            # Stable, paginated listing of a tag's items (optionally per type)
+            models.Index(fields=['tag', '-created_at', '-id']),
+            models.Index(fields=['tag', 'taggable_type', '-created_at', '-id']),
         ]
     
     def __str__(self):
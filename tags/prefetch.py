@@ -0,0 +1,63 @@
+from collections import defaultdict
+from functools import partial
+from django.db import models
+from .models import Taggable
+
+
+def prefetch_tags(instances, taggable_type):
+    """
+    Load tag names for a page of objects of one taggable type in a single query.
+    Each instance gets a `prefetched_tags` list that the serializers read instead
+    of querying Taggable row by row.
+    """
+    instances = [obj for obj in instances if isinstance(obj, models.Model)]
+    if not instances:
+        return instances
+
+    tags_by_id = defaultdict(list)
+    taggables = Taggable.objects.filter(
+        taggable_type=taggable_type,
+        taggable_id__in={obj.pk for obj in instances}
+    ).select_related('tag')
+    for taggable in taggables:
+        tags_by_id[taggable.taggable_id].append(taggable.tag.name)
+
+    for obj in instances:
+        obj.prefetched_tags = tags_by_id.get(obj.pk, [])
+    return instances
+
+
+class TaggedQuerySet(models.QuerySet):
+    """
+    QuerySet for polymorphic taggable models.
+    `with_tags(taggable_type)` makes every evaluation (including paginated
+    slices) attach tags to the fetched rows with one extra query.
+    `attach(loader)` registers any other bulk loader that should run on the
+    fetched rows the same way.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._loaders = []
+        self._loaders_done = False
+
+    def with_tags(self, taggable_type):
+        return self.attach(partial(prefetch_tags, taggable_type=taggable_type))
+
+    def attach(self, loader):
+        clone = self._chain()
+        clone._loaders = [*self._loaders, loader]
+        return clone
+
+    def _clone(self):
+        clone = super()._clone()
+        clone._loaders = list(self._loaders)
+        return clone
+
+    def _fetch_all(self):
+        super()._fetch_all()
+        if self._loaders and not self._loaders_done:
+            instances = [obj for obj in self._result_cache if isinstance(obj, models.Model)]
+            if instances:
+                for loader in self._loaders:
+                    loader(instances)
+            self._loaders_done = True
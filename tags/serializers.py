@@ -2,15 +2,12 @@ from rest_framework import serializers
 from .models import Tag, Taggable
 
 class TagSerializer(serializers.ModelSerializer):
-    usage_count = serializers.SerializerMethodField()
-    
     class Meta:
         model = Tag
-        fields = ['id', 'name', 'usage_count', 'created_at']
-        read_only_fields = ['id', 'created_at']
-    
-    def get_usage_count(self, obj):
-        return Taggable.objects.filter(tag=obj).count()
+        fields = ['id', 'name', 'usage_count', 'prompt_count', 'tool_count',
+                  'news_count', 'blog_count', 'created_at']
+        read_only_fields = ['id', 'usage_count', 'prompt_count', 'tool_count',
+                            'news_count', 'blog_count', 'created_at']
 
 class TaggableSerializer(serializers.ModelSerializer):
     tag_name = serializers.CharField(source='tag.name', read_only=True)
@@ -18,4 +15,16 @@ class TaggableSerializer(serializers.ModelSerializer):
     class Meta:
         model = Taggable
         fields = ['tag', 'tag_name', 'taggable_type', 'taggable_id', 'created_at']
-        read_only_fields = ['created_at']
\ No newline at end of file
+        read_only_fields = ['created_at']
+
+class TaggedItemCardSerializer(serializers.Serializer):
+    """Lightweight card of a tagged prompt/tool/news/blog (see tags.cards)"""
+    type = serializers.IntegerField()
+    type_name = serializers.CharField()
+    id = serializers.UUIDField()
+    slug = serializers.SlugField()
+    title = serializers.CharField()
+    author = serializers.CharField(allow_null=True)
+    score = serializers.IntegerField()
+    created_at = serializers.DateTimeField()
+    tagged_at = serializers.DateTimeField()
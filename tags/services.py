@@ -0,0 +1,169 @@
+from collections import Counter
+from functools import partial
+from django.db import connection, transaction
+from django.db.models import Count, F
+from django.utils import timezone
+from caching.generations import bump_generation
+from config.sql import column, prep, table_name
+from .models import Tag, Taggable
+
+
+def normalize_tag_names(names):
+    """Lowercase, collapse whitespace, drop empties and duplicates (keeping order)."""
+    normalized = (' '.join(str(name).split()).lower() for name in names or [])
+    return list(dict.fromkeys(name for name in normalized if name))
+
+
+def get_or_create_tags(names):
+    """
+    Resolve tag names to Tag rows with one IN query, bulk-creating the missing
+    ones. Concurrent creators are tolerated via ignore_conflicts.
+    Returns {name: Tag}.
+    """
+    tags = {tag.name: tag for tag in Tag.objects.filter(name__in=names)}
+    missing = [name for name in names if name not in tags]
+    if missing:
+        Tag.objects.bulk_create([Tag(name=name) for name in missing], ignore_conflicts=True)
+        # Re-read: rows that lost a race keep the winner's id, not ours
+        tags.update({tag.name: tag for tag in Tag.objects.filter(name__in=missing)})
+    return tags
+
+
+def adjust_usage_counts(tag_ids, taggable_type, delta):
+    """Move usage_count and the per-type counter of the given tags by delta."""
+    field = Tag.USAGE_COUNT_FIELDS.get(int(taggable_type))
+    if not tag_ids or not field:
+        return 0
+    return Tag.objects.filter(pk__in=list(tag_ids)).update(
+        usage_count=F('usage_count') + delta,
+        **{field: F(field) + delta}
+    )
+
+
+_column = partial(column, Taggable)
+_prep = partial(prep, Taggable)
+
+
+def _returned_tag_ids(cursor):
+    return [Tag._meta.pk.to_python(tag_id) for tag_id, in cursor.fetchall()]
+
+
+def insert_taggables(taggable_type, taggable_id, tag_ids):
+    """
+    Tag one object with one INSERT ... ON CONFLICT DO NOTHING RETURNING.
+    Returns the tag ids actually inserted: rows a concurrent writer added
+    first are skipped and must not be counted again.
+    """
+    tag_ids = list(tag_ids)
+    if not tag_ids:
+        return []
+    now = timezone.now()
+    names = ['tag', 'taggable_type', 'taggable_id', 'created_at']
+    params = []
+    for tag_id in tag_ids:
+        params.extend(_prep(name, value) for name, value in zip(names, (tag_id, taggable_type, taggable_id, now)))
+
+    table = table_name(Taggable)
+    row = '(' + ', '.join(['%s'] * len(names)) + ')'
+    sql = (
+        f'INSERT INTO {table} ({", ".join(_column(name) for name in names)}) '
+        f'VALUES {", ".join([row] * len(tag_ids))} '
+        f'ON CONFLICT ({", ".join(_column(name) for name in names[:3])}) DO NOTHING '
+        f'RETURNING {_column("tag")}'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return _returned_tag_ids(cursor)
+
+
+def delete_taggables(taggable_type, taggable_id, tag_ids):
+    """Untag one object with one DELETE ... RETURNING; returns the tag ids actually removed."""
+    tag_ids = list(tag_ids)
+    if not tag_ids:
+        return []
+    table = table_name(Taggable)
+    sql = (
+        f'DELETE FROM {table} WHERE {_column("taggable_type")} = %s AND {_column("taggable_id")} = %s '
+        f'AND {_column("tag")} IN ({", ".join(["%s"] * len(tag_ids))}) '
+        f'RETURNING {_column("tag")}'
+    )
+    params = [_prep('taggable_type', taggable_type), _prep('taggable_id', taggable_id)]
+    params.extend(_prep('tag', tag_id) for tag_id in tag_ids)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return _returned_tag_ids(cursor)
+
+
+@transaction.atomic
+def set_tags(taggable_type, taggable_id, names, is_new=False):
+    """
+    Make the tags of one object exactly `names`.
+    Only the difference to the current Taggable rows is written, and the
+    counters move only by the rows this call actually inserted or deleted.
+    Pass is_new=True for freshly created objects to skip reading current tags.
+    Returns (added_tag_ids, removed_tag_ids).
+    """
+    names = normalize_tag_names(names)
+    tags = get_or_create_tags(names) if names else {}
+    wanted = [tags[name].pk for name in names]
+
+    current = set()
+    if not is_new:
+        current = set(Taggable.objects.filter(
+            taggable_type=taggable_type,
+            taggable_id=taggable_id
+        ).values_list('tag_id', flat=True))
+
+    added = [tag_id for tag_id in wanted if tag_id not in current]
+    removed = current.difference(wanted)
+
+    removed = delete_taggables(taggable_type, taggable_id, removed)
+    adjust_usage_counts(removed, taggable_type, -1)
+    added = insert_taggables(taggable_type, taggable_id, added)
+    adjust_usage_counts(added, taggable_type, 1)
+    if added or removed:
+        # Raw SQL and the counter updates send no model signals
+        bump_generation('tags.Tag', 'tags.Taggable')
+
+    return added, removed
+
+
+def reconcile_usage_counts(chunk_size=1000, dry_run=False):
+    """
+    Recompute every tag's counters from the Taggable table and fix the ones
+    that drifted (e.g. after admin edits). Returns the number of tags fixed.
+    """
+    actual = {}
+    rows = Taggable.objects.values('tag_id', 'taggable_type').annotate(total=Count('id')).order_by()
+    for row in rows.iterator():
+        actual.setdefault(row['tag_id'], Counter())[row['taggable_type']] = row['total']
+
+    fields = ['usage_count', *Tag.USAGE_COUNT_FIELDS.values()]
+    fixed = 0
+    last_pk = None
+    queryset = Tag.objects.only('pk', *fields).order_by('pk')
+    while True:
+        chunk = list((queryset.filter(pk__gt=last_pk) if last_pk else queryset)[:chunk_size])
+        if not chunk:
+            break
+        last_pk = chunk[-1].pk
+
+        changed = []
+        for tag in chunk:
+            counts = actual.get(tag.pk, Counter())
+            expected = {
+                field: counts.get(taggable_type, 0)
+                for taggable_type, field in Tag.USAGE_COUNT_FIELDS.items()
+            }
+            expected['usage_count'] = sum(expected.values())
+            if any(getattr(tag, field) != value for field, value in expected.items()):
+                for field, value in expected.items():
+                    setattr(tag, field, value)
+                changed.append(tag)
+
+        if changed and not dry_run:
+            Tag.objects.bulk_update(changed, fields)
+        fixed += len(changed)
+    if fixed and not dry_run:
+        bump_generation('tags.Tag')
+    return fixed
@@ -0,0 +1,20 @@
+from django.apps import apps
+from django.db.models.signals import post_delete
+from .models import TAGGABLE_MODELS
+from .services import set_tags
+
+
+def clear_tags_receiver(taggable_type):
+    def clear_tags(sender, instance, **kwargs):
+        """Taggables have no FK to their object, so drop them (and their counts) here."""
+        set_tags(taggable_type, instance.pk, [])
+    return clear_tags
+
+
+for taggable_type, model_label in TAGGABLE_MODELS.items():
+    post_delete.connect(
+        clear_tags_receiver(taggable_type),
+        sender=apps.get_model(model_label),
+        weak=False,
+        dispatch_uid=f'tags_clear_{taggable_type}'
+    )
@@ -1,3 +1,68 @@
+import importlib
+import uuid
+from django.apps import apps
 from django.test import TestCase
+from .models import Tag, Taggable
+from .services import delete_taggables, reconcile_usage_counts, set_tags
 
-# Create your tests here.
+
+class SetTagsTests(TestCase):
+    def setUp(self):
+        self.object_id = uuid.uuid4()
+
+    def counts(self, name):
+        return Tag.objects.values_list('usage_count', 'prompt_count', 'tool_count').get(name=name)
+
+    def test_writes_only_the_difference(self):
+        added, removed = set_tags(1, self.object_id, ['Python', ' django ', 'python'], is_new=True)
+        self.assertEqual(len(added), 2)
+        self.assertEqual(removed, [])
+        self.assertEqual(self.counts('python'), (1, 1, 0))
+
+        added, removed = set_tags(1, self.object_id, ['django', 'orm'])
+        self.assertEqual(added, [Tag.objects.get(name='orm').pk])
+        self.assertEqual(removed, [Tag.objects.get(name='python').pk])
+        self.assertEqual(self.counts('python'), (0, 0, 0))
+        self.assertEqual(self.counts('django'), (1, 1, 0))
+        self.assertEqual(reconcile_usage_counts(), 0)
+
+    def test_rows_another_writer_inserted_are_not_counted_again(self):
+        set_tags(1, self.object_id, ['python'], is_new=True)
+        # A racing writer that read no tags yet: its insert of 'python' conflicts
+        added, _ = set_tags(1, self.object_id, ['python', 'django'], is_new=True)
+        self.assertEqual(added, [Tag.objects.get(name='django').pk])
+        self.assertEqual(self.counts('python'), (1, 1, 0))
+        self.assertEqual(Taggable.objects.filter(taggable_id=self.object_id).count(), 2)
+        self.assertEqual(reconcile_usage_counts(), 0)
+
+    def test_rows_another_writer_deleted_are_not_counted_again(self):
+        set_tags(2, self.object_id, ['python'], is_new=True)
+        python = Tag.objects.get(name='python')
+        self.assertEqual(delete_taggables(2, self.object_id, [python.pk]), [python.pk])
+        self.assertEqual(delete_taggables(2, self.object_id, [python.pk]), [])
+
+
+class MergeTagNameVariantsTests(TestCase):
+    def test_variants_are_merged_into_one_tag(self):
+        migration = importlib.import_module('tags.migrations.0004_merge_tag_name_variants')
+        first, second = uuid.uuid4(), uuid.uuid4()
+        upper = Tag.objects.create(name='Python')
+        spaced = Tag.objects.create(name=' python ')
+        lower = Tag.objects.create(name='python')
+        other = Tag.objects.create(name='Django')
+        Taggable.objects.create(tag=upper, taggable_type=1, taggable_id=first)
+        Taggable.objects.create(tag=spaced, taggable_type=2, taggable_id=second)
+        Taggable.objects.create(tag=lower, taggable_type=1, taggable_id=first)
+
+        migration.merge_tag_name_variants(apps, None)
+
+        self.assertEqual(list(Tag.objects.values_list('pk', 'name')), [(other.pk, 'django'), (lower.pk, 'python')])
+        self.assertEqual(self.counts(), (2, 1, 1))
+        self.assertEqual(reconcile_usage_counts(), 0)
+
+        added, _ = set_tags(1, first, ['Python', 'Django'])
+        self.assertEqual(added, [other.pk])
+        self.assertEqual(Tag.objects.count(), 2)
+
+    def counts(self):
+        return Tag.objects.values_list('usage_count', 'prompt_count', 'tool_count').get(name='python')
@@ -1,23 +1,67 @@
 from rest_framework import viewsets, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from .models import Tag, Taggable
-from .serializers import TagSerializer, TaggableSerializer
+from rest_framework.exceptions import ValidationError
+from .models import Tag, Taggable, TAGGABLE_MODELS
+from .serializers import TagSerializer, TaggedItemCardSerializer
+from .cards import build_item_cards
 from accounts.permissions import IsModeratorOrReadOnly
+from caching.conditional import ConditionalGetMixin
+from caching.mixins import CachedResponseMixin
 
 
-class TagViewSet(viewsets.ModelViewSet):
+class TagViewSet(ConditionalGetMixin, CachedResponseMixin, viewsets.ModelViewSet):
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
     permission_classes = [IsModeratorOrReadOnly]
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['name']
-    ordering_fields = ['name', 'created_at']
+    ordering_fields = ['name', 'created_at', 'usage_count']
+    popular_limit = 20
+    popular_max_limit = 100
+    cache_dependencies = ['tags.Tag', 'tags.Taggable', *TAGGABLE_MODELS.values()]
+    cached_actions = ('list', 'retrieve', 'popular', 'items')
+    last_modified_field = None
+    etag_fields = ['usage_count', 'prompt_count', 'tool_count', 'news_count', 'blog_count']
+    detail_etag_fields = ['name']
 
     @action(detail=True, methods=['get'])
     def items(self, request, pk=None):
-        """Get all items tagged with this tag"""
+        """Paginated cards of the items tagged with this tag, newest first (?type= to filter)"""
+        return self.cached_response(self._items, request, pk=pk)
+
+    def _items(self, request, pk=None):
         tag = self.get_object()
         taggables = Taggable.objects.filter(tag=tag)
-        serializer = TaggableSerializer(taggables, many=True)
+
+        taggable_type = request.query_params.get('type')
+        if taggable_type:
+            if not taggable_type.isdigit() or int(taggable_type) not in TAGGABLE_MODELS:
+                raise ValidationError({'type': 'Must be 1=prompt, 2=tool, 3=news, 4=blog'})
+            taggables = taggables.filter(taggable_type=int(taggable_type))
+
+        page = self.paginate_queryset(taggables.order_by('-created_at', '-id'))
+        serializer = TaggedItemCardSerializer(build_item_cards(page), many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @action(detail=False, methods=['get'])
+    def popular(self, request):
+        """Most used tags, optionally for one type (?type=1..4), straight from the counters"""
+        return self.cached_response(self._popular, request)
+
+    def _popular(self, request):
+        count_field = 'usage_count'
+        taggable_type = request.query_params.get('type')
+        if taggable_type:
+            if not taggable_type.isdigit() or int(taggable_type) not in Tag.USAGE_COUNT_FIELDS:
+                raise ValidationError({'type': 'Must be 1=prompt, 2=tool, 3=news, 4=blog'})
+            count_field = Tag.USAGE_COUNT_FIELDS[int(taggable_type)]
+
+        try:
+            limit = min(int(request.query_params.get('limit', self.popular_limit)), self.popular_max_limit)
+        except ValueError:
+            limit = self.popular_limit
+
+        tags = Tag.objects.filter(**{f'{count_field}__gt': 0}).order_by(f'-{count_field}', 'name')[:max(limit, 1)]
+        serializer = self.get_serializer(tags, many=True)
         return Response(serializer.data)
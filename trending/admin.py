@@ -0,0 +1,10 @@
+from django.contrib import admin
+from .models import TrendingScore
+
+
+@admin.register(TrendingScore)
+class TrendingScoreAdmin(admin.ModelAdmin):
+    list_display = ['content_type', 'object_id', 'rank', 'updated_at']
+    list_filter = ['content_type']
+    ordering = ['-rank']
+    readonly_fields = ['content_type', 'object_id', 'rank', 'updated_at', 'prompt', 'tool', 'news', 'blog']
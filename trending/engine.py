@@ -0,0 +1,168 @@
+import math
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.conf import settings
+from django.db import models
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import Greatest, Log, Power
+from django.utils import timezone
+from caching.generations import bump_generation
+from interactions.counters import get_content_model
+from interactions.models import Bookmark, Comment, Vote
+from .models import TrendingScore
+
+EPOCH = datetime(2024, 1, 1, tzinfo=dt_timezone.utc)
+MIN_SCORE = 1e-6
+# Events older than this many half-lives add < 0.0001% and are skipped on recompute
+RECOMPUTE_WINDOW_HALF_LIVES = 20
+
+# content_type -> TrendingScore FK field
+CONTENT_FK_FIELDS = {
+    1: 'prompt',
+    2: 'tool',
+    3: 'news',
+    4: 'blog',
+}
+
+DEFAULT_WEIGHTS = {
+    'create': 5.0,
+    'view': 0.1,
+    'upvote': 2.0,
+    'downvote': -1.0,
+    'comment': 3.0,
+    'bookmark': 2.0,
+}
+
+
+def get_weights():
+    return {**DEFAULT_WEIGHTS, **getattr(settings, 'TRENDING_WEIGHTS', {})}
+
+
+def get_half_life_hours():
+    return getattr(settings, 'TRENDING_HALF_LIFE_HOURS', 24)
+
+
+def half_lives(when):
+    """Time since EPOCH in half-lives."""
+    return (when - EPOCH).total_seconds() / 3600 / get_half_life_hours()
+
+
+def rank_for(score, now):
+    """Rank of an activity score measured at `now`."""
+    return math.log2(max(score, MIN_SCORE)) + half_lives(now)
+
+
+def current_score(rank, now=None):
+    """Decayed activity score of a rank as of `now`."""
+    return 2 ** (rank - half_lives(now or timezone.now()))
+
+
+def vote_weight(value):
+    weights = get_weights()
+    return {1: weights['upvote'], -1: weights['downvote']}.get(value, 0)
+
+
+def record_activity(content_type, weights_by_id, now=None):
+    """
+    Add activity to the rank of each object in one UPDATE:
+        rank = log2(max(2^(rank - t) + weight, MIN_SCORE)) + t
+    where t is now in half-lives. Objects without a TrendingScore row get one.
+    weights_by_id is {object_id: weight}; returns the number of rows touched.
+    """
+    fk_field = CONTENT_FK_FIELDS.get(int(content_type))
+    weights = {uuid.UUID(str(obj_id)): float(weight) for obj_id, weight in weights_by_id.items() if weight}
+    if fk_field is None or not weights:
+        return 0
+
+    now = now or timezone.now()
+    t = half_lives(now)
+    if len(weights) == 1:
+        weight = Value(next(iter(weights.values())))
+    else:
+        weight = Case(
+            *[When(object_id=obj_id, then=Value(value)) for obj_id, value in weights.items()],
+            default=Value(0.0),
+            output_field=models.FloatField(),
+        )
+    decayed = Power(Value(2.0), F('rank') - Value(t))
+    rows = TrendingScore.objects.filter(content_type=content_type, object_id__in=list(weights))
+    updated = rows.update(
+        rank=Log(Value(2.0), Greatest(decayed + weight, Value(MIN_SCORE))) + Value(t),
+        updated_at=now,
+    )
+
+    if updated < len(weights):
+        existing = set(rows.values_list('object_id', flat=True))
+        Model = get_content_model(content_type)
+        missing = Model._base_manager.filter(
+            pk__in=[obj_id for obj_id in weights if obj_id not in existing]
+        ).values_list('pk', flat=True)
+        created = TrendingScore.objects.bulk_create([
+            TrendingScore(content_type=content_type, object_id=pk, rank=rank_for(weights[pk], now),
+                          updated_at=now, **{f'{fk_field}_id': pk})
+            for pk in missing
+        ], ignore_conflicts=True)
+        updated += len(created)
+
+    bump_generation('trending.TrendingScore')
+    return updated
+
+
+def recompute(content_types=None, chunk_size=500, now=None):
+    """
+    Rebuild ranks from the interaction tables, one chunk of objects at a time.
+    Votes, comments and bookmarks count at their own timestamps; creation and
+    the stored view total (which has no per-view timestamps) count at the
+    object's created_at. Returns the number of rows written.
+    """
+    now = now or timezone.now()
+    weights = get_weights()
+    half_life = get_half_life_hours()
+    window_start = now - timedelta(hours=half_life * RECOMPUTE_WINDOW_HALF_LIVES)
+
+    def decay(when):
+        return 2 ** ((when - now).total_seconds() / 3600 / half_life)
+
+    written = 0
+    for content_type in content_types or sorted(CONTENT_FK_FIELDS):
+        Model = get_content_model(content_type)
+        fk_field = CONTENT_FK_FIELDS[content_type]
+        queryset = Model._base_manager.order_by('pk').values_list('pk', 'created_at', 'views')
+        last_pk = None
+        while True:
+            chunk = list((queryset.filter(pk__gt=last_pk) if last_pk else queryset)[:chunk_size])
+            if not chunk:
+                break
+            last_pk = chunk[-1][0]
+            ids = [pk for pk, _, _ in chunk]
+
+            scores = defaultdict(float)
+            for pk, created_at, views in chunk:
+                scores[pk] = (weights['create'] + weights['view'] * (views or 0)) * decay(created_at)
+            votes = Vote.objects.filter(
+                votable_type=content_type, votable_id__in=ids, updated_at__gte=window_start
+            ).values_list('votable_id', 'value', 'updated_at')
+            for pk, value, when in votes:
+                scores[pk] += vote_weight(value) * decay(when)
+            comments = Comment.objects.filter(
+                commentable_type=content_type, commentable_id__in=ids, created_at__gte=window_start
+            ).values_list('commentable_id', 'created_at')
+            for pk, when in comments:
+                scores[pk] += weights['comment'] * decay(when)
+            bookmarks = Bookmark.objects.filter(
+                bookmarkable_type=content_type, bookmarkable_id__in=ids, created_at__gte=window_start
+            ).values_list('bookmarkable_id', 'created_at')
+            for pk, when in bookmarks:
+                scores[pk] += weights['bookmark'] * decay(when)
+
+            TrendingScore.objects.bulk_create([
+                TrendingScore(content_type=content_type, object_id=pk, rank=rank_for(scores[pk], now),
+                              updated_at=now, **{f'{fk_field}_id': pk})
+                for pk in ids
+            ], update_conflicts=True, unique_fields=['content_type', 'object_id'],
+                update_fields=['rank', 'updated_at'])
+            written += len(ids)
+
+    bump_generation('trending.TrendingScore')
+    return written
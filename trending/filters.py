@@ -0,0 +1,27 @@
+from django.db.models import F
+from rest_framework import filters
+
+
+class TrendingOrderingFilter(filters.OrderingFilter):
+    """
+    OrderingFilter that also accepts ?ordering=trending (hottest first) or
+    -trending, ordering by the joined TrendingScore.rank. Items without a
+    rank yet sort last.
+    """
+    trending_term = 'trending'
+
+    def get_trending_ordering(self, request):
+        term = request.query_params.get(self.ordering_param, '').strip()
+        return term if term.lstrip('-') == self.trending_term else None
+
+    def filter_queryset(self, request, queryset, view):
+        term = self.get_trending_ordering(request)
+        if term is None:
+            return super().filter_queryset(request, queryset, view)
+        if term.startswith('-'):
+            return queryset.order_by(F('trending__rank').asc(nulls_first=True), 'pk')
+        return queryset.order_by(F('trending__rank').desc(nulls_last=True), '-pk')
+
+    def get_cache_dependencies(self, request, view):
+        """Ranks move without model signals; cached responses follow the rank generation."""
+        return ['trending.TrendingScore'] if self.get_trending_ordering(request) else []
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from trending.engine import CONTENT_FK_FIELDS, recompute
+
+
+class Command(BaseCommand):
+    help = 'Recompute trending ranks from votes, comments, bookmarks and views in chunks (run periodically)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--type', type=int, choices=sorted(CONTENT_FK_FIELDS),
+                            help='Only recompute one content type (1=prompts, 2=tools, 3=news, 4=blogs)')
+        parser.add_argument('--chunk-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        content_types = [options['type']] if options['type'] else None
+        written = recompute(content_types, chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f'Recomputed {written} trending ranks'))
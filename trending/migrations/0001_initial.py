@@ -0,0 +1,36 @@
+# Generated by Django 5.2.8 on 2026-10-18 10:38
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('content', '0006_remove_blog_blogs_score_3fb35a_idx_and_more'),
+        ('prompts', '0003_remove_prompt_prompts_created_79b1d9_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrendingScore',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_type', models.IntegerField(choices=[(1, 'Prompt'), (2, 'Tool'), (3, 'News'), (4, 'Blog')])),
+                ('object_id', models.UUIDField()),
+                ('rank', models.FloatField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('blog', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='trending', to='content.blog')),
+                ('news', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='trending', to='content.news')),
+                ('prompt', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='trending', to='prompts.prompt')),
+                ('tool', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='trending', to='content.tool')),
+            ],
+            options={
+                'db_table': 'trending_scores',
+                'indexes': [models.Index(fields=['content_type', '-rank', '-id'], name='trending_sc_content_c0e731_idx'), models.Index(fields=['-rank', '-id'], name='trending_sc_rank_696076_idx')],
+                'unique_together': {('content_type', 'object_id')},
+            },
+        ),
+    ]
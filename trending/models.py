@@ -0,0 +1,38 @@
+from django.db import models
+
+
+class TrendingScore(models.Model):
+    """
+    Time-decayed activity rank of one prompt/tool/news/blog.
+    Type mapping: 1=prompts, 2=tools, 3=news, 4=blogs
+    `rank` is log2 of the decayed activity score plus the number of half-lives
+    since trending.engine.EPOCH. Every score decays at the same rate, so rows
+    compare correctly without ever being re-decayed (see trending.engine).
+    """
+    CONTENT_TYPES = [
+        (1, 'Prompt'),
+        (2, 'Tool'),
+        (3, 'News'),
+        (4, 'Blog'),
+    ]
+
+    content_type = models.IntegerField(choices=CONTENT_TYPES)
+    object_id = models.UUIDField()
+    rank = models.FloatField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    prompt = models.OneToOneField('prompts.Prompt', null=True, blank=True, on_delete=models.CASCADE, related_name='trending')
+    tool = models.OneToOneField('content.Tool', null=True, blank=True, on_delete=models.CASCADE, related_name='trending')
+    news = models.OneToOneField('content.News', null=True, blank=True, on_delete=models.CASCADE, related_name='trending')
+    blog = models.OneToOneField('content.Blog', null=True, blank=True, on_delete=models.CASCADE, related_name='trending')
+
+    class Meta:
+        db_table = 'trending_scores'
+        unique_together = ['content_type', 'object_id']
+        indexes = [
+            models.Index(fields=['content_type', '-rank', '-id']),
+            models.Index(fields=['-rank', '-id']),
+        ]
+
+    def __str__(self):
+        return f"{self.get_content_type_display()} {self.object_id} ({self.rank:.3f})"
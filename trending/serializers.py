@@ -0,0 +1,58 @@
+from rest_framework import serializers
+from interactions.resolvers import ContentObjectListSerializer
+from tags.cards import CARD_FIELDS
+from .engine import CONTENT_FK_FIELDS, current_score
+from .models import TrendingScore
+
+
+class TrendingItemSerializer(serializers.ModelSerializer):
+    """Card of a trending prompt/tool/news/blog; content objects are resolved per page"""
+    content_type_field = 'content_type'
+    content_id_field = 'object_id'
+
+    type = serializers.IntegerField(source='content_type')
+    type_name = serializers.SerializerMethodField()
+    id = serializers.UUIDField(source='object_id')
+    slug = serializers.SerializerMethodField()
+    title = serializers.SerializerMethodField()
+    author = serializers.SerializerMethodField()
+    score = serializers.SerializerMethodField()
+    trending_score = serializers.SerializerMethodField()
+    created_at = serializers.SerializerMethodField()
+
+    class Meta:
+        model = TrendingScore
+        fields = ['type', 'type_name', 'id', 'slug', 'title', 'author', 'score',
+                  'trending_score', 'created_at']
+        list_serializer_class = ContentObjectListSerializer
+
+    def get_object(self, obj):
+        if not hasattr(obj, 'resolved_content_object'):
+            obj.resolved_content_object = getattr(obj, CONTENT_FK_FIELDS[obj.content_type], None)
+        return obj.resolved_content_object
+
+    def get_type_name(self, obj):
+        return CARD_FIELDS[obj.content_type][0]
+
+    def get_slug(self, obj):
+        content = self.get_object(obj)
+        return content.slug if content else None
+
+    def get_title(self, obj):
+        content = self.get_object(obj)
+        return getattr(content, CARD_FIELDS[obj.content_type][1]) if content else None
+
+    def get_author(self, obj):
+        content = self.get_object(obj)
+        return content.author.username if content and content.author else None
+
+    def get_score(self, obj):
+        content = self.get_object(obj)
+        return content.score if content else None
+
+    def get_trending_score(self, obj):
+        return round(current_score(obj.rank), 4)
+
+    def get_created_at(self, obj):
+        content = self.get_object(obj)
+        return serializers.DateTimeField().to_representation(content.created_at) if content else None
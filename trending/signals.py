@@ -0,0 +1,39 @@
+from django.apps import apps
+from django.db.models.signals import post_delete, post_save
+from interactions.counters import CONTENT_MODELS
+from interactions.models import Bookmark, Comment
+from .engine import get_weights, record_activity
+
+
+def content_created_receiver(content_type):
+    def content_created(sender, instance, created, **kwargs):
+        """New content starts with a freshness boost, which also creates its row."""
+        if created:
+            record_activity(content_type, {instance.pk: get_weights()['create']})
+    return content_created
+
+
+def interaction_receiver(type_field, id_field, weight_name, sign):
+    def interaction_changed(sender, instance, created=True, **kwargs):
+        if created:
+            weight = get_weights()[weight_name] * sign
+            record_activity(getattr(instance, type_field), {getattr(instance, id_field): weight})
+    return interaction_changed
+
+
+for content_type, model_label in CONTENT_MODELS.items():
+    post_save.connect(
+        content_created_receiver(content_type),
+        sender=apps.get_model(model_label),
+        weak=False,
+        dispatch_uid=f'trending_created_{content_type}'
+    )
+
+for model, type_field, id_field, weight_name in [
+    (Comment, 'commentable_type', 'commentable_id', 'comment'),
+    (Bookmark, 'bookmarkable_type', 'bookmarkable_id', 'bookmark'),
+]:
+    post_save.connect(interaction_receiver(type_field, id_field, weight_name, 1), sender=model,
+                      weak=False, dispatch_uid=f'trending_{weight_name}_added')
+    post_delete.connect(interaction_receiver(type_field, id_field, weight_name, -1), sender=model,
+                        weak=False, dispatch_uid=f'trending_{weight_name}_removed')
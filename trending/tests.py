@@ -0,0 +1,77 @@
+from datetime import timedelta
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from accounts.models import User
+from interactions.models import Bookmark, Comment
+from prompts.models import Prompt
+from .engine import MIN_SCORE, current_score, rank_for, recompute, record_activity
+from .models import TrendingScore
+
+
+@override_settings(TRENDING_HALF_LIFE_HOURS=24, TRENDING_WEIGHTS={})
+class TrendingEngineTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(email='author@example.com', username='author', password='pass12345')
+        cls.prompt = Prompt.objects.create(title='Prompt', body='body', author=cls.author, type='text')
+
+    def score_at(self, when):
+        return current_score(TrendingScore.objects.get(object_id=self.prompt.pk).rank, when)
+
+    def test_scores_halve_every_half_life(self):
+        now = timezone.now()
+        rank = rank_for(8, now)
+        self.assertAlmostEqual(current_score(rank, now), 8)
+        self.assertAlmostEqual(current_score(rank, now + timedelta(hours=24)), 4)
+        self.assertAlmostEqual(current_score(rank, now + timedelta(hours=72)), 1)
+
+    def test_activity_adds_to_the_decayed_score(self):
+        start = timezone.now()
+        TrendingScore.objects.filter(object_id=self.prompt.pk).update(rank=rank_for(10, start))
+        later = start + timedelta(hours=24)
+        self.assertEqual(record_activity(1, {self.prompt.pk: 3}, now=later), 1)
+        self.assertAlmostEqual(self.score_at(later), 10 / 2 + 3)
+
+    def test_negative_activity_clamps_at_the_floor(self):
+        now = timezone.now()
+        TrendingScore.objects.filter(object_id=self.prompt.pk).update(rank=rank_for(1, now))
+        record_activity(1, {self.prompt.pk: -5}, now=now)
+        rank = TrendingScore.objects.get(object_id=self.prompt.pk).rank
+        self.assertAlmostEqual(rank, rank_for(MIN_SCORE, now))
+        record_activity(1, {self.prompt.pk: 2}, now=now)
+        self.assertAlmostEqual(self.score_at(now), 2, places=4)
+
+    def test_first_activity_creates_the_row(self):
+        TrendingScore.objects.all().delete()
+        now = timezone.now()
+        record_activity(1, {self.prompt.pk: 5}, now=now)
+        score = TrendingScore.objects.get(object_id=self.prompt.pk)
+        self.assertEqual((score.content_type, score.prompt_id), (1, self.prompt.pk))
+        self.assertAlmostEqual(score.rank, rank_for(5, now))
+
+    def test_recompute_matches_incremental_updates(self):
+        Comment.objects.create(author=self.author, commentable_type=1, commentable_id=self.prompt.pk, body='Nice')
+        Bookmark.objects.create(user=self.author, bookmarkable_type=1, bookmarkable_id=self.prompt.pk)
+        now = timezone.now()
+        incremental = self.score_at(now)
+
+        TrendingScore.objects.all().delete()
+        self.assertEqual(recompute(content_types=[1], now=now), 1)
+        self.assertAlmostEqual(self.score_at(now), incremental, places=3)
+
+
+class TrendingEndpointTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user(email='author@example.com', username='author', password='pass12345')
+        cls.quiet = Prompt.objects.create(title='Quiet', body='body', author=author, type='text')
+        cls.busy = Prompt.objects.create(title='Busy', body='body', author=author, type='text')
+        record_activity(1, {cls.busy.pk: 20})
+
+    def test_hottest_first(self):
+        response = APIClient().get('/api/trending/', {'type': 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['id'] for item in response.data['results']], [str(self.busy.pk), str(self.quiet.pk)])
+        self.assertEqual(response.data['results'][0]['title'], 'Busy')
+        self.assertEqual(APIClient().get('/api/trending/', {'type': 9}).status_code, 400)
@@ -0,0 +1,10 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from .views import TrendingViewSet
+
+router = DefaultRouter()
+router.register(r'trending', TrendingViewSet, basename='trending')
+
+urlpatterns = [
+    path('', include(router.urls)),
+]
@@ -0,0 +1,26 @@
+from rest_framework import mixins, viewsets
+from rest_framework.exceptions import ValidationError
+from .engine import CONTENT_FK_FIELDS
+from .models import TrendingScore
+from .serializers import TrendingItemSerializer
+
+
+class TrendingViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+    """
+    Hottest prompts, tools, news and blogs (?type=1..4 for one type).
+    A page is one range scan of the (content_type, -rank) index plus one
+    query per content type for the cards.
+    """
+    queryset = TrendingScore.objects.all()
+    serializer_class = TrendingItemSerializer
+    cursor_ordering_fields = ['rank']
+    cursor_default_ordering = '-rank'
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        content_type = self.request.query_params.get('type')
+        if content_type:
+            if not content_type.isdigit() or int(content_type) not in CONTENT_FK_FIELDS:
+                raise ValidationError({'type': 'Must be 1=prompt, 2=tool, 3=news, 4=blog'})
+            queryset = queryset.filter(content_type=int(content_type))
+        return queryset.order_by('-rank', '-id')